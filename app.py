@@ -4,16 +4,26 @@ from flask import Flask, jsonify, send_from_directory
 from flask_cors import CORS
 
 from config import Config
+from utils import server_timing
 
 
 def create_app():
     app = Flask(__name__, static_folder=None)
     CORS(app)
     app.config.from_object(Config)
+    server_timing.init_app(
+        app, header=Config.SERVER_TIMING_HEADER, log=Config.SERVER_TIMING_LOG
+    )
 
     os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
     os.makedirs(Config.OUTPUT_FOLDER, exist_ok=True)
     os.makedirs(Config.CUSTOM_THEMES_FOLDER, exist_ok=True)
+    os.makedirs(Config.CACHE_FOLDER, exist_ok=True)
+
+    if Config.PDF_RENDER_WORKERS:
+        from utils.pdf_converter import start_render_pool
+
+        start_render_pool(Config.PDF_RENDER_WORKERS)
 
     from routes import register_blueprints
 
@@ -11,7 +11,53 @@ class Config:
         DATA_FOLDER, "themes"
     )  # Temas customizados (persistido)
     TEMPLATES_FOLDER = "templates"  # Temas padrão (vem com o código)
+    # Cache de conversões (memória LRU por worker + disco compartilhado)
+    CACHE_FOLDER = os.path.join(DATA_FOLDER, "cache")
+    CONVERSION_CACHE_MAX_ENTRIES = int(
+        os.environ.get("CONVERSION_CACHE_MAX_ENTRIES", 128)
+    )
+    CONVERSION_CACHE_MAX_BYTES = int(
+        os.environ.get("CONVERSION_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+    )
+    # Conversão paralela por seções para documentos grandes (0 workers = nº de CPUs)
+    CONVERT_PARALLEL_MIN_CHARS = int(
+        os.environ.get("CONVERT_PARALLEL_MIN_CHARS", 1024 * 1024)
+    )
+    CONVERT_PARALLEL_WORKERS = int(os.environ.get("CONVERT_PARALLEL_WORKERS", 0))
+    # Backend do pós-processamento HTML: "html.parser" ou "lxml" (requer lxml)
+    CONVERT_POSTPROCESS_BACKEND = os.environ.get(
+        "CONVERT_POSTPROCESS_BACKEND", "html.parser"
+    )
+    # Recursos externos dos PDFs (Font Awesome, logos): cache em disco com TTL.
+    # Com PDF_OFFLINE=1 só usa o cache e os recursos de templates/assets
+    ASSET_CACHE_FOLDER = os.path.join(DATA_FOLDER, "assets")
+    ASSET_BUNDLE_FOLDER = os.path.join(TEMPLATES_FOLDER, "assets")
+    ASSET_CACHE_TTL = int(os.environ.get("ASSET_CACHE_TTL", 7 * 24 * 3600))
+    ASSET_CACHE_MAX_BYTES = int(
+        os.environ.get("ASSET_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+    )
+    ASSET_FETCH_TIMEOUT = float(os.environ.get("ASSET_FETCH_TIMEOUT", 5))
+    PDF_OFFLINE = os.environ.get("PDF_OFFLINE", "0") == "1"
+    # Imagens dos PDFs reduzidas para a largura da página nesta resolução e
+    # recomprimidas (0 = desligado; abaixo de 96 vale 96), com cache pelo hash
+    # da original
+    PDF_IMAGE_DPI = int(os.environ.get("PDF_IMAGE_DPI", 150))
+    PDF_IMAGE_JPEG_QUALITY = int(os.environ.get("PDF_IMAGE_JPEG_QUALITY", 80))
+    IMAGE_CACHE_FOLDER = os.path.join(DATA_FOLDER, "images")
+    IMAGE_CACHE_MAX_BYTES = int(
+        os.environ.get("IMAGE_CACHE_MAX_BYTES", 128 * 1024 * 1024)
+    )
+    # Processos de render de PDF por worker do gunicorn (0 = no próprio worker)
+    PDF_RENDER_WORKERS = int(os.environ.get("PDF_RENDER_WORKERS", 0))
+    PDF_RENDER_TIMEOUT = float(os.environ.get("PDF_RENDER_TIMEOUT", 110))
+    # HTML a partir deste tamanho é renderizado por seções em paralelo no pool
+    # (0 = desligado). Cada parte começa em página nova
+    PDF_SPLIT_MIN_CHARS = int(os.environ.get("PDF_SPLIT_MIN_CHARS", 0))
     ALLOWED_EXTENSIONS = {"md", "txt", "markdown"}
+    # Tempos por fase da requisição: header Server-Timing e/ou uma linha JSON no log.
+    # O header expõe detalhes internos: ligar só em desenvolvimento e homologação
+    SERVER_TIMING_HEADER = os.environ.get("SERVER_TIMING_HEADER", "0") == "1"
+    SERVER_TIMING_LOG = os.environ.get("SERVER_TIMING_LOG", "0") == "1"
 
     # Supabase
     SUPABASE_URL = os.environ.get("SUPABASE_URL")
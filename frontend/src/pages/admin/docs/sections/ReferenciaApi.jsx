@@ -66,6 +66,7 @@ const groups = [
     title: 'Conversao',
     endpoints: [
       { method: 'POST', path: '/api/convert', auth: 'Bearer', desc: 'Converte Markdown (JSON body) para HTML' },
+      { method: 'POST', path: '/api/convert/preview', auth: 'Bearer', desc: 'Converte Markdown para HTML sem salvar documento' },
       { method: 'POST', path: '/api/convert/file', auth: 'Bearer', desc: 'Converte arquivo .md (upload) para HTML' },
       { method: 'POST', path: '/api/convert/pdf', auth: 'Bearer', desc: 'Converte Markdown (JSON body) para PDF' },
       { method: 'POST', path: '/api/convert/file/pdf', auth: 'Bearer', desc: 'Converte arquivo .md (upload) para PDF' },
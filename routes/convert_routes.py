@@ -1,5 +1,6 @@
 """Blueprint de conversao MD->HTML/PDF com Storage + registro DB."""
 
+import hashlib
 import logging
 import os
 from datetime import datetime
@@ -8,24 +9,164 @@ from flask import Blueprint, g, jsonify, render_template, request
 from werkzeug.utils import secure_filename
 
 from config import Config
+from utils.asset_cache import asset_cache
 from utils.auth import admin_required
+from utils.conversion_cache import ConversionCache, converter_source_hash
+from utils.conversion_pipeline import ConversionPipeline
+from utils.image_optimizer import image_optimizer
 from utils.markdown_converter import MarkdownConverter
 from utils.pdf_converter import PDFConverter
+from utils.server_timing import pipeline_hook
 from utils.supabase_client import supa_service
-from utils.theme_manager import ThemeManager
+from utils.theme_manager import REPORT_CSS_TEMPLATE, ThemeManager
 
 logger = logging.getLogger(__name__)
 
 convert_bp = Blueprint("convert", __name__)
 
-converter = MarkdownConverter()
+converter = MarkdownConverter(postprocess_backend=Config.CONVERT_POSTPROCESS_BACKEND)
 theme_manager = ThemeManager(custom_themes_folder=Config.CUSTOM_THEMES_FOLDER)
-pdf_converter = PDFConverter()
-
-
-def generate_filename(extension="html"):
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return f"relatorio_{timestamp}.{extension}"
+pdf_converter = PDFConverter(
+    asset_cache=asset_cache,
+    render_workers=Config.PDF_RENDER_WORKERS,
+    render_timeout=Config.PDF_RENDER_TIMEOUT,
+    split_min_chars=Config.PDF_SPLIT_MIN_CHARS,
+    image_optimizer=image_optimizer,
+)
+conversion_cache = ConversionCache(
+    cache_folder=Config.CACHE_FOLDER,
+    max_entries=Config.CONVERSION_CACHE_MAX_ENTRIES,
+    max_disk_bytes=Config.CONVERSION_CACHE_MAX_BYTES,
+)
+
+
+def _template_hash(template_names=("base.html", REPORT_CSS_TEMPLATE)):
+    """Hash dos templates, para invalidar o cache em disco quando eles mudarem."""
+    digest = hashlib.sha256()
+    for template_name in template_names:
+        try:
+            with open(os.path.join(Config.TEMPLATES_FOLDER, template_name), "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            pass
+    return digest.hexdigest()
+
+
+TEMPLATE_HASH = _template_hash()
+CONVERTER_HASH = converter_source_hash()
+
+
+def _cache_options(ctx):
+    """Entradas da chave de cache além do markdown e do tema."""
+    return {
+        "remove_header": True,
+        "remove_metadata_section": False,
+        "postprocess_backend": converter.postprocess_backend,
+        "template": "base.html",
+        "template_hash": TEMPLATE_HASH,
+        "converter_hash": CONVERTER_HASH,
+        "current_year": datetime.now().year,
+    }
+
+
+pipeline = ConversionPipeline(
+    converter,
+    theme_manager=theme_manager,
+    pdf_converter=pdf_converter,
+    storage=supa_service,
+    render=render_template,
+    parallel_min_chars=Config.CONVERT_PARALLEL_MIN_CHARS,
+    max_workers=Config.CONVERT_PARALLEL_WORKERS or None,
+)
+pipeline.use_cache(conversion_cache, options=_cache_options)
+pipeline.add_hook(after=pipeline_hook)
+
+
+def _document_fields(form, original_filename=None):
+    """Campos dos registros em documentos vindos do JSON ou do formulário."""
+    fields = {
+        "processo_id": form.get("processo_id") or None,
+        "created_by": g.user_id,
+    }
+    if "title" in form:
+        fields["title"] = form.get("title")
+    if original_filename:
+        fields["original_name"] = original_filename
+    return fields
+
+
+def _upload_error():
+    """Resposta de erro se o arquivo enviado for inválido, senão None."""
+    if "file" not in request.files:
+        return jsonify({"success": False, "error": "Nenhum arquivo enviado"}), 400
+
+    file = request.files["file"]
+
+    if not file.filename or file.filename == "":
+        return jsonify({"success": False, "error": "Nenhum arquivo selecionado"}), 400
+
+    if not Config.allowed_file(file.filename):
+        return jsonify(
+            {
+                "success": False,
+                "error": "Tipo de arquivo não permitido. Use .md, .txt ou .markdown",
+            }
+        ), 400
+
+    return None
+
+
+def _read_upload():
+    """Lê o markdown do arquivo enviado direto da requisição."""
+    file = request.files["file"]
+    original_filename = secure_filename(file.filename)
+    markdown_text = file.read().decode("utf-8")
+    return markdown_text, original_filename
+
+
+def _html_response(ctx, html, extra_metadata=None):
+    document = ctx.documents["html"]
+    return jsonify(
+        {
+            "success": True,
+            "html": html,
+            "filename": document["filename"],
+            "download_url": f"/api/download/{document['record'].data[0]['id']}",
+            "metadata": {
+                "title": ctx.title,
+                "theme": ctx.theme_name,
+                **(extra_metadata or {}),
+                "generated_at": datetime.now().isoformat(),
+            },
+            "document_id": document["record"].data[0]["id"],
+            "signed_url": document["signed_url"],
+        }
+    )
+
+
+def _pdf_response(ctx, extra_metadata=None):
+    html_doc = ctx.documents["html"]
+    pdf_doc = ctx.documents["pdf"]
+    return jsonify(
+        {
+            "success": True,
+            "pdf_filename": pdf_doc["filename"],
+            "html_filename": html_doc["filename"],
+            "pdf_download_url": f"/api/download/{pdf_doc['record'].data[0]['id']}",
+            "html_download_url": f"/api/download/{html_doc['record'].data[0]['id']}",
+            "metadata": {
+                "title": ctx.title,
+                "theme": ctx.theme_name,
+                "orientation": ctx.orientation,
+                **(extra_metadata or {}),
+                "generated_at": datetime.now().isoformat(),
+            },
+            "pdf_document_id": pdf_doc["record"].data[0]["id"],
+            "html_document_id": html_doc["record"].data[0]["id"],
+            "pdf_signed_url": pdf_doc["signed_url"],
+            "html_signed_url": html_doc["signed_url"],
+        }
+    )
 
 
 @convert_bp.route("/api/convert", methods=["POST"])
@@ -39,69 +180,52 @@ def convert_markdown():
                 {"success": False, "error": 'Campo "markdown" é obrigatório'}
             ), 400
 
-        markdown_text = data.get("markdown", "")
-        theme_name = data.get("theme", "juridico")
-        theme_name = theme_name.lower().strip() if theme_name else "juridico"
-        custom_config = data.get("custom_config", {})
-
-        theme_config = theme_manager.get_theme_config(theme_name)
-
-        if custom_config:
-            if "colors" in custom_config:
-                theme_config["colors"].update(custom_config["colors"])
-            if "fonts" in custom_config:
-                theme_config["fonts"].update(custom_config["fonts"])
-
-        html_content = converter.convert(markdown_text)
-        title = converter.extract_title(markdown_text)
-        metadata = converter.extract_metadata(markdown_text)
-
-        rendered_html = render_template(
-            "base.html",
-            title=title,
-            header_title=title,
-            content=html_content,
-            theme=theme_config,
-            metadata=metadata,
-            current_year=datetime.now().year,
+        ctx = pipeline.run(
+            pipeline.context(
+                data.get("markdown", ""),
+                data.get("theme", "juridico"),
+                custom_config=data.get("custom_config", {}),
+                document_fields=_document_fields(data),
+            )
         )
 
-        filename = generate_filename()
+        return _html_response(ctx, ctx.rendered_html)
 
-        # Upload para Supabase Storage + registro no banco
-        storage_path = supa_service.upload_file(rendered_html.encode("utf-8"), "html")
-        try:
-            doc_record = supa_service.create_documento(
-                {
-                    "processo_id": data.get("processo_id"),
-                    "filename": filename,
-                    "file_type": "html",
-                    "storage_path": storage_path,
-                    "file_size": len(rendered_html.encode("utf-8")),
-                    "title": data.get("title", title),
-                    "theme": theme_name,
-                    "created_by": g.user_id,
-                }
-            )
-        except Exception:
-            supa_service.delete_file(storage_path)
-            raise
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@convert_bp.route("/api/convert/preview", methods=["POST"])
+@admin_required
+def preview_markdown():
+    """Mesma conversão de /api/convert, sem gravar no Storage nem em documentos."""
+    try:
+        data = request.get_json()
+
+        if not data or "markdown" not in data:
+            return jsonify(
+                {"success": False, "error": 'Campo "markdown" é obrigatório'}
+            ), 400
 
-        signed_url = supa_service.get_signed_url(storage_path)
+        ctx = pipeline.run(
+            pipeline.context(
+                data.get("markdown", ""),
+                data.get("theme", "juridico"),
+                custom_config=data.get("custom_config", {}),
+                persist=False,
+            )
+        )
 
         return jsonify(
             {
                 "success": True,
-                "html": rendered_html,
-                "filename": filename,
-                "download_url": f"/api/download/{doc_record.data[0]['id']}",
+                "html": ctx.rendered_html,
                 "metadata": {
-                    "title": title,
-                    "theme": theme_name,
+                    "title": ctx.title,
+                    "theme": ctx.theme_name,
+                    "cached": ctx.cache_hit,
                     "generated_at": datetime.now().isoformat(),
                 },
-                "document_id": doc_record.data[0]["id"],
-                "signed_url": signed_url,
             }
         )
 
@@ -113,98 +237,25 @@ def convert_markdown():
 @admin_required
 def convert_file():
     try:
-        if "file" not in request.files:
-            return jsonify({"success": False, "error": "Nenhum arquivo enviado"}), 400
-
-        file = request.files["file"]
-
-        if not file.filename or file.filename == "":
-            return jsonify(
-                {"success": False, "error": "Nenhum arquivo selecionado"}
-            ), 400
+        error = _upload_error()
+        if error:
+            return error
 
-        if not Config.allowed_file(file.filename):
-            return jsonify(
-                {
-                    "success": False,
-                    "error": "Tipo de arquivo não permitido. Use .md, .txt ou .markdown",
-                }
-            ), 400
-
-        original_filename = secure_filename(file.filename)
-        upload_path = os.path.join(Config.UPLOAD_FOLDER, original_filename)
-        file.save(upload_path)
-
-        with open(upload_path, encoding="utf-8") as f:
-            markdown_text = f.read()
-
-        theme_name = request.form.get("theme", "juridico")
-        theme_name = theme_name.lower().strip() if theme_name else "juridico"
-
-        theme_config = theme_manager.get_theme_config(theme_name)
-
-        html_content = converter.convert(markdown_text)
-        title = converter.extract_title(markdown_text)
-        metadata = converter.extract_metadata(markdown_text)
+        markdown_text, original_filename = _read_upload()
 
-        rendered_html = render_template(
-            "base.html",
-            title=title,
-            header_title=title,
-            content=html_content,
-            theme=theme_config,
-            metadata=metadata,
-            current_year=datetime.now().year,
-        )
-
-        filename = generate_filename()
-
-        try:
-            os.remove(upload_path)
-        except OSError:
-            logger.warning("Falha ao remover arquivo temporario: %s", upload_path)
-
-        # Upload para Supabase Storage + registro no banco
-        storage_path = supa_service.upload_file(rendered_html.encode("utf-8"), "html")
-        try:
-            processo_id = request.form.get("processo_id") or None
-            doc_title = request.form.get("title", title)
-            doc_record = supa_service.create_documento(
-                {
-                    "processo_id": processo_id,
-                    "filename": filename,
-                    "original_name": original_filename,
-                    "file_type": "html",
-                    "storage_path": storage_path,
-                    "file_size": len(rendered_html.encode("utf-8")),
-                    "title": doc_title,
-                    "theme": theme_name,
-                    "created_by": g.user_id,
-                }
+        ctx = pipeline.run(
+            pipeline.context(
+                markdown_text,
+                request.form.get("theme", "juridico"),
+                document_fields=_document_fields(request.form, original_filename),
             )
-        except Exception:
-            supa_service.delete_file(storage_path)
-            raise
-
-        signed_url = supa_service.get_signed_url(storage_path)
+        )
 
-        return jsonify(
-            {
-                "success": True,
-                "html": rendered_html[:500] + "..."
-                if len(rendered_html) > 500
-                else rendered_html,
-                "filename": filename,
-                "download_url": f"/api/download/{doc_record.data[0]['id']}",
-                "metadata": {
-                    "title": title,
-                    "theme": theme_name,
-                    "original_filename": original_filename,
-                    "generated_at": datetime.now().isoformat(),
-                },
-                "document_id": doc_record.data[0]["id"],
-                "signed_url": signed_url,
-            }
+        rendered_html = ctx.rendered_html
+        return _html_response(
+            ctx,
+            rendered_html[:500] + "..." if len(rendered_html) > 500 else rendered_html,
+            {"original_filename": original_filename},
         )
 
     except Exception as e:
@@ -222,119 +273,19 @@ def convert_markdown_to_pdf():
                 {"success": False, "error": 'Campo "markdown" é obrigatório'}
             ), 400
 
-        markdown_text = data.get("markdown", "")
-        theme_name = data.get("theme", "juridico")
-        theme_name = theme_name.lower().strip() if theme_name else "juridico"
-        custom_config = data.get("custom_config", {})
-        orientation = data.get("orientation", "portrait")
-
-        theme_config = theme_manager.get_theme_config(theme_name)
-
-        if custom_config:
-            if "colors" in custom_config:
-                theme_config["colors"].update(custom_config["colors"])
-            if "fonts" in custom_config:
-                theme_config["fonts"].update(custom_config["fonts"])
-
-        html_content = converter.convert(markdown_text)
-        title = converter.extract_title(markdown_text)
-        metadata = converter.extract_metadata(markdown_text)
-
-        rendered_html = render_template(
-            "base.html",
-            title=title,
-            header_title=title,
-            content=html_content,
-            theme=theme_config,
-            metadata=metadata,
-            current_year=datetime.now().year,
-        )
-
-        html_filename = generate_filename("html")
-        pdf_filename = generate_filename("pdf")
-
-        # Gerar PDF em arquivo temporario
-        pdf_path = os.path.join(Config.OUTPUT_FOLDER, pdf_filename)
-        pdf_converter.html_to_pdf(rendered_html, pdf_path, orientation)
-
-        with open(pdf_path, "rb") as f:
-            pdf_content = f.read()
-
-        try:
-            os.remove(pdf_path)
-        except OSError:
-            logger.warning("Falha ao remover PDF temporario: %s", pdf_path)
-
-        # Upload HTML para Storage
-        html_storage_path = supa_service.upload_file(
-            rendered_html.encode("utf-8"), "html"
-        )
-        # Upload PDF para Storage
-        pdf_storage_path = supa_service.upload_file(pdf_content, "pdf")
-
-        processo_id = data.get("processo_id")
-        doc_title = data.get("title", title)
-
-        # Registrar HTML no banco
-        try:
-            html_doc = supa_service.create_documento(
-                {
-                    "processo_id": processo_id,
-                    "filename": html_filename,
-                    "file_type": "html",
-                    "storage_path": html_storage_path,
-                    "file_size": len(rendered_html.encode("utf-8")),
-                    "title": doc_title,
-                    "theme": theme_name,
-                    "created_by": g.user_id,
-                }
+        ctx = pipeline.run(
+            pipeline.context(
+                data.get("markdown", ""),
+                data.get("theme", "juridico"),
+                custom_config=data.get("custom_config", {}),
+                formats=("html", "pdf"),
+                orientation=data.get("orientation", "portrait"),
+                document_fields=_document_fields(data),
             )
-        except Exception:
-            supa_service.delete_file(html_storage_path)
-            supa_service.delete_file(pdf_storage_path)
-            raise
-
-        # Registrar PDF no banco
-        try:
-            pdf_doc = supa_service.create_documento(
-                {
-                    "processo_id": processo_id,
-                    "filename": pdf_filename,
-                    "file_type": "pdf",
-                    "storage_path": pdf_storage_path,
-                    "file_size": len(pdf_content),
-                    "title": doc_title,
-                    "theme": theme_name,
-                    "created_by": g.user_id,
-                }
-            )
-        except Exception:
-            supa_service.delete_file(pdf_storage_path)
-            raise
-
-        pdf_signed_url = supa_service.get_signed_url(pdf_storage_path)
-        html_signed_url = supa_service.get_signed_url(html_storage_path)
-
-        return jsonify(
-            {
-                "success": True,
-                "pdf_filename": pdf_filename,
-                "html_filename": html_filename,
-                "pdf_download_url": f"/api/download/{pdf_doc.data[0]['id']}",
-                "html_download_url": f"/api/download/{html_doc.data[0]['id']}",
-                "metadata": {
-                    "title": title,
-                    "theme": theme_name,
-                    "orientation": orientation,
-                    "generated_at": datetime.now().isoformat(),
-                },
-                "pdf_document_id": pdf_doc.data[0]["id"],
-                "html_document_id": html_doc.data[0]["id"],
-                "pdf_signed_url": pdf_signed_url,
-                "html_signed_url": html_signed_url,
-            }
         )
 
+        return _pdf_response(ctx)
+
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -343,136 +294,23 @@ def convert_markdown_to_pdf():
 @admin_required
 def convert_file_to_pdf():
     try:
-        if "file" not in request.files:
-            return jsonify({"success": False, "error": "Nenhum arquivo enviado"}), 400
-
-        file = request.files["file"]
-
-        if not file.filename or file.filename == "":
-            return jsonify(
-                {"success": False, "error": "Nenhum arquivo selecionado"}
-            ), 400
-
-        if not Config.allowed_file(file.filename):
-            return jsonify(
-                {
-                    "success": False,
-                    "error": "Tipo de arquivo não permitido. Use .md, .txt ou .markdown",
-                }
-            ), 400
-
-        original_filename = secure_filename(file.filename)
-        upload_path = os.path.join(Config.UPLOAD_FOLDER, original_filename)
-        file.save(upload_path)
-
-        with open(upload_path, encoding="utf-8") as f:
-            markdown_text = f.read()
-
-        theme_name = request.form.get("theme", "juridico")
-        theme_name = theme_name.lower().strip() if theme_name else "juridico"
-        orientation = request.form.get("orientation", "portrait")
-
-        theme_config = theme_manager.get_theme_config(theme_name)
-
-        html_content = converter.convert(markdown_text)
-        title = converter.extract_title(markdown_text)
-        metadata = converter.extract_metadata(markdown_text)
-
-        rendered_html = render_template(
-            "base.html",
-            title=title,
-            header_title=title,
-            content=html_content,
-            theme=theme_config,
-            metadata=metadata,
-            current_year=datetime.now().year,
-        )
-
-        html_filename = generate_filename("html")
-        pdf_filename = generate_filename("pdf")
-
-        # Gerar PDF em arquivo temporario
-        pdf_path = os.path.join(Config.OUTPUT_FOLDER, pdf_filename)
-        pdf_converter.html_to_pdf(rendered_html, pdf_path, orientation)
-
-        with open(pdf_path, "rb") as f:
-            pdf_content = f.read()
-
-        for path in (pdf_path, upload_path):
-            try:
-                os.remove(path)
-            except OSError:
-                logger.warning("Falha ao remover arquivo temporario: %s", path)
-
-        # Upload HTML e PDF para Storage
-        html_storage_path = supa_service.upload_file(
-            rendered_html.encode("utf-8"), "html"
-        )
-        pdf_storage_path = supa_service.upload_file(pdf_content, "pdf")
-
-        processo_id = request.form.get("processo_id") or None
-        doc_title = request.form.get("title", title)
-
-        try:
-            html_doc = supa_service.create_documento(
-                {
-                    "processo_id": processo_id,
-                    "filename": html_filename,
-                    "original_name": original_filename,
-                    "file_type": "html",
-                    "storage_path": html_storage_path,
-                    "file_size": len(rendered_html.encode("utf-8")),
-                    "title": doc_title,
-                    "theme": theme_name,
-                    "created_by": g.user_id,
-                }
-            )
-        except Exception:
-            supa_service.delete_file(html_storage_path)
-            supa_service.delete_file(pdf_storage_path)
-            raise
-
-        try:
-            pdf_doc = supa_service.create_documento(
-                {
-                    "processo_id": processo_id,
-                    "filename": pdf_filename,
-                    "original_name": original_filename,
-                    "file_type": "pdf",
-                    "storage_path": pdf_storage_path,
-                    "file_size": len(pdf_content),
-                    "title": doc_title,
-                    "theme": theme_name,
-                    "created_by": g.user_id,
-                }
+        error = _upload_error()
+        if error:
+            return error
+
+        markdown_text, original_filename = _read_upload()
+
+        ctx = pipeline.run(
+            pipeline.context(
+                markdown_text,
+                request.form.get("theme", "juridico"),
+                formats=("html", "pdf"),
+                orientation=request.form.get("orientation", "portrait"),
+                document_fields=_document_fields(request.form, original_filename),
             )
-        except Exception:
-            supa_service.delete_file(pdf_storage_path)
-            raise
-
-        pdf_signed_url = supa_service.get_signed_url(pdf_storage_path)
-        html_signed_url = supa_service.get_signed_url(html_storage_path)
-
-        return jsonify(
-            {
-                "success": True,
-                "pdf_filename": pdf_filename,
-                "html_filename": html_filename,
-                "pdf_download_url": f"/api/download/{pdf_doc.data[0]['id']}",
-                "html_download_url": f"/api/download/{html_doc.data[0]['id']}",
-                "metadata": {
-                    "title": title,
-                    "theme": theme_name,
-                    "orientation": orientation,
-                    "original_filename": original_filename,
-                    "generated_at": datetime.now().isoformat(),
-                },
-                "pdf_document_id": pdf_doc.data[0]["id"],
-                "html_document_id": html_doc.data[0]["id"],
-                "pdf_signed_url": pdf_signed_url,
-                "html_signed_url": html_signed_url,
-            }
         )
 
+        return _pdf_response(ctx, {"original_filename": original_filename})
+
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -1,24 +1,41 @@
 """Blueprint de download e preview via Supabase Storage."""
 
 import logging
-import os
 import urllib.request
-from datetime import datetime
 
 from flask import Blueprint, g, jsonify, redirect, request
 
 from config import Config
+from utils.asset_cache import asset_cache
 from utils.auth import admin_required, auth_required, get_client_carteira_ids
+from utils.conversion_pipeline import ConversionPipeline
+from utils.image_optimizer import image_optimizer
 from utils.markdown_converter import MarkdownConverter
-from utils.pdf_converter import PDFConverter
+from utils.pdf_converter import PDFConverter, render_fingerprint
+from utils.server_timing import pipeline_hook, timed
 from utils.supabase_client import supa_service
+from utils.theme_manager import ThemeManager
 
 logger = logging.getLogger(__name__)
 
 files_bp = Blueprint("files", __name__)
 
 converter = MarkdownConverter()
-pdf_converter = PDFConverter()
+pdf_converter = PDFConverter(
+    asset_cache=asset_cache,
+    render_workers=Config.PDF_RENDER_WORKERS,
+    render_timeout=Config.PDF_RENDER_TIMEOUT,
+    split_min_chars=Config.PDF_SPLIT_MIN_CHARS,
+    image_optimizer=image_optimizer,
+)
+theme_manager = ThemeManager(custom_themes_folder=Config.CUSTOM_THEMES_FOLDER)
+pipeline = ConversionPipeline(
+    converter,
+    theme_manager=theme_manager,
+    pdf_converter=pdf_converter,
+    storage=supa_service,
+)
+pipeline.add_hook(after=pipeline_hook)
 
 
 @files_bp.route("/api/download/<document_id>", methods=["GET"])
@@ -81,7 +98,11 @@ def preview_document(document_id):
 @files_bp.route("/api/generate-pdf/<document_id>", methods=["GET"])
 @admin_required
 def generate_pdf_from_document(document_id):
-    """Baixa HTML do Storage, converte para PDF, faz upload do PDF."""
+    """
+    Baixa HTML do Storage, converte para PDF, faz upload do PDF. Se o mesmo
+    HTML ja foi convertido com a mesma orientacao e folha de impressao,
+    retorna o PDF existente.
+    """
     try:
         doc = supa_service.get_documento(document_id)
         if not doc:
@@ -96,55 +117,60 @@ def generate_pdf_from_document(document_id):
             return jsonify({"error": "Erro ao acessar documento"}), 500
 
         # Baixar conteudo HTML
-        with urllib.request.urlopen(signed_url) as response:
+        with timed("storage-download"), urllib.request.urlopen(signed_url) as response:
             html_content = response.read().decode("utf-8")
 
+        # Tema do documento com os ajustes de custom_config, como na conversão
+        custom_config = doc.get("custom_config") or {}
         orientation = request.args.get("orientation", "portrait")
+        ctx = pipeline.context(
+            theme_name=doc.get("theme"),
+            rendered_html=html_content,
+            custom_config=custom_config,
+            formats=("pdf",),
+            orientation=orientation,
+        )
+        fingerprint = render_fingerprint(
+            html_content,
+            orientation,
+            ctx.theme_config,
+            pdf_converter.render_options(),
+            custom_config,
+        )
 
-        # Gerar PDF temporario
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        pdf_filename = f"relatorio_{timestamp}.pdf"
-        pdf_path = os.path.join(Config.OUTPUT_FOLDER, pdf_filename)
-
-        pdf_converter.html_to_pdf(html_content, pdf_path, orientation)
-
-        with open(pdf_path, "rb") as f:
-            pdf_content = f.read()
-
-        try:
-            os.remove(pdf_path)
-        except OSError:
-            logger.warning("Falha ao remover PDF temporario: %s", pdf_path)
-
-        # Upload PDF para Storage
-        pdf_storage_path = supa_service.upload_file(pdf_content, "pdf")
-
-        try:
-            pdf_doc = supa_service.create_documento(
+        existing = supa_service.find_pdf_by_fingerprint(
+            fingerprint, doc.get("processo_id")
+        )
+        if existing:
+            return jsonify(
                 {
-                    "processo_id": doc.get("processo_id"),
-                    "filename": pdf_filename,
-                    "file_type": "pdf",
-                    "storage_path": pdf_storage_path,
-                    "file_size": len(pdf_content),
-                    "title": doc.get("title", ""),
-                    "theme": doc.get("theme", ""),
-                    "created_by": doc.get("created_by") or g.user_id,
+                    "success": True,
+                    "pdf_filename": existing["filename"],
+                    "pdf_download_url": f"/api/download/{existing['id']}",
+                    "document_id": existing["id"],
+                    "signed_url": supa_service.get_signed_url(existing["storage_path"]),
+                    "cached": True,
                 }
             )
-        except Exception:
-            supa_service.delete_file(pdf_storage_path)
-            raise
 
-        pdf_signed_url = supa_service.get_signed_url(pdf_storage_path)
+        ctx.document_fields = {
+            "processo_id": doc.get("processo_id"),
+            "title": doc.get("title", ""),
+            "theme": doc.get("theme", ""),
+            "created_by": doc.get("created_by") or g.user_id,
+            "render_fingerprint": fingerprint,
+        }
+        ctx = pipeline.run(ctx)
+        pdf_doc = ctx.documents["pdf"]
 
         return jsonify(
             {
                 "success": True,
-                "pdf_filename": pdf_filename,
-                "pdf_download_url": f"/api/download/{pdf_doc.data[0]['id']}",
-                "document_id": pdf_doc.data[0]["id"],
-                "signed_url": pdf_signed_url,
+                "pdf_filename": pdf_doc["filename"],
+                "pdf_download_url": f"/api/download/{pdf_doc['record'].data[0]['id']}",
+                "document_id": pdf_doc["record"].data[0]["id"],
+                "signed_url": pdf_doc["signed_url"],
+                "cached": False,
             }
         )
 
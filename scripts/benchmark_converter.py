@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""Suite de benchmark do MarkdownConverter com gates de regressao.
+
+Mede convert(), extract_metadata() e cada etapa privada do conversor em
+entradas de 1x a 64x, a partir dos EXEMPLO_RELATORIO*.md e de geradores
+sinteticos (tabelas, uma tabela com milhares de linhas, <details>
+aninhados, referencias e metadados).
+
+Falha (exit 1) quando:
+- uma etapa cresce de forma super-linear (expoente de crescimento acima
+  de --max-exponent na inclinacao log-log tempo x tamanho);
+- uma etapa fica mais lenta que o baseline salvo alem de --tolerance mais
+  o ruido medido da etapa. A comparacao usa o melhor tempo de cada escala
+  (minimo de MIN_ROUNDS rodadas) e a mediana das razoes entre as escalas
+  acima de MIN_GATED_SECONDS, para que uma medicao isolada nao decida o gate.
+
+Os tempos sao normalizados por um laco de calibracao em Python puro, medido
+de novo a cada escala, para que o baseline seja comparavel entre maquinas
+parecidas e entre momentos de carga diferentes da mesma maquina. Ainda
+assim, gere o baseline na mesma maquina (ou tipo de runner) em que o gate
+roda.
+
+Uso:
+    python scripts/benchmark_converter.py
+    python scripts/benchmark_converter.py --max-scale 16
+    python scripts/benchmark_converter.py --update-baseline
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+
+# Garantir que o diretorio raiz do projeto esta no path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from utils.markdown_converter import MarkdownConverter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT_DIR, "scripts", "benchmark_baselines.json")
+
+SCALES = (1, 2, 4, 8, 16, 32, 64)
+# Tempos abaixo disso sao dominados por ruido e ficam fora dos gates
+MIN_GATED_SECONDS = 0.005
+# Limite menor para o expoente: tempos curtos tem mais rodadas e sao estaveis,
+# e mais pontos deixam a mediana das inclinacoes menos sensivel a uma escala
+MIN_EXPONENT_SECONDS = 0.001
+# Cada medicao repete ate somar este tempo, entre MIN_ROUNDS e MAX_ROUNDS rodadas
+TARGET_SECONDS = 0.25
+MIN_ROUNDS = 3
+MAX_ROUNDS = 7
+
+
+# ========== GERADORES ==========
+
+
+def exemplos(scale):
+    """Relatorios de exemplo do repositorio, repetidos."""
+    texts = []
+    for path in sorted(glob.glob(os.path.join(ROOT_DIR, "EXEMPLO_RELATORIO*.md"))):
+        with open(path, encoding="utf-8") as f:
+            texts.append(f.read())
+    return "\n\n".join(texts * scale)
+
+
+def tabelas(scale):
+    """Muitas tabelas, com celulas vazias para a limpeza."""
+    parts = ["# Relatório de Tabelas\n"]
+    for i in range(20 * scale):
+        rows = "\n".join(
+            f"| Campo {i}.{j} | {'N/A' if j % 3 == 0 else f'Valor {j}'} | - |"
+            for j in range(10)
+        )
+        parts.append(
+            f"## {i}. Tabela {i}\n\n| Campo | Valor | Obs |\n|---|---|---|\n{rows}\n"
+        )
+    return "\n".join(parts)
+
+
+def tabela_grande(scale):
+    """Uma unica tabela de processo com 80 linhas por escala (5.120 em 64x)."""
+    rows = []
+    for i in range(80 * scale):
+        if i % 5 == 0:
+            rows.append("| N/A | - | Não informado | nenhum |")
+        else:
+            rows.append(
+                f"| {i:05d}/2020 | **Evento {i}** | R$ {i},00 | "
+                f"{'N/A' if i % 3 == 0 else 'Concluído'} |"
+            )
+    return (
+        "# Relatório de Movimentações\n\n"
+        "| Data | Evento | Valor | Situação |\n|---|---|---|---|\n"
+        + "\n".join(rows)
+        + "\n"
+    )
+
+
+def details(scale):
+    """Blocos <details> aninhados; a profundidade cresce com a escala."""
+    depth = 4 * scale
+    opening = "".join(
+        f"<details>\n<summary>Nível {i}</summary>\n\n**Resumo {i}**\n\n- Item A\n- Item B\n\n"
+        for i in range(depth)
+    )
+    return "# Relatório de Details\n\n" + opening + "</details>\n\n" * depth
+
+
+def referencias(scale):
+    """Milhares de referencias (Seq.: ...) em varios formatos."""
+    formats = (
+        "(Seq.: {a}, {b})",
+        "(Sequência: {b}, {a}, 3)",
+        "(Seq. {a})",
+        "(Ref.: Doc. Seq. {b})",
+        "(Fonte: Doc. Seq. {a}, Pág. 4)",
+        "(Autos (Seq. {b}))",
+        "(Autos Seq {a})",
+    )
+    parts = ["# Relatório de Referências\n"]
+    for i in range(40 * scale):
+        refs = " ".join(fmt.format(a=i, b=i + 7) for fmt in formats)
+        parts.append(f"Parágrafo {i} cita os autos {refs}.\n")
+    return "\n".join(parts)
+
+
+def metadados(scale):
+    """Blocos de metadados em paragrafos e tabelas INFORMAÇÕES DO TÍTULO."""
+    parts = [
+        "# Relatório de Metadados\n",
+        "**Processo Principal nº:** 1234567-89.2024.8.26.0100  ",
+        "**Exequente(s):** Banco X  ",
+        "**Executado(s):** Empresa Y  ",
+        "**Vara:** 1ª Vara Cível  ",
+        "**Data da Análise:** 01/01/2025  \n",
+    ]
+    for i in range(10 * scale):
+        parts.append(
+            f"## {i}. INFORMAÇÕES DO TÍTULO EXECUTIVO\n\n"
+            "| Parâmetro | Informação |\n|---|---|\n"
+            f"| Exequente | Banco {i} |\n| Executado | Empresa {i}<br>Sócio {i} |\n"
+            f"| Valor da Causa | R$ {i}.000,00 |\n| CDA | {i:06d} |\n"
+            "| Natureza do Tributo | IPTU |\n| Vara | N/A |\n"
+        )
+    return "\n".join(parts)
+
+
+WORKLOADS = {
+    "exemplos": exemplos,
+    "tabelas": tabelas,
+    "tabela_grande": tabela_grande,
+    "details": details,
+    "referencias": referencias,
+    "metadados": metadados,
+}
+
+
+# ========== ETAPAS ==========
+
+
+def _markdown(converter, details_markdown):
+    with converter._md_engine() as md:
+        return md.convert(details_markdown)
+
+
+def _stage_inputs(converter, markdown_text):
+    """Entradas intermediarias de cada etapa, calculadas uma vez por escala."""
+    prepared = converter._prepare_markdown(markdown_text)
+    details_markdown = converter._preprocess_details_markdown(prepared)
+    html = _markdown(converter, details_markdown)
+    return {
+        "markdown": markdown_text,
+        "prepared": prepared,
+        "details_markdown": details_markdown,
+        "html": html,
+        "serialized": str(BeautifulSoup(html, "html.parser")),
+    }
+
+
+def _soup(inputs):
+    return BeautifulSoup(inputs["html"], "html.parser")
+
+
+# nome -> (preparo fora da medicao, etapa medida)
+STAGES = {
+    "convert": (lambda i: i["markdown"], lambda c, x: c.convert(x)),
+    "extract_metadata": (lambda i: i["markdown"], lambda c, x: c.extract_metadata(x)),
+    "_prepare_markdown": (
+        lambda i: i["markdown"],
+        lambda c, x: c._prepare_markdown(x),
+    ),
+    "_preprocess_details_markdown": (
+        lambda i: i["prepared"],
+        lambda c, x: c._preprocess_details_markdown(x),
+    ),
+    "markdown": (lambda i: i["details_markdown"], _markdown),
+    "_postprocess_html": (
+        lambda i: i["html"],
+        lambda c, x: c._postprocess_html(x, True, False),
+    ),
+    "_postprocess_tables": (_soup, lambda c, x: c._postprocess_tables(x)),
+    "_process_details_content": (_soup, lambda c, x: c._process_details_content(x)),
+    "_finalize_html": (lambda i: i["serialized"], lambda c, x: c._finalize_html(x)),
+    "_extract_from_table": (
+        lambda i: i["markdown"],
+        lambda c, x: c._extract_from_table(x),
+    ),
+    "_extract_from_paragraphs": (
+        lambda i: i["markdown"],
+        lambda c, x: c._extract_from_paragraphs(x),
+    ),
+}
+
+
+# ========== MEDICAO ==========
+
+
+def calibrate():
+    """Tempo de um laco fixo em Python puro (unidade de normalizacao)."""
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        total = 0
+        for i in range(200_000):
+            total += i * i % 7
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(converter, setup, run, inputs):
+    """
+    Melhor tempo e ruido (mediana / melhor - 1) entre as rodadas; o preparo
+    nao entra na medicao.
+    """
+    times = []
+    for _ in range(MAX_ROUNDS):
+        argument = setup(inputs)
+        start = time.perf_counter()
+        run(converter, argument)
+        times.append(time.perf_counter() - start)
+        if len(times) >= MIN_ROUNDS and sum(times) >= TARGET_SECONDS:
+            break
+    best = min(times)
+    return best, (statistics.median(times) / best - 1) if best else 0.0
+
+
+def growth_exponent(sizes, times):
+    """
+    Inclinação log-log tempo x tamanho (1.0 = linear, 2.0 = quadrático).
+    Usa a mediana das inclinações entre pares de pontos (Theil-Sen), para que
+    uma escala ruidosa não mude o expoente.
+    """
+    points = [
+        (math.log(size), math.log(seconds))
+        for size, seconds in zip(sizes, times, strict=True)
+        if seconds >= MIN_EXPONENT_SECONDS
+    ]
+    if len(points) < 3:
+        return None
+    slopes = [
+        (y2 - y1) / (x2 - x1)
+        for i, (x1, y1) in enumerate(points)
+        for x2, y2 in points[i + 1 :]
+        if x2 != x1
+    ]
+    return statistics.median(slopes) if slopes else None
+
+
+def run_benchmarks(scales, workloads=None, stages=None, log=print):
+    """
+    Executa a suite e retorna os resultados no formato do baseline:
+    {workload: {stage: {"sizes", "seconds", "noise", "normalized", "exponent"}}}
+    """
+    converter = MarkdownConverter()
+    units = []
+    results = {}
+
+    for workload in workloads or WORKLOADS:
+        generator = WORKLOADS[workload]
+        # Aquecimento: importa extensões e enche o pool de instâncias
+        converter.convert(generator(1))
+        stage_names = stages or list(STAGES)
+        series = {
+            name: {"sizes": [], "seconds": [], "noise": [], "normalized": []}
+            for name in stage_names
+        }
+
+        for scale in scales:
+            markdown_text = generator(scale)
+            inputs = _stage_inputs(converter, markdown_text)
+            # Recalibra a cada escala: a velocidade da maquina varia ao longo
+            # de uma execucao de varios minutos
+            unit = calibrate()
+            units.append(unit)
+            for name in stage_names:
+                setup, run = STAGES[name]
+                seconds, noise = measure(converter, setup, run, inputs)
+                series[name]["sizes"].append(len(markdown_text))
+                series[name]["seconds"].append(seconds)
+                series[name]["noise"].append(noise)
+                series[name]["normalized"].append(seconds / unit)
+            log(f"  {workload:<12} {scale:>3}x  {len(markdown_text) / 1024:>9.1f} KB")
+
+        for data in series.values():
+            data["scales"] = list(scales)
+            data["exponent"] = growth_exponent(data["sizes"], data["seconds"])
+        results[workload] = series
+
+    return {"calibration_seconds": statistics.median(units), "results": results}
+
+
+# ========== GATES ==========
+
+
+def check_results(current, baseline, max_exponent, tolerance):
+    """Retorna a lista de falhas (strings) dos gates de crescimento e regressão."""
+    failures = []
+    baseline_results = (baseline or {}).get("results", {})
+
+    for workload, stages in current["results"].items():
+        for stage, data in stages.items():
+            exponent = data["exponent"]
+            if exponent is not None and exponent > max_exponent:
+                failures.append(
+                    f"{workload}/{stage}: crescimento super-linear "
+                    f"(expoente {exponent:.2f} > {max_exponent:.2f})"
+                )
+
+            reference = baseline_results.get(workload, {}).get(stage)
+            if not reference:
+                continue
+            comparison = compare_with_baseline(data, reference)
+            if comparison is None:
+                continue
+            ratio, noise = comparison
+            if ratio > 1 + tolerance + noise:
+                failures.append(
+                    f"{workload}/{stage}: {ratio:.2f}x mais lento que o baseline "
+                    f"(tolerância {tolerance:.0%} + ruído {noise:.0%})"
+                )
+    return failures
+
+
+def compare_with_baseline(data, reference):
+    """
+    (razao, ruido) de uma etapa contra o baseline, nas escalas presentes nos
+    dois e acima de MIN_GATED_SECONDS: mediana da razao entre os tempos
+    normalizados e a maior das medianas do ruido de cada medicao. None se
+    nenhuma escala estiver acima do limite.
+    """
+    ratios = []
+    noise = ([], [])
+    for scale in set(data["scales"]) & set(reference["scales"]):
+        index = data["scales"].index(scale)
+        base_index = reference["scales"].index(scale)
+        seconds = (data["seconds"][index], reference["seconds"][base_index])
+        if min(seconds) < MIN_GATED_SECONDS:
+            continue
+        ratios.append(data["normalized"][index] / reference["normalized"][base_index])
+        # Baselines antigos não têm o ruído medido
+        noise[0].append(data["noise"][index] if "noise" in data else 0.0)
+        noise[1].append(reference["noise"][base_index] if "noise" in reference else 0.0)
+    if not ratios:
+        return None
+    return statistics.median(ratios), max(map(statistics.median, noise))
+
+
+def print_report(current):
+    print(f"\n{'carga/etapa':<44} {'maior escala':>12} {'expoente':>9}")
+    for workload, stages in current["results"].items():
+        for stage, data in stages.items():
+            exponent = data["exponent"]
+            print(
+                f"{workload + '/' + stage:<44} "
+                f"{data['seconds'][-1] * 1000:>10.1f}ms "
+                f"{'-' if exponent is None else f'{exponent:.2f}':>9}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--max-scale", type=int, default=64)
+    parser.add_argument("--workload", action="append", choices=list(WORKLOADS))
+    parser.add_argument("--stage", action="append", choices=list(STAGES))
+    parser.add_argument("--max-exponent", type=float, default=1.3)
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    scales = [scale for scale in SCALES if scale <= args.max_scale]
+    current = run_benchmarks(scales, args.workload, args.stage)
+    current["python"] = platform.python_version()
+    current["platform"] = platform.platform()
+    print_report(current)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"\nBaseline salvo em {args.baseline}")
+        return 0
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    else:
+        print(f"\nBaseline não encontrado ({args.baseline}); só o gate de crescimento")
+
+    failures = check_results(current, baseline, args.max_exponent, args.tolerance)
+    if failures:
+        print("\nFALHAS:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+
+    print("\nOK: nenhuma regressão")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Benchmark da reducao de imagens dos PDFs (ImageOptimizer).
+
+Mede, para cada imagem, o tamanho original e o reduzido para a largura da
+pagina A4 retrato e o tempo de processamento (primeira vez e com cache).
+Sem argumentos usa teste.png e tres imagens sinteticas: uma foto grande
+em PNG e em JPEG e uma captura de tela com texto.
+
+Depois gera um PDF com todas as imagens, com e sem a reducao, e compara o
+tamanho do PDF e o tempo de render: o primeiro (imagens ainda fora do
+cache) e a media dos seguintes. --no-render pula essa parte, que precisa do
+WeasyPrint com o Pango instalado.
+
+Uso:
+    python scripts/benchmark_images.py
+    python scripts/benchmark_images.py imagem1.png imagem2.jpg --repetitions 5
+    python scripts/benchmark_images.py --no-render
+"""
+
+import argparse
+import base64
+import io
+import os
+import random
+import sys
+import time
+
+# Garantir que o diretorio raiz do projeto esta no path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from utils.image_optimizer import ImageOptimizer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIME_TYPES = {"PNG": "image/png", "JPEG": "image/jpeg"}
+
+
+def synthetic_images():
+    """Foto (gradiente com ruido) em PNG e JPEG e captura de tela com texto."""
+    rng = random.Random(42)
+    photo = Image.radial_gradient("L").resize((4000, 3000)).convert("RGB")
+    noise = Image.effect_noise((4000, 3000), 40).convert("RGB")
+    photo = Image.blend(photo, noise, 0.3).filter(ImageFilter.GaussianBlur(1))
+
+    screenshot = Image.new("RGB", (2560, 1440), "white")
+    draw = ImageDraw.Draw(screenshot)
+    draw.rectangle((0, 0, 2560, 80), fill="#BE3000")
+    for line in range(60):
+        words = " ".join(
+            "".join(rng.choice("abcdefghij") for _ in range(rng.randint(3, 9)))
+            for _ in range(18)
+        )
+        draw.text((40, 110 + line * 22), words, fill="#222222")
+
+    images = []
+    for name, image, image_format, options in (
+        ("foto.png", photo, "PNG", {}),
+        ("foto.jpg", photo, "JPEG", {"quality": 95}),
+        ("captura.png", screenshot, "PNG", {}),
+    ):
+        output = io.BytesIO()
+        image.save(output, image_format, **options)
+        images.append((name, output.getvalue(), MIME_TYPES[image_format]))
+    return images
+
+
+def load_images(paths):
+    images = []
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        with Image.open(io.BytesIO(data)) as image:
+            mime_type = MIME_TYPES.get(image.format, "image/png")
+        images.append((os.path.basename(path), data, mime_type))
+    return images
+
+
+def render(images, optimizer, repetitions):
+    """
+    Returns:
+        (segundos do primeiro render, media dos seguintes, bytes do PDF)
+    """
+    from utils.pdf_converter import PDFConverter
+
+    html = "<html><body><h1>Imagens</h1>"
+    for name, data, mime_type in images:
+        src = f"data:{mime_type};base64,{base64.b64encode(data).decode()}"
+        html += f"<h2>{name}</h2><img src='{src}'>"
+    html += "</body></html>"
+
+    converter = PDFConverter(image_optimizer=optimizer)
+    start = time.perf_counter()
+    content = converter.html_to_pdf_bytes(html)
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        converter.html_to_pdf_bytes(html)
+    return first, (time.perf_counter() - start) / repetitions, len(content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--quality", type=int, default=80)
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--no-render", action="store_true")
+    args = parser.parse_args()
+
+    images = (
+        load_images(args.paths)
+        if args.paths
+        else load_images([os.path.join(ROOT_DIR, "teste.png")]) + synthetic_images()
+    )
+    optimizer = ImageOptimizer(dpi=args.dpi, jpeg_quality=args.quality)
+    max_px = optimizer.max_pixels("portrait")
+    print(f"Largura maxima: {max_px}px (A4 retrato a {args.dpi} dpi)")
+    print(
+        f"{'imagem':<14} {'original':>10} {'reduzida':>10} {'ganho':>6} "
+        f"{'formato':>10} {'1a vez':>9} {'cache':>8}"
+    )
+
+    total_before = total_after = 0
+    for name, data, mime_type in images:
+        start = time.perf_counter()
+        optimized, optimized_mime = optimizer.optimize(data, max_px, mime_type)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        optimizer.optimize(data, max_px, mime_type)
+        cached = time.perf_counter() - start
+        total_before += len(data)
+        total_after += len(optimized)
+        print(
+            f"{name:<14} {len(data) / 1024:>8.0f}KB {len(optimized) / 1024:>8.0f}KB "
+            f"{1 - len(optimized) / len(data):>6.0%} {optimized_mime:>10} "
+            f"{first * 1000:>7.0f}ms {cached * 1000:>6.2f}ms"
+        )
+    print(
+        f"{'total':<14} {total_before / 1024:>8.0f}KB {total_after / 1024:>8.0f}KB "
+        f"{1 - total_after / total_before:>6.0%}"
+    )
+
+    if args.no_render:
+        return 0
+    try:
+        before = render(images, None, args.repetitions)
+        # Otimizador novo, sem cache: o primeiro render inclui a reducao
+        after = render(
+            images,
+            ImageOptimizer(dpi=args.dpi, jpeg_quality=args.quality),
+            args.repetitions,
+        )
+    except (ImportError, OSError) as e:
+        print(f"\nRender indisponivel (WeasyPrint/Pango): {e}")
+        return 1
+
+    print(f"\nPDF com todas as imagens (render seguinte: media de {args.repetitions}):")
+    print(f"{'':<14} {'PDF':>10} {'1o render':>10} {'seguinte':>10}")
+    for label, (first, repeated, size) in (
+        ("sem reducao", before),
+        ("com reducao", after),
+    ):
+        print(f"{label:<14} {size / 1024:>8.0f}KB {first:>9.2f}s {repeated:>9.2f}s")
+    print(
+        f"{'ganho':<14} {1 - after[2] / before[2]:>10.0%} "
+        f"{1 - after[0] / before[0]:>10.0%} {1 - after[1] / before[1]:>10.0%}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Benchmark das instâncias markdown reaproveitadas (pool) vs. criadas por uso.
+
+Converte os arquivos de exemplo do repositório várias vezes com cada
+estratégia e mostra o tempo médio por documento e o ganho do pool.
+
+Uso:
+    python scripts/benchmark_markdown_engines.py [repeticoes]
+"""
+
+import glob
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Garantir que o diretorio raiz do projeto esta no path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.markdown_converter import MarkdownConverter, _build_md_instance
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class UnpooledMarkdownConverter(MarkdownConverter):
+    """Conversor que cria uma instância markdown nova a cada uso."""
+
+    @contextmanager
+    def _md_engine(self, use_nl2br=True):
+        yield _build_md_instance(use_nl2br)
+
+
+def load_documents():
+    paths = sorted(glob.glob(os.path.join(ROOT_DIR, "EXEMPLO*.md")))
+    documents = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            documents.append((os.path.basename(path), f.read()))
+    return documents
+
+
+def measure(converter, markdown_text, repetitions):
+    converter.convert_document(markdown_text)  # aquecimento
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        converter.convert_document(markdown_text)
+    return (time.perf_counter() - start) / repetitions
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    pooled = MarkdownConverter()
+    unpooled = UnpooledMarkdownConverter()
+
+    print(f"{'documento':<36} {'sem pool':>10} {'com pool':>10} {'ganho':>8}")
+    for name, markdown_text in load_documents():
+        unpooled_time = measure(unpooled, markdown_text, repetitions)
+        pooled_time = measure(pooled, markdown_text, repetitions)
+        gain = (unpooled_time - pooled_time) / unpooled_time * 100
+        print(
+            f"{name:<36} {unpooled_time * 1000:>8.2f}ms "
+            f"{pooled_time * 1000:>8.2f}ms {gain:>7.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Benchmark do custo de preparo de cada render de PDF.
+
+Compara o caminho antigo, que montava e parseava a folha de estilo de
+impressao a cada html_to_pdf() (e criava uma FontConfiguration por
+PDFConverter), com o atual, que reaproveita a folha parseada em cache e a
+FontConfiguration unica do processo.
+
+Com --render tambem mede html_to_pdf() completo do relatorio de exemplo
+nos dois caminhos.
+
+Uso:
+    python scripts/benchmark_pdf_setup.py
+    python scripts/benchmark_pdf_setup.py --repetitions 50 --render
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Garantir que o diretorio raiz do projeto esta no path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weasyprint import CSS, HTML
+
+from utils import pdf_converter
+from utils.markdown_converter import MarkdownConverter
+from utils.pdf_converter import (
+    FontConfiguration,
+    PDFConverter,
+    print_css,
+    print_stylesheet,
+)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_PATH = os.path.join(ROOT_DIR, "EXEMPLO_RELATORIO.md")
+
+
+def measure(func, repetitions):
+    """Tempo medio de func() em segundos, apos uma chamada de aquecimento."""
+    func()
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        func()
+    return (time.perf_counter() - start) / repetitions
+
+
+def old_setup(font_config):
+    """Preparo por render do caminho antigo: CSS montado e parseado de novo."""
+    return CSS(string=print_css("portrait"), font_config=font_config)
+
+
+def new_setup():
+    """Preparo por render do caminho atual."""
+    return print_stylesheet("portrait")
+
+
+def render_old(converter, html_content, output_path):
+    HTML(string=converter._replace_css_variables(html_content)).write_pdf(
+        output_path,
+        stylesheets=[old_setup(converter.font_config)],
+        font_config=converter.font_config,
+        presentational_hints=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repetitions", type=int, default=20)
+    parser.add_argument("--render", action="store_true")
+    args = parser.parse_args()
+
+    font_config = pdf_converter.get_font_config()
+    old = measure(lambda: old_setup(font_config), args.repetitions)
+    new = measure(new_setup, args.repetitions)
+    fonts = measure(FontConfiguration, args.repetitions)
+    print(f"Preparo por render (media de {args.repetitions}):")
+    print(f"  antigo (CSS montado e parseado): {old * 1000:8.3f} ms")
+    print(f"  atual  (folha em cache):         {new * 1000:8.3f} ms")
+    print(
+        f"FontConfiguration(): {fonts * 1000:.3f} ms, antes por PDFConverter, "
+        "agora uma vez por processo"
+    )
+
+    if not args.render:
+        return 0
+
+    with open(SAMPLE_PATH, encoding="utf-8") as f:
+        html_content = MarkdownConverter().convert(f.read())
+    html_content = f"<html><body>{html_content}</body></html>"
+
+    converter = PDFConverter()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, "saida.pdf")
+        old = measure(
+            lambda: render_old(converter, html_content, output_path), args.repetitions
+        )
+        new = measure(
+            lambda: converter.html_to_pdf(html_content, output_path),
+            args.repetitions,
+        )
+    print(f"html_to_pdf() de {os.path.basename(SAMPLE_PATH)}:")
+    print(f"  antigo: {old * 1000:8.1f} ms")
+    print(f"  atual:  {new * 1000:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
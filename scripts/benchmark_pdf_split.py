@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Benchmark do render de PDF por secoes em paralelo.
+
+Multiplica o EXEMPLO_RELATORIO_COMPLETO.md (--scale vezes) para montar um
+relatorio grande, renderiza o HTML final com o template e mede o tempo de
+parede do PDF:
+
+- 1 processo: um unico write_pdf(), como no caminho padrao;
+- N processos: split_report() em N partes, render no pool e merge_pdfs().
+
+Os recursos externos (fontes, logo) vem do cache de recursos, para que a
+rede nao entre na medicao.
+
+Uso:
+    python scripts/benchmark_pdf_split.py
+    python scripts/benchmark_pdf_split.py --scale 60 --workers 1 --workers 4
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+# Garantir que o diretorio raiz do projeto esta no path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from pypdf import PdfReader
+
+from config import Config
+from utils import pdf_converter
+from utils.asset_cache import asset_cache
+from utils.conversion_pipeline import ConversionPipeline
+from utils.markdown_converter import MarkdownConverter
+from utils.pdf_converter import PDFConverter
+from utils.theme_manager import ThemeManager
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_PATH = os.path.join(ROOT_DIR, "EXEMPLO_RELATORIO_COMPLETO.md")
+
+
+def default_workers():
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+
+def render_report(scale, theme):
+    """HTML final (template + CSS do tema) do exemplo repetido scale vezes."""
+    templates_folder = os.path.join(ROOT_DIR, Config.TEMPLATES_FOLDER)
+    env = Environment(
+        loader=FileSystemLoader(templates_folder),
+        autoescape=select_autoescape(["html"]),
+    )
+    pipeline = ConversionPipeline(
+        MarkdownConverter(),
+        theme_manager=ThemeManager(templates_folder=templates_folder),
+        render=lambda name, **context: env.get_template(name).render(**context),
+    )
+    with open(SAMPLE_PATH, encoding="utf-8") as f:
+        markdown_text = f.read()
+    markdown_text = "\n\n".join([markdown_text] * scale)
+    ctx = pipeline.run(pipeline.context(markdown_text, theme, persist=False))
+    return ctx.rendered_html, ctx.theme_config
+
+
+def measure(converter, html_content, theme_config, repetitions):
+    """Melhor tempo de parede entre as repeticoes, apos um render de aquecimento."""
+    content = converter.html_to_pdf_bytes(html_content, "portrait", theme_config)
+    best = None
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        converter.html_to_pdf_bytes(html_content, "portrait", theme_config)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(PdfReader(io.BytesIO(content)).pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--scale", type=int, default=30)
+    parser.add_argument("--theme", default="juridico")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        action="append",
+        help="Pode ser repetido (padrao: 1, 2, 4... ate o numero de CPUs)",
+    )
+    parser.add_argument("--repetitions", type=int, default=3)
+    args = parser.parse_args()
+
+    html_content, theme_config = render_report(args.scale, args.theme)
+    print(
+        f"{os.path.basename(SAMPLE_PATH)} x{args.scale}: "
+        f"{len(html_content) / 1024:.0f} KB de HTML, {os.cpu_count()} CPU(s)"
+    )
+    print(f"{'processos':>9}  {'paginas':>7}  {'tempo':>8}  {'speedup':>7}")
+
+    baseline = None
+    for workers in args.workers or default_workers():
+        if workers == 1:
+            converter = PDFConverter(
+                asset_cache=asset_cache, render_timeout=Config.PDF_RENDER_TIMEOUT
+            )
+        else:
+            pdf_converter.start_render_pool(workers)
+            converter = PDFConverter(
+                asset_cache=asset_cache,
+                render_workers=workers,
+                render_timeout=Config.PDF_RENDER_TIMEOUT,
+                split_min_chars=1,
+            )
+        try:
+            seconds, pages = measure(
+                converter, html_content, theme_config, args.repetitions
+            )
+        finally:
+            if workers > 1:
+                pdf_converter._reset_render_pool(pdf_converter.get_render_pool(workers))
+        baseline = baseline or seconds
+        print(
+            f"{workers:>9}  {pages:>7}  {seconds:>7.2f}s  {baseline / seconds:>6.2f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
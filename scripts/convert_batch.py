@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""Conversao em lote de uma pasta de relatorios markdown para HTML e/ou PDF.
+
+Percorre a pasta de entrada (arquivos .md, .txt e .markdown) e grava os
+resultados na pasta de saida com a mesma estrutura de subpastas. Usa o
+mesmo ConversionPipeline das rotas, sem HTTP, autenticacao ou Supabase,
+em N processos.
+
+Arquivos cujo conteudo e configuracao (tema, formatos, orientacao,
+template, codigo do conversor) nao mudaram desde a ultima execucao sao
+pulados: o hash de cada entrada fica no manifesto .convert_batch.json
+dentro da pasta de saida.
+
+Uso:
+    python scripts/convert_batch.py relatorios/ saida/
+    python scripts/convert_batch.py relatorios/ saida/ --format pdf --workers 8
+    python scripts/convert_batch.py relatorios/ saida/ --format html --format pdf \\
+        --theme juridico --orientation landscape --force
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Garantir que o diretorio raiz do projeto esta no path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from config import Config
+from utils.conversion_cache import CACHE_VERSION, converter_source_hash
+from utils.conversion_pipeline import STAGES, ConversionPipeline
+from utils.markdown_converter import MarkdownConverter
+from utils.theme_manager import REPORT_CSS_TEMPLATE, ThemeManager
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_NAME = ".convert_batch.json"
+# Grava o manifesto a cada N conversoes, para nao perder o progresso de
+# execucoes longas interrompidas
+MANIFEST_EVERY = 50
+# Intervalo minimo entre linhas de progresso
+PROGRESS_SECONDS = 5.0
+
+
+# ========== ENTRADAS ==========
+
+
+def find_inputs(input_dir):
+    """Caminhos relativos dos arquivos markdown da pasta, em ordem."""
+    inputs = []
+    for root, dirs, files in os.walk(input_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if Config.allowed_file(name):
+                path = os.path.join(root, name)
+                inputs.append(os.path.relpath(path, input_dir))
+    return inputs
+
+
+def output_paths(output_dir, rel_path, formats):
+    """Arquivo de saida de cada formato, com a extensao trocada."""
+    base = os.path.splitext(os.path.join(output_dir, rel_path))[0]
+    return {file_type: f"{base}.{file_type}" for file_type in formats}
+
+
+def settings_fingerprint(theme_config, formats, orientation, backend):
+    """Hash de tudo, alem do markdown, que muda o resultado da conversao."""
+    template = hashlib.sha256()
+    for name in ("base.html", REPORT_CSS_TEMPLATE):
+        with open(os.path.join(ROOT_DIR, Config.TEMPLATES_FOLDER, name), "rb") as f:
+            template.update(f.read())
+    payload = json.dumps(
+        {
+            "version": CACHE_VERSION,
+            "theme": theme_config,
+            "formats": sorted(formats),
+            "orientation": orientation,
+            "postprocess_backend": backend,
+            "template": template.hexdigest(),
+            "converter": converter_source_hash(),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def content_hash(path, fingerprint):
+    digest = hashlib.sha256(fingerprint.encode("ascii"))
+    with open(path, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(output_dir, manifest):
+    """Grava o manifesto de forma atomica."""
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, sort_keys=True, indent=0)
+    os.replace(tmp_path, os.path.join(output_dir, MANIFEST_NAME))
+
+
+# ========== WORKERS ==========
+
+_pipeline = None
+_options = None
+
+
+def _init_worker(theme, formats, orientation, backend):
+    """Cria o pipeline do processo; o PDFConverter só é importado se for usado."""
+    global _pipeline, _options
+
+    pdf_converter = None
+    if "pdf" in formats:
+        from utils.asset_cache import asset_cache
+        from utils.image_optimizer import image_optimizer
+        from utils.pdf_converter import PDFConverter
+
+        pdf_converter = PDFConverter(
+            asset_cache=asset_cache, image_optimizer=image_optimizer
+        )
+
+    env = Environment(
+        loader=FileSystemLoader(os.path.join(ROOT_DIR, Config.TEMPLATES_FOLDER)),
+        autoescape=select_autoescape(["html"]),
+    )
+    _pipeline = ConversionPipeline(
+        MarkdownConverter(postprocess_backend=backend),
+        theme_manager=ThemeManager(
+            templates_folder=os.path.join(ROOT_DIR, Config.TEMPLATES_FOLDER),
+            custom_themes_folder=Config.CUSTOM_THEMES_FOLDER,
+        ),
+        pdf_converter=pdf_converter,
+        render=lambda name, **context: env.get_template(name).render(**context),
+    )
+    _options = {"theme_name": theme, "formats": formats, "orientation": orientation}
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def convert_file(input_path, outputs):
+    """
+    Converte um arquivo e grava as saídas.
+
+    Returns:
+        (bytes de entrada, tempos por estágio, mensagem de erro ou None)
+    """
+    try:
+        with open(input_path, encoding="utf-8") as f:
+            markdown_text = f.read()
+        ctx = _pipeline.run(_pipeline.context(markdown_text, **_options, persist=False))
+        if "html" in outputs:
+            _write_atomic(outputs["html"], ctx.rendered_html.encode("utf-8"))
+        if "pdf" in outputs:
+            _write_atomic(outputs["pdf"], ctx.pdf_content)
+        return len(markdown_text.encode("utf-8")), ctx.timings, None
+    except Exception as e:
+        return 0, {}, f"{type(e).__name__}: {e}"
+
+
+# ========== EXECUÇÃO ==========
+
+
+def convert_tree(
+    input_dir,
+    output_dir,
+    theme="juridico",
+    formats=("html",),
+    orientation="portrait",
+    workers=None,
+    backend="html.parser",
+    force=False,
+    log=print,
+):
+    """
+    Converte a pasta inteira, pulando entradas inalteradas.
+
+    Returns:
+        dict com as estatísticas da execução
+    """
+    start = time.perf_counter()
+    formats = tuple(sorted(set(formats)))
+    os.makedirs(output_dir, exist_ok=True)
+
+    theme_config = ThemeManager(
+        templates_folder=os.path.join(ROOT_DIR, Config.TEMPLATES_FOLDER),
+        custom_themes_folder=Config.CUSTOM_THEMES_FOLDER,
+    ).get_theme_config(theme.lower().strip())
+    fingerprint = settings_fingerprint(theme_config, formats, orientation, backend)
+    manifest = {} if force else load_manifest(output_dir)
+
+    pending = []
+    skipped = 0
+    for rel_path in find_inputs(input_dir):
+        input_path = os.path.join(input_dir, rel_path)
+        outputs = output_paths(output_dir, rel_path, formats)
+        digest = content_hash(input_path, fingerprint)
+        if manifest.get(rel_path) == digest and all(
+            os.path.exists(path) for path in outputs.values()
+        ):
+            skipped += 1
+            continue
+        pending.append((rel_path, input_path, outputs, digest))
+
+    log(f"{len(pending)} arquivo(s) para converter, {skipped} inalterado(s).")
+
+    stats = {
+        "converted": 0,
+        "skipped": skipped,
+        "failed": [],
+        "input_bytes": 0,
+        "stage_seconds": dict.fromkeys(STAGES, 0.0),
+    }
+    workers = workers or os.cpu_count() or 1
+    last_progress = time.perf_counter()
+
+    def record(rel_path, digest, result):
+        nonlocal last_progress
+        input_bytes, timings, error = result
+        if error:
+            stats["failed"].append((rel_path, error))
+            log(f"  ERRO {rel_path}: {error}")
+            return
+        manifest[rel_path] = digest
+        stats["converted"] += 1
+        stats["input_bytes"] += input_bytes
+        for stage, seconds in timings.items():
+            stats["stage_seconds"][stage] += seconds
+        if stats["converted"] % MANIFEST_EVERY == 0:
+            save_manifest(output_dir, manifest)
+        now = time.perf_counter()
+        if now - last_progress >= PROGRESS_SECONDS:
+            last_progress = now
+            done = stats["converted"] + len(stats["failed"])
+            rate = stats["converted"] / (now - start)
+            log(f"  {done}/{len(pending)} ({rate:.1f} arquivos/s)")
+
+    init_args = (theme, formats, orientation, backend)
+    if workers == 1:
+        _init_worker(*init_args)
+        for rel_path, input_path, outputs, digest in pending:
+            record(rel_path, digest, convert_file(input_path, outputs))
+    elif pending:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=init_args
+        ) as executor:
+            futures = {
+                executor.submit(convert_file, input_path, outputs): (rel_path, digest)
+                for rel_path, input_path, outputs, digest in pending
+            }
+            for future in as_completed(futures):
+                record(*futures[future], future.result())
+
+    save_manifest(output_dir, manifest)
+    stats["seconds"] = time.perf_counter() - start
+    stats["workers"] = workers
+    return stats
+
+
+def print_stats(stats, log=print):
+    seconds = stats["seconds"]
+    converted = stats["converted"]
+    log("")
+    log(f"Convertidos: {converted}")
+    log(f"Inalterados: {stats['skipped']}")
+    log(f"Falhas:      {len(stats['failed'])}")
+    log(f"Tempo total: {seconds:.1f}s com {stats['workers']} processo(s)")
+    if converted and seconds > 0:
+        log(
+            f"Vazao:       {converted / seconds:.2f} arquivos/s, "
+            f"{stats['input_bytes'] / seconds / 1024 / 1024:.2f} MB/s de markdown"
+        )
+        log("Tempo medio por arquivo e estagio (soma dos processos):")
+        for stage, total in stats["stage_seconds"].items():
+            if total:
+                log(f"  {stage:<12} {total / converted * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("input_dir")
+    parser.add_argument("output_dir")
+    parser.add_argument("--theme", default="juridico")
+    parser.add_argument(
+        "--format",
+        dest="formats",
+        action="append",
+        choices=["html", "pdf"],
+        help="Pode ser repetido (padrao: html)",
+    )
+    parser.add_argument(
+        "--orientation", default="portrait", choices=["portrait", "landscape"]
+    )
+    parser.add_argument(
+        "--workers", type=int, default=0, help="Processos (padrao: numero de CPUs)"
+    )
+    parser.add_argument(
+        "--backend",
+        default=Config.CONVERT_POSTPROCESS_BACKEND,
+        choices=["html.parser", "lxml"],
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Converte tudo, ignorando o manifesto"
+    )
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.input_dir):
+        print(f"Diretorio nao encontrado: {args.input_dir}")
+        return 1
+
+    stats = convert_tree(
+        args.input_dir,
+        args.output_dir,
+        theme=args.theme,
+        formats=args.formats or ["html"],
+        orientation=args.orientation,
+        workers=args.workers or None,
+        backend=args.backend,
+        force=args.force,
+    )
+    print_stats(stats)
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
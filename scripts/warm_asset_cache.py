@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Baixa os recursos externos dos PDFs (Font Awesome, fontes, logos dos temas).
+
+Renderiza o relatorio de exemplo em PDF com cada tema, o que faz o
+WeasyPrint pedir todos os recursos referenciados, e grava cada um no cache
+de recursos. Com --bundle grava em templates/assets, que vai junto com o
+codigo e e usado inclusive no modo offline (PDF_OFFLINE=1).
+
+Uso:
+    python scripts/warm_asset_cache.py
+    python scripts/warm_asset_cache.py --bundle
+    python scripts/warm_asset_cache.py --theme juridico --theme corporativo
+"""
+
+import argparse
+import os
+import sys
+
+# Garantir que o diretorio raiz do projeto esta no path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from config import Config
+from utils.asset_cache import AssetCache
+from utils.conversion_pipeline import ConversionPipeline
+from utils.markdown_converter import MarkdownConverter
+from utils.pdf_converter import PDFConverter
+from utils.theme_manager import ThemeManager
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_PATH = os.path.join(ROOT_DIR, "EXEMPLO_RELATORIO.md")
+
+
+class RecordingCache(AssetCache):
+    """AssetCache que anota cada URL pedida e se ela foi obtida."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.results = {}
+
+    def fetch(self, url):
+        try:
+            result = super().fetch(url)
+        except Exception as e:
+            self.results[url] = f"ERRO {type(e).__name__}: {e}"
+            raise
+        if url.startswith(("http://", "https://")):
+            self.results[url] = f"{len(result['string'])} bytes"
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--theme", dest="themes", action="append", help="Padrao: todos os temas"
+    )
+    parser.add_argument(
+        "--bundle",
+        action="store_true",
+        help=f"Grava em {Config.ASSET_BUNDLE_FOLDER} em vez do cache de recursos",
+    )
+    args = parser.parse_args()
+
+    templates_folder = os.path.join(ROOT_DIR, Config.TEMPLATES_FOLDER)
+    folder = (
+        os.path.join(ROOT_DIR, Config.ASSET_BUNDLE_FOLDER)
+        if args.bundle
+        else Config.ASSET_CACHE_FOLDER
+    )
+    # ttl=0: sempre baixa de novo, atualizando o que ja estiver gravado
+    cache = RecordingCache(
+        cache_folder=folder,
+        ttl=0,
+        max_disk_bytes=Config.ASSET_CACHE_MAX_BYTES,
+        timeout=Config.ASSET_FETCH_TIMEOUT * 4,
+    )
+
+    theme_manager = ThemeManager(
+        templates_folder=templates_folder,
+        custom_themes_folder=Config.CUSTOM_THEMES_FOLDER,
+    )
+    env = Environment(
+        loader=FileSystemLoader(templates_folder),
+        autoescape=select_autoescape(["html"]),
+    )
+    pipeline = ConversionPipeline(
+        MarkdownConverter(),
+        theme_manager=theme_manager,
+        pdf_converter=PDFConverter(asset_cache=cache),
+        render=lambda name, **context: env.get_template(name).render(**context),
+    )
+
+    with open(SAMPLE_PATH, encoding="utf-8") as f:
+        markdown_text = f.read()
+
+    for theme in args.themes or sorted(theme_manager.list_themes()):
+        print(f"Tema {theme}...")
+        pipeline.run(
+            pipeline.context(markdown_text, theme, formats=("pdf",), persist=False)
+        )
+
+    print(f"\nRecursos em {folder}:")
+    for url, result in sorted(cache.results.items()):
+        print(f"  {result:>14}  {url}")
+    failed = [url for url, result in cache.results.items() if result.startswith("ERRO")]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 """Fixtures para testes pytest."""
 
 import os
+import shutil
 import sys
 import tempfile
 from unittest.mock import MagicMock
@@ -10,14 +11,41 @@ import pytest
 # Adicionar o diretório raiz ao path para importar os módulos
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app import create_app
+from utils.conversion_cache import ConversionCache
 from utils.markdown_converter import MarkdownConverter
 from utils.theme_manager import ThemeManager
 
 
+def pytest_configure(config):
+    """
+    Pastas de dados (uploads, temas, caches) fora do data/ do projeto. Roda
+    antes da coleta, que importa o app e o Config; assim os testes não leem
+    caches de execuções anteriores nem deixam arquivos no projeto.
+    """
+    os.environ["DATA_FOLDER"] = tempfile.mkdtemp(prefix="axion-tests-")
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(os.environ["DATA_FOLDER"], ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def conversion_cache(monkeypatch, tmp_path):
+    """Cache de conversões vazio por teste, fora de data/cache."""
+    from routes import convert_routes
+
+    cache = ConversionCache(
+        cache_folder=str(tmp_path / "conversion_cache"), max_disk_bytes=1024 * 1024
+    )
+    monkeypatch.setattr(convert_routes.pipeline, "cache", cache)
+    return cache
+
+
 @pytest.fixture
 def app():
     """Cria uma instância da aplicação Flask para testes."""
+    from app import create_app
+
     flask_app = create_app()
     flask_app.config.update(
         {
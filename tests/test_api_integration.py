@@ -1,6 +1,7 @@
 """Testes de integração para a API Flask."""
 
 import io
+from unittest.mock import MagicMock
 
 AUTH_HEADER = {"Authorization": "Bearer mock-token"}
 
@@ -69,6 +70,33 @@ class TestAPIConvert:
             assert data["success"] is True
             assert f"Conteúdo do relatório {i}" in data["html"]
 
+    def test_convert_repeated_markdown_uses_cache(
+        self, client, sample_markdown, mock_auth, mock_supabase, monkeypatch
+    ):
+        """Testa que markdown e tema repetidos não são convertidos de novo."""
+        from routes import convert_routes
+
+        calls = []
+        original = convert_routes.converter.parse
+        monkeypatch.setattr(
+            convert_routes.converter,
+            "parse",
+            lambda text, **kw: calls.append(text) or original(text, **kw),
+        )
+
+        responses = [
+            client.post(
+                "/api/convert",
+                json={"markdown": sample_markdown, "theme": "juridico"},
+                headers=AUTH_HEADER,
+            )
+            for _ in range(2)
+        ]
+
+        assert all(r.status_code == 200 for r in responses)
+        assert responses[0].get_json()["html"] == responses[1].get_json()["html"]
+        assert len(calls) == 1
+
     def test_convert_requires_auth(self, client):
         """Testa que conversão requer autenticação."""
         response = client.post(
@@ -78,6 +106,47 @@ class TestAPIConvert:
         assert response.status_code == 401
 
 
+class TestAPIConvertPreview:
+    """Testes para o endpoint /api/convert/preview."""
+
+    def test_preview_does_not_persist(
+        self, client, sample_markdown, mock_auth, monkeypatch
+    ):
+        """Testa que o preview não grava no Storage nem em documentos."""
+
+        def fail(*args, **kwargs):
+            raise AssertionError("preview não deve chamar o Supabase")
+
+        for name in ("upload_file", "create_documento", "get_signed_url"):
+            monkeypatch.setattr(f"utils.supabase_client.supa_service.{name}", fail)
+
+        responses = [
+            client.post(
+                "/api/convert/preview",
+                json={"markdown": sample_markdown, "theme": "juridico"},
+                headers=AUTH_HEADER,
+            )
+            for _ in range(2)
+        ]
+
+        assert all(r.status_code == 200 for r in responses)
+        first, second = (r.get_json() for r in responses)
+        assert "Seção 1" in first["html"]
+        assert first["metadata"]["title"] == "Relatório de Teste"
+        assert "document_id" not in first
+        assert first["metadata"]["cached"] is False
+        assert second["metadata"]["cached"] is True
+        assert second["html"] == first["html"]
+
+    def test_preview_without_markdown(self, client, mock_auth):
+        """Testa erro quando markdown não é fornecido."""
+        response = client.post(
+            "/api/convert/preview", json={"theme": "juridico"}, headers=AUTH_HEADER
+        )
+
+        assert response.status_code == 400
+
+
 class TestAPIConvertFile:
     """Testes para o endpoint /api/convert/file."""
 
@@ -131,6 +200,102 @@ class TestAPIConvertFile:
         assert response.status_code == 400
 
 
+class TestAPIGeneratePdf:
+    """Testes para o endpoint /api/generate-pdf/<document_id>."""
+
+    HTML = "<html><head><title>T</title></head><body>Relatório</body></html>"
+
+    def mock_document(self, monkeypatch, existing, custom_config=None):
+        monkeypatch.setattr(
+            "utils.supabase_client.supa_service.get_documento",
+            lambda doc_id: {
+                "id": doc_id,
+                "file_type": "html",
+                "storage_path": "html/a.html",
+                "processo_id": "p1",
+                "title": "T",
+                "theme": "juridico",
+                "custom_config": custom_config,
+            },
+        )
+        monkeypatch.setattr(
+            "urllib.request.urlopen", lambda url: io.BytesIO(self.HTML.encode())
+        )
+        lookups = []
+
+        def find(fingerprint, processo_id=None):
+            lookups.append((fingerprint, processo_id))
+            return existing
+
+        monkeypatch.setattr(
+            "utils.supabase_client.supa_service.find_pdf_by_fingerprint", find
+        )
+        return lookups
+
+    def test_records_fingerprint(self, client, mock_auth, mock_supabase, monkeypatch):
+        """Testa que o PDF novo é registrado com o fingerprint do render."""
+        lookups = self.mock_document(monkeypatch, existing=None)
+        created = []
+        monkeypatch.setattr(
+            "utils.supabase_client.supa_service.create_documento",
+            lambda data: created.append(data) or MagicMock(data=[{"id": "novo"}]),
+        )
+
+        response = client.get(
+            "/api/generate-pdf/doc-html?orientation=landscape", headers=AUTH_HEADER
+        )
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["cached"] is False
+        assert data["document_id"] == "novo"
+        assert lookups[0][1] == "p1"
+        assert created[0]["render_fingerprint"] == lookups[0][0]
+
+    def test_reuses_existing_pdf(self, client, mock_auth, mock_supabase, monkeypatch):
+        """Testa que um render repetido retorna o PDF existente sem novo upload."""
+        self.mock_document(
+            monkeypatch,
+            existing={
+                "id": "pdf-existente",
+                "filename": "relatorio.pdf",
+                "storage_path": "pdf/b.pdf",
+            },
+        )
+
+        def fail(*args, **kwargs):
+            raise AssertionError("PDF existente não deve ser gerado de novo")
+
+        monkeypatch.setattr("utils.supabase_client.supa_service.upload_file", fail)
+
+        response = client.get("/api/generate-pdf/doc-html", headers=AUTH_HEADER)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["cached"] is True
+        assert data["document_id"] == "pdf-existente"
+        assert data["pdf_download_url"] == "/api/download/pdf-existente"
+
+    def test_fingerprint_includes_custom_config(
+        self, client, mock_auth, mock_supabase, monkeypatch
+    ):
+        """Testa que custom_config diferentes não reaproveitam o mesmo PDF."""
+        existing = {"id": "pdf", "filename": "a.pdf", "storage_path": "pdf/a.pdf"}
+        fingerprints = []
+        for custom_config in (
+            None,
+            {"colors": {"primary": "#123456"}},
+            {"colors": {"primary": "#654321"}},
+            {"fonts": {"body": "Arial"}},
+        ):
+            lookups = self.mock_document(monkeypatch, existing, custom_config)
+            response = client.get("/api/generate-pdf/doc-html", headers=AUTH_HEADER)
+            assert response.status_code == 200
+            fingerprints.append(lookups[0][0])
+
+        assert len(set(fingerprints)) == 4
+
+
 class TestAPIThemes:
     """Testes para os endpoints de temas."""
 
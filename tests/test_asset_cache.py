@@ -0,0 +1,106 @@
+"""Testes para o cache de recursos externos dos PDFs."""
+
+import pytest
+
+from utils.asset_cache import AssetCache
+
+CSS_URL = "https://cdn.example.com/all.min.css"
+
+
+class FakeFetcher:
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    def __call__(self, url, timeout=None):
+        self.calls.append(url)
+        if self.fail:
+            raise OSError("rede indisponível")
+        return {
+            "string": f"/* {url} {len(self.calls)} */".encode(),
+            "mime_type": "text/css",
+            "encoding": "utf-8",
+            "redirected_url": url,
+        }
+
+
+@pytest.fixture
+def fetcher():
+    return FakeFetcher()
+
+
+@pytest.fixture
+def make_cache(tmp_path, fetcher):
+    def make(**kwargs):
+        kwargs.setdefault("cache_folder", str(tmp_path / "cache"))
+        return AssetCache(fetcher=fetcher, **kwargs)
+
+    return make
+
+
+class TestAssetCache:
+    """Testes para o TTL, o disco, o bundle e o modo offline."""
+
+    def test_fetches_once_and_persists(self, make_cache, fetcher):
+        """Testa que a URL é baixada uma vez e reaproveitada por outro processo."""
+        first = make_cache().fetch(CSS_URL)
+        again = make_cache().fetch(CSS_URL)
+
+        assert fetcher.calls == [CSS_URL]
+        assert again == first
+        assert first["mime_type"] == "text/css"
+
+    def test_expired_entry_is_refreshed(self, make_cache, fetcher):
+        """Testa que uma cópia vencida é baixada de novo."""
+        cache = make_cache(ttl=0)
+        first = cache.fetch(CSS_URL)
+        second = cache.fetch(CSS_URL)
+
+        assert len(fetcher.calls) == 2
+        assert second["string"] != first["string"]
+
+    def test_stale_copy_when_network_fails(self, make_cache, fetcher):
+        """Testa a cópia vencida na falha e a pausa antes de tentar de novo."""
+        cache = make_cache(ttl=0)
+        first = cache.fetch(CSS_URL)
+        fetcher.fail = True
+
+        assert cache.fetch(CSS_URL) == first
+        assert cache.fetch(CSS_URL) == first
+        assert len(fetcher.calls) == 2
+
+        with pytest.raises(OSError):
+            cache.fetch("https://cdn.example.com/outro.css")
+
+    def test_offline_serves_only_cache_and_bundle(self, make_cache, fetcher, tmp_path):
+        """Testa que o modo offline nunca usa a rede."""
+        make_cache(ttl=0).fetch(CSS_URL)
+        bundled = "https://cdn.example.com/fonte.woff2"
+        make_cache(cache_folder=str(tmp_path / "bundle")).fetch(bundled)
+        fetcher.calls.clear()
+
+        offline = make_cache(
+            ttl=0, offline=True, bundle_folder=str(tmp_path / "bundle")
+        )
+        assert offline.fetch(CSS_URL)["mime_type"] == "text/css"
+        assert offline.fetch(bundled)["mime_type"] == "text/css"
+        with pytest.raises(ValueError):
+            offline.fetch("https://cdn.example.com/ausente.css")
+        assert fetcher.calls == []
+
+    def test_local_urls_bypass_cache(self, make_cache, fetcher, tmp_path):
+        """Testa que data: e file: vão direto para o fetcher, sem gravar."""
+        cache = make_cache(offline=True)
+        cache.fetch("data:text/css,p{}")
+
+        assert fetcher.calls == ["data:text/css,p{}"]
+        assert not (tmp_path / "cache").exists()
+
+    def test_disk_limit(self, make_cache):
+        """Testa que o disco é podado ao passar do limite."""
+        cache = make_cache(max_disk_bytes=600)
+        for i in range(10):
+            cache.fetch(f"https://cdn.example.com/{i}.css")
+
+        assert cache._disk_bytes <= 600
+        assert len(cache._disk_entries()) < 10
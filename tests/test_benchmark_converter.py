@@ -0,0 +1,111 @@
+"""Testes para os gates da suite de benchmark do conversor."""
+
+from scripts.benchmark_converter import (
+    WORKLOADS,
+    check_results,
+    growth_exponent,
+    run_benchmarks,
+)
+
+
+def make_results(seconds, scales=(1, 2, 4, 8), noise=None):
+    sizes = [1000 * scale for scale in scales]
+    results = {
+        "calibration_seconds": 1.0,
+        "results": {
+            "exemplos": {
+                "convert": {
+                    "scales": list(scales),
+                    "sizes": sizes,
+                    "seconds": seconds,
+                    "normalized": seconds,
+                    "exponent": growth_exponent(sizes, seconds),
+                }
+            }
+        },
+    }
+    if noise is not None:
+        results["results"]["exemplos"]["convert"]["noise"] = noise
+    return results
+
+
+class TestBenchmarkGates:
+    """Testes para o cálculo de crescimento e comparação com o baseline."""
+
+    def test_growth_exponent_linear_and_quadratic(self):
+        """Testa o expoente do ajuste log-log."""
+        sizes = [1000, 2000, 4000, 8000]
+
+        linear = growth_exponent(sizes, [0.01, 0.02, 0.04, 0.08])
+        quadratic = growth_exponent(sizes, [0.01, 0.04, 0.16, 0.64])
+
+        assert abs(linear - 1.0) < 0.01
+        assert abs(quadratic - 2.0) < 0.01
+
+    def test_growth_exponent_ignores_one_noisy_scale(self):
+        """Testa que uma escala isolada mais lenta não muda o expoente."""
+        sizes = [1000, 2000, 4000, 8000, 16000]
+
+        exponent = growth_exponent(sizes, [0.01, 0.02, 0.04, 0.08, 0.32])
+
+        assert abs(exponent - 1.0) < 0.01
+
+    def test_growth_exponent_ignores_noise_level_times(self):
+        """Testa que tempos abaixo do limite de ruído não entram no ajuste."""
+        assert growth_exponent([1, 2, 4], [0.0001, 0.0002, 0.0004]) is None
+
+    def test_check_results_flags_super_linear_stage(self):
+        """Testa o gate de crescimento super-linear."""
+        current = make_results([0.01, 0.04, 0.16, 0.64])
+
+        failures = check_results(current, None, max_exponent=1.3, tolerance=0.5)
+
+        assert len(failures) == 1
+        assert "super-linear" in failures[0]
+
+    def test_check_results_compares_with_baseline(self):
+        """Testa o gate de regressão contra o baseline."""
+        baseline = make_results([0.01, 0.02, 0.04, 0.08])
+
+        same = make_results([0.01, 0.02, 0.04, 0.09])
+        slower = make_results([0.02, 0.04, 0.08, 0.16])
+
+        assert check_results(same, baseline, 1.3, 0.5) == []
+        failures = check_results(slower, baseline, 1.3, 0.5)
+        assert len(failures) == 1
+        assert "baseline" in failures[0]
+
+    def test_check_results_uses_median_across_scales(self):
+        """Testa que uma escala isolada mais lenta não reprova a etapa."""
+        baseline = make_results([0.01, 0.02, 0.04, 0.08])
+        one_slow_scale = make_results([0.01, 0.02, 0.04, 0.16])
+
+        assert check_results(one_slow_scale, baseline, 1.3, 0.5) == []
+
+    def test_check_results_allows_measured_noise(self):
+        """Testa que o ruído medido da etapa soma à tolerância."""
+        baseline = make_results([0.01, 0.02, 0.04, 0.08], noise=[0.0] * 4)
+        slower = make_results([0.017, 0.034, 0.068, 0.136], noise=[0.0] * 4)
+        noisy = make_results([0.017, 0.034, 0.068, 0.136], noise=[0.3] * 4)
+
+        assert len(check_results(slower, baseline, 1.3, 0.5)) == 1
+        assert check_results(noisy, baseline, 1.3, 0.5) == []
+
+    def test_check_results_ignores_noise_level_times(self):
+        """Testa que escalas abaixo do limite de ruído ficam fora do gate."""
+        baseline = make_results([0.001, 0.002, 0.003, 0.004])
+        slower = make_results([0.002, 0.004, 0.006, 0.008])
+
+        assert check_results(slower, baseline, 1.3, 0.5) == []
+
+    def test_run_benchmarks_small_scales(self):
+        """Testa uma execução curta da suite com todas as cargas."""
+        current = run_benchmarks(
+            [1, 2], stages=["convert", "extract_metadata"], log=lambda _msg: None
+        )
+
+        assert set(current["results"]) == set(WORKLOADS)
+        for stages in current["results"].values():
+            assert set(stages) == {"convert", "extract_metadata"}
+            assert len(stages["convert"]["seconds"]) == 2
+            assert all(noise >= 0 for noise in stages["convert"]["noise"])
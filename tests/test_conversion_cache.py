@@ -0,0 +1,80 @@
+"""Testes para o ConversionCache."""
+
+import os
+
+from utils.conversion_cache import ConversionCache, converter_source_hash
+
+
+class TestConversionCache:
+    """Testes para o cache de conversões em memória e disco."""
+
+    def test_key_depends_on_all_inputs(self):
+        """Testa que a chave muda com markdown, tema, custom_config e opções."""
+        base = ConversionCache.make_key("# A", {"name": "juridico"}, {}, {"x": 1})
+
+        assert base == ConversionCache.make_key(
+            "# A", {"name": "juridico"}, {}, {"x": 1}
+        )
+        assert base != ConversionCache.make_key(
+            "# B", {"name": "juridico"}, {}, {"x": 1}
+        )
+        assert base != ConversionCache.make_key(
+            "# A", {"name": "corporativo"}, {}, {"x": 1}
+        )
+        assert base != ConversionCache.make_key(
+            "# A", {"name": "juridico"}, {"colors": {"primary": "#000"}}, {"x": 1}
+        )
+        assert base != ConversionCache.make_key(
+            "# A", {"name": "juridico"}, {}, {"x": 2}
+        )
+
+    def test_converter_source_hash(self):
+        """Testa que o hash do código do conversor cobre todos os módulos."""
+        full = converter_source_hash()
+
+        assert full == converter_source_hash()
+        assert full != converter_source_hash(("markdown_converter.py",))
+
+    def test_memory_lru_eviction(self):
+        """Testa que o LRU em memória descarta a entrada menos usada."""
+        cache = ConversionCache(max_entries=2)
+        cache.set("a", {"v": 1})
+        cache.set("b", {"v": 2})
+        cache.get("a")
+        cache.set("c", {"v": 3})
+
+        assert cache.get("a") == {"v": 1}
+        assert cache.get("b") is None
+        assert cache.get("c") == {"v": 3}
+
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        """Testa que outra instância (ex: worker reiniciado) lê o disco."""
+        ConversionCache(str(tmp_path), max_disk_bytes=1024 * 1024).set(
+            "abcdef", {"rendered_html": "<p>x</p>"}
+        )
+
+        other = ConversionCache(str(tmp_path), max_disk_bytes=1024 * 1024)
+
+        assert other.get("abcdef") == {"rendered_html": "<p>x</p>"}
+
+    def test_disk_tier_is_size_capped(self, tmp_path):
+        """Testa que o disco é podado quando passa do limite."""
+        cache = ConversionCache(str(tmp_path), max_entries=1, max_disk_bytes=2000)
+        for i in range(10):
+            cache.set(f"{i:02d}key", {"rendered_html": "x" * 500})
+
+        total = sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _dirs, files in os.walk(tmp_path)
+            for name in files
+        )
+        assert total <= 2000
+        assert cache.get("09key") is not None
+
+    def test_clear(self, tmp_path):
+        """Testa que clear esvazia memória e disco."""
+        cache = ConversionCache(str(tmp_path), max_disk_bytes=1024 * 1024)
+        cache.set("abcdef", {"v": 1})
+        cache.clear()
+
+        assert cache.get("abcdef") is None
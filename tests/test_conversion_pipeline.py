@@ -0,0 +1,142 @@
+"""Testes para o ConversionPipeline."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from utils.conversion_cache import ConversionCache
+from utils.conversion_pipeline import ConversionPipeline
+
+
+def render(template_name, **context):
+    return f"<html><h1>{context['title']}</h1>{context['content']}</html>"
+
+
+class FakePDFConverter:
+    def html_to_pdf_bytes(
+        self, html_content, orientation="portrait", theme_config=None
+    ):
+        return f"%PDF {orientation} {len(html_content)}".encode()
+
+
+class FakeStorage:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.uploaded = []
+        self.deleted = []
+        self.records = []
+
+    def upload_file(self, content, file_type):
+        path = f"mock/{file_type}/{len(self.uploaded)}"
+        self.uploaded.append(path)
+        return path
+
+    def create_documento(self, data):
+        if data["file_type"] == self.fail_on:
+            raise RuntimeError("falha no banco")
+        self.records.append(data)
+        return MagicMock(data=[{"id": f"doc-{len(self.records)}"}])
+
+    def delete_file(self, storage_path):
+        self.deleted.append(storage_path)
+
+    def get_signed_url(self, storage_path, **kwargs):
+        return f"https://signed/{storage_path}"
+
+
+@pytest.fixture
+def pipeline(markdown_converter, theme_manager):
+    return ConversionPipeline(
+        markdown_converter,
+        theme_manager=theme_manager,
+        pdf_converter=FakePDFConverter(),
+        storage=FakeStorage(),
+        render=render,
+    )
+
+
+class TestConversionPipeline:
+    """Testes para os estágios, hooks e cache do pipeline."""
+
+    def test_matches_convert_document(
+        self, pipeline, markdown_converter, sample_markdown
+    ):
+        """Testa que parse + postprocess equivalem a convert_document()."""
+        ctx = pipeline.run(pipeline.context(sample_markdown, persist=False))
+        document = markdown_converter.convert_document(sample_markdown)
+
+        assert ctx.html == document["html"]
+        assert ctx.title == document["title"]
+        assert ctx.metadata == document["metadata"]
+        assert ctx.rendered_html == render(
+            "base.html", **document, content=document["html"]
+        )
+        assert set(ctx.timings) == {"parse", "postprocess", "template"}
+
+    def test_persists_html_and_pdf(self, pipeline, sample_markdown):
+        """Testa o envio e o registro dos dois arquivos."""
+        ctx = pipeline.run(
+            pipeline.context(
+                sample_markdown,
+                "Juridico ",
+                formats=("html", "pdf"),
+                orientation="landscape",
+                document_fields={"processo_id": "p1", "title": "Outro título"},
+            )
+        )
+
+        assert ctx.pdf_content.startswith(b"%PDF landscape")
+        assert set(ctx.documents) == {"html", "pdf"}
+        records = pipeline.storage.records
+        assert [r["file_type"] for r in records] == ["html", "pdf"]
+        assert all(r["processo_id"] == "p1" for r in records)
+        assert all(r["title"] == "Outro título" for r in records)
+        assert all(r["theme"] == "juridico" for r in records)
+        assert ctx.documents["pdf"]["signed_url"].startswith("https://signed/")
+
+    @pytest.mark.parametrize(
+        "fail_on,deleted",
+        [("html", ["mock/html/0", "mock/pdf/1"]), ("pdf", ["mock/pdf/1"])],
+    )
+    def test_persist_removes_unregistered_files(
+        self, pipeline, sample_markdown, fail_on, deleted
+    ):
+        """Testa que uma falha no banco remove só os arquivos sem registro."""
+        pipeline.storage = FakeStorage(fail_on=fail_on)
+
+        with pytest.raises(RuntimeError):
+            pipeline.run(pipeline.context(sample_markdown, formats=("html", "pdf")))
+
+        assert pipeline.storage.deleted == deleted
+
+    def test_cache_skips_conversion_stages(self, pipeline, sample_markdown, tmp_path):
+        """Testa que um acerto no cache pula parse, postprocess e template."""
+        pipeline.use_cache(ConversionCache(str(tmp_path / "cache")))
+
+        first = pipeline.run(pipeline.context(sample_markdown, persist=False))
+        second = pipeline.run(pipeline.context(sample_markdown, persist=False))
+
+        assert not first.cache_hit
+        assert second.cache_hit
+        assert second.timings == {}
+        assert second.rendered_html == first.rendered_html
+        assert second.title == first.title
+
+    def test_hooks_and_replaced_stages(self, pipeline, sample_markdown):
+        """Testa o hook que pula estágios, o hook de tempo e set_stage()."""
+        seen = []
+        pipeline.add_hook(
+            before=lambda stage, ctx: stage == "pdf",
+            after=lambda stage, ctx, seconds: seen.append(stage),
+        )
+        pipeline.set_stage("template", lambda ctx: setattr(ctx, "rendered_html", "x"))
+
+        ctx = pipeline.run(
+            pipeline.context(sample_markdown, formats=("html", "pdf"), persist=False)
+        )
+
+        assert seen == ["parse", "postprocess", "template"]
+        assert ctx.rendered_html == "x"
+        assert ctx.pdf_content is None
+        with pytest.raises(ValueError):
+            pipeline.set_stage("upload", lambda ctx: None)
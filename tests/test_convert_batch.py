@@ -0,0 +1,63 @@
+"""Testes para o conversor em lote."""
+
+import pytest
+
+from scripts.convert_batch import MANIFEST_NAME, convert_tree
+
+
+@pytest.fixture
+def reports(tmp_path, sample_markdown, sample_markdown_with_table):
+    input_dir = tmp_path / "entrada"
+    (input_dir / "sub").mkdir(parents=True)
+    (input_dir / "a.md").write_text(sample_markdown, encoding="utf-8")
+    (input_dir / "sub" / "b.markdown").write_text(
+        sample_markdown_with_table, encoding="utf-8"
+    )
+    (input_dir / "ignorado.pdf").write_bytes(b"%PDF")
+    return input_dir
+
+
+def run(input_dir, output_dir, **kwargs):
+    return convert_tree(
+        str(input_dir), str(output_dir), workers=1, log=lambda _msg: None, **kwargs
+    )
+
+
+class TestConvertBatch:
+    """Testes para a conversão de pastas com pulo de entradas inalteradas."""
+
+    def test_converts_tree(self, reports, tmp_path):
+        """Testa que a estrutura de subpastas é mantida na saída."""
+        output_dir = tmp_path / "saida"
+        stats = run(reports, output_dir)
+
+        assert stats["converted"] == 2
+        assert stats["failed"] == []
+        html = (output_dir / "sub" / "b.html").read_text(encoding="utf-8")
+        assert "Análise Processual" in html
+        assert (output_dir / "a.html").exists()
+        assert (output_dir / MANIFEST_NAME).exists()
+
+    def test_skips_unchanged_inputs(self, reports, tmp_path):
+        """Testa que só entradas alteradas ou sem saída são reconvertidas."""
+        output_dir = tmp_path / "saida"
+        run(reports, output_dir)
+
+        assert run(reports, output_dir)["skipped"] == 2
+
+        with open(reports / "a.md", "a", encoding="utf-8") as f:
+            f.write("\nNovo parágrafo.\n")
+        (output_dir / "sub" / "b.html").unlink()
+        stats = run(reports, output_dir)
+        assert stats["converted"] == 2
+        assert stats["skipped"] == 0
+        assert "Novo parágrafo." in (output_dir / "a.html").read_text(encoding="utf-8")
+
+    def test_settings_change_reconverts(self, reports, tmp_path):
+        """Testa que --force e mudanças de opções reconvertem tudo."""
+        output_dir = tmp_path / "saida"
+        run(reports, output_dir)
+
+        assert run(reports, output_dir, force=True)["converted"] == 2
+        assert run(reports, output_dir, orientation="landscape")["converted"] == 2
+        assert run(reports, output_dir, orientation="landscape")["skipped"] == 2
@@ -1,5 +1,13 @@
 """Testes de unidade para o MarkdownConverter."""
 
+import re
+import time
+
+import pytest
+from bs4 import BeautifulSoup
+
+from utils.markdown_converter import MarkdownConverter, MarkdownEnginePool
+
 
 class TestMarkdownConverter:
     """Testes para a classe MarkdownConverter."""
@@ -105,6 +113,80 @@ class TestMarkdownConverter:
         # Números devem estar ordenados
         assert "8, 15, 23" in html
 
+    @pytest.mark.parametrize(
+        "html, expected",
+        [
+            (
+                "<p>(Seq. 5, 2) e (Fonte: Doc. Seq. 9, Pág. 3)</p>",
+                '<p><span class="reference-span">(Seq.: 2, 5)</span> e '
+                '<span class="reference-span">(Seq.: 9)</span></p>',
+            ),
+            (
+                "(Autos (Seq. 8)) (Autos (Seq 3))",
+                '(Autos <span class="reference-span">(Seq.: 8)</span>) '
+                '<span class="reference-span">(Seq.: 3)</span>',
+            ),
+            (
+                "(Sequência: 1)(Seq. 2)(Sequência: 3)",
+                '<span class="reference-span">(Seq.: 1)</span>(Seq. 2)'
+                '<span class="reference-span">(Seq.: 3)</span>',
+            ),
+            ("<b>x</b></span>(Seq.: 4)", "<b>x</b></span>(Seq.: 4)"),
+        ],
+    )
+    def test_process_document_references_single_pass(
+        self, markdown_converter, html, expected
+    ):
+        """Testa que a varredura única reproduz as passadas por forma."""
+        assert markdown_converter._process_document_references(html) == expected
+        assert (
+            markdown_converter._process_document_references_by_pattern(
+                html.replace(", Pág. 3", "")
+            )
+            == expected
+        )
+
+    def test_process_document_references_existing_spans(self, markdown_converter):
+        """Testa que spans de referência já presentes não ficam aninhados."""
+        html = '<span class="reference-span">(Seq.: 3, 1)</span> (Sequência: 2)'
+
+        result = markdown_converter._process_document_references(html)
+
+        assert result == (
+            '<span class="reference-span">(Seq.: 1, 3)</span> '
+            '<span class="reference-span">(Seq.: 2)</span>'
+        )
+
+    def test_prepare_markdown_single_pass(self, markdown_converter):
+        """Testa as limpezas de linha do preparo do markdown."""
+        markdown = (
+            "# Título\n"
+            "\n"
+            "**Processo Principal nº:** 123  \n"
+            "**Autor(es):** Fulano  \n"
+            "\n"
+            "Texto [Source: x] final.\n"
+            "| A | B |\n"
+            "|---|---|\n"
+            "| 1 | 2 |"
+        )
+
+        prepared = markdown_converter._prepare_markdown(markdown)
+
+        assert prepared == (
+            "# Título\n\n\nTexto  final.\n\n| A | B |\n|---|---|\n| 1 | 2 |"
+        )
+
+    def test_prepare_markdown_generation_dates(self, markdown_converter):
+        """Testa a remoção de datas de geração, inclusive em várias linhas."""
+        markdown = (
+            "Texto\nData de\nGeração: 01/01/2024\nFim\nData de Gera[Gemini]ção: x"
+        )
+
+        prepared = markdown_converter._prepare_markdown(markdown)
+
+        assert prepared == "Texto\n\nFim\n"
+
     def test_clean_empty_table_cells(self, markdown_converter):
         """Testa limpeza de células vazias na tabela."""
         markdown = """
@@ -117,6 +199,60 @@ class TestMarkdownConverter:
         # A célula N/A deve ser limpa
         assert "<td></td>" in html or "<td> </td>" in html or "N/A" not in html
 
+    def test_postprocess_tables_removes_empty_rows(self, markdown_converter):
+        """Testa a remoção em bloco das linhas vazias de uma tabela grande."""
+        rows = "\n".join(
+            "| N/A | - |" if i % 2 else f"| Linha {i} | Não informado |"
+            for i in range(2000)
+        )
+        markdown = f"| Campo | Valor |\n|---|---|\n{rows}\n"
+
+        soup = BeautifulSoup(
+            markdown_converter._markdown_to_html(markdown), "html.parser"
+        )
+        markdown_converter._postprocess_tables(soup)
+
+        body_rows = soup.find("tbody").find_all("tr")
+        assert [row.td.get_text() for row in body_rows] == [
+            f"Linha {i}" for i in range(0, 2000, 2)
+        ]
+        assert all(row.find_all("td")[1].get_text() == "" for row in body_rows)
+
+    def test_postprocess_tables_tags_header_rows(self, markdown_converter):
+        """Testa que as linhas só com <th> sem <thead> vão para um <thead>."""
+        html = (
+            "<table>\n<tr><th>Data</th><th>Evento</th></tr>\n"
+            "<tr><td>01/01</td><td>N/A</td></tr>\n</table>"
+            "<table><tbody><tr><th>A</th></tr><tr><td>1</td></tr></tbody></table>"
+        )
+        soup = BeautifulSoup(html, "html.parser")
+
+        markdown_converter._postprocess_tables(soup)
+
+        assert str(soup) == (
+            "<table>\n<thead><tr><th>Data</th><th>Evento</th></tr></thead>\n"
+            "<tr><td>01/01</td><td></td></tr>\n</table>"
+            "<table><thead><tr><th>A</th></tr></thead>"
+            "<tbody><tr><td>1</td></tr></tbody></table>"
+        )
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("n/a", True),
+            (" NA ", True),
+            ("Não  aplicável", True),
+            ("Nenhum", True),
+            ("-", True),
+            ("", True),
+            ("N/A - ver anexo", False),
+            ("Valor", False),
+        ],
+    )
+    def test_is_empty_data(self, markdown_converter, text, expected):
+        """Testa os valores considerados vazios."""
+        assert markdown_converter._is_empty_data(text) is expected
+
     def test_clean_gemini_references(self, markdown_converter):
         """Testa remoção de referências do Gemini."""
         markdown = "Texto [Gemini AI Reference] mais texto."
@@ -152,3 +288,321 @@ class TestMarkdownConverter:
         assert "Segundo" in html2
         assert "Primeiro" not in html2
         assert "Segundo" not in html1
+
+    def test_convert_document_matches_separate_calls(
+        self, markdown_converter, sample_markdown
+    ):
+        """Testa que convert_document equivale a convert + extract_*."""
+        document = markdown_converter.convert_document(sample_markdown)
+
+        assert document["html"] == markdown_converter.convert(sample_markdown)
+        assert document["title"] == markdown_converter.extract_title(sample_markdown)
+        assert document["metadata"] == markdown_converter.extract_metadata(
+            sample_markdown
+        )
+
+    def test_convert_document_reads_metadata_table(
+        self, markdown_converter, sample_markdown_with_table
+    ):
+        """Testa metadados da tabela lidos da mesma árvore do HTML."""
+        document = markdown_converter.convert_document(
+            sample_markdown_with_table, remove_metadata_section=True
+        )
+
+        assert document["metadata"]["exequente"] == "Banco ABC S/A"
+        assert document["metadata"]["valor_causa"] == "R$ 50.000,00"
+        assert "INFORMAÇÕES DO TÍTULO EXECUTIVO" not in document["html"]
+
+    def test_convert_document_keeps_line_breaks_in_html(self, markdown_converter):
+        """Testa que a extração do executado não altera o HTML gerado."""
+        markdown = """
+| Parâmetro | Valor |
+|-----------|-------|
+| Executado(s) | Maria Souza<br>José Souza |
+"""
+        document = markdown_converter.convert_document(markdown)
+
+        assert document["metadata"]["executado"] == "Maria Souza, José Souza"
+        assert "<br/>" in document["html"]
+        assert document["html"] == markdown_converter.convert(markdown)
+
+    def test_split_sections_at_top_level_headings(self, markdown_converter):
+        """Testa a divisão em H1/H2 fora de blocos de código e HTML."""
+        markdown = """Intro
+
+## Seção 1
+
+```
+## dentro do código
+```
+
+<details>
+<summary>Resumo</summary>
+
+## dentro do details
+</details>
+
+# Seção 2
+
+### Subseção
+"""
+        sections = markdown_converter._split_sections(markdown)
+
+        assert len(sections) == 3
+        assert sections[1].startswith("## Seção 1")
+        assert "## dentro do details" in sections[1]
+        assert sections[2].startswith("# Seção 2")
+
+    def test_convert_parallel_matches_serial(self, markdown_converter):
+        """Testa que a conversão paralela gera o mesmo HTML da serial."""
+        sections = [
+            f"""## {i}. INFORMAÇÕES {i}
+
+Texto (Sequência: {i}, 3, 1).
+
+| Parâmetro | Valor |
+|-----------|-------|
+| Exequente | Banco {i} |
+| Vara | N/A |
+
+<details>
+<summary>Detalhes {i}</summary>
+
+- Item A
+- Item B
+</details>
+
+# Capítulo {i}
+"""
+            for i in range(12)
+        ]
+        markdown = "# Relatório\n\n" + "\n".join(sections)
+
+        for remove_metadata_section in (False, True):
+            serial = markdown_converter.convert_document(
+                markdown, remove_metadata_section=remove_metadata_section
+            )
+            parallel = markdown_converter.convert_document(
+                markdown,
+                remove_metadata_section=remove_metadata_section,
+                parallel=True,
+                max_workers=2,
+            )
+            assert parallel == serial
+
+    @pytest.mark.parametrize(
+        "markdown",
+        [
+            "## 1. INFORMAÇÕES DO TÍTULO EXECUTIVO\n# H1\n1. num",
+            "## 1. INFORMAÇÕES DO TÍTULO EXECUTIVO\n\n| A | B |\n|---|---|\n"
+            "| Vara | 1ª |\n\n# Relatório\n\nTexto\n\n## 2. Análise\n\nFim",
+        ],
+    )
+    def test_convert_parallel_metadata_before_first_h1(
+        self, markdown_converter, markdown
+    ):
+        """Testa a paridade quando a seção de metadados precede o primeiro H1."""
+        serial = markdown_converter.convert_document(
+            markdown, remove_metadata_section=True
+        )
+        parallel = markdown_converter.convert_document(
+            markdown, remove_metadata_section=True, parallel=True, max_workers=2
+        )
+
+        assert len(markdown_converter.split_sections(markdown)) > 1
+        assert parallel == serial
+
+    def test_section_api_matches_convert_document(
+        self, markdown_converter, sample_markdown_with_table
+    ):
+        """Testa que as etapas públicas por seção recompõem convert_document()."""
+        markdown = sample_markdown_with_table + "\n# Conclusão\n\n- Item\n"
+        sections = markdown_converter.split_sections(markdown)
+        fragments = [
+            markdown_converter.render_section(text, i == len(sections) - 1)
+            for i, text in enumerate(sections)
+        ]
+        header_index, metadata_index = markdown_converter.first_occurrence_indexes(
+            fragments, True, True
+        )
+        results = [
+            markdown_converter.postprocess_section(
+                fragment, i == header_index, i == metadata_index
+            )
+            for i, fragment in enumerate(fragments)
+        ]
+        table_metadata = {}
+        for _html, section_metadata in results:
+            table_metadata.update(section_metadata)
+
+        document = markdown_converter.convert_document(
+            markdown, remove_metadata_section=True
+        )
+
+        assert len(sections) == 3
+        assert "".join(html for html, _metadata in results) == document["html"]
+        assert (
+            markdown_converter.merge_metadata(markdown, table_metadata)
+            == document["metadata"]
+        )
+
+    def test_md_engine_pool_reuses_instances(self):
+        """Testa que o pool devolve a mesma instância já construída."""
+        pool = MarkdownEnginePool(use_nl2br=False)
+
+        with pool.acquire() as first:
+            pass
+        with pool.acquire() as second:
+            pass
+
+        assert first is second
+
+    def test_md_engine_pool_resets_state_between_uses(self, markdown_converter):
+        """Testa que referências de uma conversão não vazam para a próxima."""
+        with_reference = "Veja [o site][ref].\n\n[ref]: https://example.com"
+        without_reference = "Veja [o site][ref]."
+
+        markdown_converter.convert(with_reference)
+        html = markdown_converter.convert(without_reference)
+
+        assert "https://example.com" not in html
+        assert html == MarkdownConverter().convert(without_reference)
+
+    def test_process_details_content_scales_linearly(self, markdown_converter):
+        """Testa que o tempo de processamento dos details cresce linearmente."""
+
+        def build_html(count):
+            return "\n".join(
+                f"<details>\n<summary>Bloco {i}</summary>\n"
+                f"<details><summary>Interno {i}</summary>\n\n"
+                f"- Item {i}\n- **Destaque**\n</details>\n</details>"
+                for i in range(count)
+            )
+
+        def measure(count):
+            html = build_html(count)
+            best = float("inf")
+            for _ in range(3):
+                soup = BeautifulSoup(html, "html.parser")
+                start = time.perf_counter()
+                markdown_converter._process_details_content(soup)
+                best = min(best, time.perf_counter() - start)
+            return best
+
+        small = measure(50)
+        large = measure(400)
+
+        # 8x mais blocos: linear fica perto de 8x, quadrático perto de 64x
+        assert large / small < 20
+
+    def test_process_details_content_visits_each_details_once(
+        self, markdown_converter, monkeypatch
+    ):
+        """Testa que cada details folha é convertido uma única vez."""
+        html = "\n".join(
+            f"<details>\n<summary>Bloco {i}</summary>\n"
+            f"<details><summary>Interno {i}</summary>\n\n- Item {i}\n</details>\n"
+            "</details>"
+            for i in range(30)
+        )
+        soup = BeautifulSoup(html, "html.parser")
+        rendered = []
+        original = markdown_converter._render_details_markdown
+        monkeypatch.setattr(
+            markdown_converter,
+            "_render_details_markdown",
+            lambda details: rendered.append(details) or original(details),
+        )
+
+        markdown_converter._process_details_content(soup)
+
+        leaves = [d for d in soup.find_all("details") if not d.find("details")]
+        assert len(leaves) == 30
+        assert len({id(d) for d in rendered}) == 30
+        assert all(d in leaves for d in rendered)
+        assert all(d.find("ul") for d in leaves)
+
+    def test_preprocess_details_converts_nested_blocks(self, markdown_converter):
+        """Testa que details internos e externos têm o markdown convertido."""
+        markdown = """<details>
+<summary>Externo</summary>
+
+**Resumo**
+
+<details>
+<summary>Interno</summary>
+
+- Item A
+- Item B
+</details>
+</details>"""
+        result = markdown_converter._preprocess_details_markdown(markdown)
+
+        assert "<strong>Resumo</strong>" in result
+        assert "<li>Item A</li>" in result
+        assert result.count("<details>") == 2
+        assert result.count("</details>") == 2
+        assert "data-axion-block" not in result
+
+    def test_preprocess_details_keeps_unbalanced_tags(self, markdown_converter):
+        """Testa que tags <details> sem par são mantidas como estão."""
+        markdown = (
+            "</details>\n\n<details>\n<summary>Aberto</summary>\n\n- Sem fim\n\n"
+            "<details>\n<summary>Fechado</summary>\n\n- Item\n</details>"
+        )
+        result = markdown_converter._preprocess_details_markdown(markdown)
+
+        assert result.startswith("</details>\n\n<details>\n<summary>Aberto</summary>")
+        assert "- Sem fim" in result
+        assert "<li>Item</li>" in result
+
+    @pytest.mark.parametrize(
+        "markdown",
+        [
+            '<details data-axion-block="7"></details>\n\n'
+            "<details>\n<summary>A</summary>\n\n- Item\n</details>",
+            "<details>\n<summary>A</summary>\n\n"
+            '<details data-axion-block="0"></details>\n</details>',
+        ],
+    )
+    def test_preprocess_details_ignores_user_placeholders(
+        self, markdown_converter, markdown
+    ):
+        """Testa que marcadores digitados pelo usuário ficam como texto."""
+        result = markdown_converter._preprocess_details_markdown(markdown)
+
+        assert '<details data-axion-block="' in result
+        assert markdown_converter.convert(markdown)
+
+    def test_expand_details_blocks_skips_invalid_and_repeated(self, markdown_converter):
+        """Testa marcadores fora do intervalo e blocos que apontam para si."""
+        placeholder = re.compile(r'<details data-axion-block="n-(\d+)"></details>')
+        blocks = ['<b><details data-axion-block="n-0"></details></b>']
+
+        result = markdown_converter._expand_details_blocks(
+            '<details data-axion-block="n-0"></details>'
+            '<details data-axion-block="n-9"></details>',
+            blocks,
+            placeholder,
+        )
+
+        assert result == (
+            '<b><details data-axion-block="n-0"></details></b>'
+            '<details data-axion-block="n-9"></details>'
+        )
+
+    def test_preprocess_details_handles_deep_nesting(self, markdown_converter):
+        """Testa aninhamento profundo sem reconverter os níveis internos."""
+        depth = 300
+        markdown = "".join(
+            f"<details>\n<summary>Nível {i}</summary>\n\n- Item {i}\n"
+            for i in range(depth)
+        ) + ("</details>\n" * depth)
+
+        start = time.perf_counter()
+        result = markdown_converter._preprocess_details_markdown(markdown)
+        elapsed = time.perf_counter() - start
+
+        assert result.count("<ul>") == depth
+        assert "data-axion-block" not in result
+        assert elapsed < 5
@@ -0,0 +1,42 @@
+"""Testes para a base dos caches em disco."""
+
+import pytest
+
+from utils.disk_cache import DiskCache
+
+
+class TextCache(DiskCache):
+    suffix = ".txt"
+    label = "texto"
+
+    def _encode(self, value):
+        return value.encode("utf-8")
+
+    def _decode(self, data):
+        return data.decode("utf-8")
+
+
+class TestDiskCache:
+    """Testes para o contrato de serialização do DiskCache."""
+
+    def test_requires_serialization_hooks(self, tmp_path):
+        """Testa que a base e subclasses incompletas falham ao instanciar."""
+
+        class Incomplete(DiskCache):
+            def _encode(self, value):
+                return value
+
+        with pytest.raises(TypeError):
+            DiskCache(cache_folder=str(tmp_path))
+        with pytest.raises(TypeError):
+            Incomplete(cache_folder=str(tmp_path))
+
+    def test_subclass_round_trip(self, tmp_path):
+        """Testa que uma subclasse completa grava e lê do disco."""
+        cache = TextCache(cache_folder=str(tmp_path), max_disk_bytes=1024)
+        key = "ab" * 32
+
+        cache._write_disk(key, "conteúdo")
+
+        assert TextCache(cache_folder=str(tmp_path))._read_disk(key) == "conteúdo"
+        assert (tmp_path / key[:2] / (key + ".txt")).exists()
@@ -0,0 +1,104 @@
+"""Testes para a redução das imagens dos PDFs."""
+
+import io
+
+import pytest
+from PIL import Image
+
+from utils.image_optimizer import ImageOptimizer
+
+LOGO_URL = "https://cdn.example.com/logo.png"
+
+
+def encode(image, image_format="PNG", **options):
+    output = io.BytesIO()
+    image.save(output, image_format, **options)
+    return output.getvalue()
+
+
+def photo(width=1200, height=800):
+    """Imagem com ruído, que o PNG não comprime bem (como uma foto)."""
+    gradient = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    noise = Image.effect_noise((width, height), 30).convert("RGB")
+    return Image.blend(gradient, noise, 0.3)
+
+
+@pytest.fixture
+def optimizer(tmp_path):
+    return ImageOptimizer(cache_folder=str(tmp_path / "imagens"), dpi=150)
+
+
+class TestImageOptimizer:
+    """Testes para a redução, a escolha do formato e o cache."""
+
+    def test_downsamples_photo_to_jpeg(self, optimizer):
+        """Testa que uma foto grande é reduzida à largura da página em JPEG."""
+        data = encode(photo())
+
+        optimized, mime_type = optimizer.optimize(data, 300, "image/png")
+
+        assert optimizer.max_pixels("portrait") == 1122
+        assert optimizer.max_pixels("landscape") == 1636
+        assert mime_type == "image/jpeg"
+        assert len(optimized) < len(data) / 10
+        with Image.open(io.BytesIO(optimized)) as image:
+            assert image.size == (300, 200)
+
+    def test_low_dpi_never_upscales(self, tmp_path):
+        """Testa que abaixo de 96 dpi a largura não fica menor que a exibida."""
+        optimizer = ImageOptimizer(cache_folder=str(tmp_path), dpi=72)
+
+        assert optimizer.max_pixels("portrait") == 718
+        assert optimizer.max_pixels(css_px=150) == 150
+
+    def test_keeps_transparency_as_png(self, optimizer):
+        """Testa que imagens com transparência continuam PNG."""
+        image = Image.new("RGBA", (2000, 1000), (190, 48, 0, 128))
+
+        optimized, mime_type = optimizer.optimize(encode(image), 300, "image/png")
+
+        assert mime_type == "image/png"
+        with Image.open(io.BytesIO(optimized)) as result:
+            assert result.size == (300, 150)
+            assert result.mode == "RGBA"
+
+    def test_small_image_without_gain_is_kept(self, optimizer):
+        """Testa que uma imagem pequena e já compacta não é alterada."""
+        data = encode(Image.new("RGB", (40, 20), "white"), optimize=True)
+
+        assert optimizer.optimize(data, 1122, "image/png") == (data, "image/png")
+
+    def test_cached_by_source_hash(self, optimizer, tmp_path, monkeypatch):
+        """Testa o cache em memória e em disco pelo hash da imagem."""
+        data = encode(photo(400, 300))
+        first = optimizer.optimize(data, 200, "image/png")
+
+        other = ImageOptimizer(cache_folder=str(tmp_path / "imagens"), dpi=150)
+
+        def fail(*args):
+            raise AssertionError("imagem em cache não deve ser processada")
+
+        monkeypatch.setattr(optimizer, "_process", fail)
+        monkeypatch.setattr(other, "_process", fail)
+        assert optimizer.optimize(data, 200, "image/png") == first
+        assert other.optimize(data, 200, "image/png") == first
+
+    def test_wrapped_fetcher(self, optimizer):
+        """Testa que o url_fetcher só altera imagens e usa o limite do logo."""
+        image = encode(photo(600, 300))
+        responses = {
+            "https://cdn.example.com/all.css": {
+                "string": b"p {}",
+                "mime_type": "text/css",
+            },
+            LOGO_URL: {"file_obj": io.BytesIO(image), "mime_type": "image/png"},
+        }
+        fetch = optimizer.wrap(
+            lambda url: dict(responses[url]), "landscape", logo_url=LOGO_URL
+        )
+
+        assert fetch("https://cdn.example.com/all.css")["string"] == b"p {}"
+        logo = fetch(LOGO_URL)
+        assert logo["mime_type"] == "image/jpeg"
+        with Image.open(io.BytesIO(logo["string"])) as result:
+            assert result.width == optimizer.max_pixels(css_px=150) == 234
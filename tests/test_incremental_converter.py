@@ -0,0 +1,113 @@
+"""Testes para o IncrementalConverter."""
+
+import pytest
+
+from utils.incremental_converter import IncrementalConverter
+
+
+def build_report(count=8, edited=None):
+    sections = []
+    for i in range(count):
+        text = f"Texto da seção {i} (Sequência: {i}, 3)."
+        if i == edited:
+            text = f"Texto editado da seção {i}."
+        sections.append(
+            f"""## {i}. SEÇÃO {i}
+
+{text}
+
+| Parâmetro | Valor |
+|-----------|-------|
+| Exequente | Banco {i} |
+| Vara | N/A |
+
+<details>
+<summary>Detalhes {i}</summary>
+
+- Item A
+- Item B
+</details>
+"""
+        )
+    header = """# Relatório de Teste
+
+## 1. INFORMAÇÕES DO TÍTULO EXECUTIVO
+
+| Parâmetro | Valor |
+|-----------|-------|
+| Executado | Empresa Y |
+| Valor da Causa | R$ 10.000,00 |
+
+"""
+    return header + "\n".join(sections)
+
+
+@pytest.fixture
+def incremental(markdown_converter):
+    return IncrementalConverter(markdown_converter)
+
+
+class TestIncrementalConverter:
+    """Testes para a reconversão incremental por seções."""
+
+    @pytest.mark.parametrize("remove_header", [True, False])
+    @pytest.mark.parametrize("remove_metadata_section", [True, False])
+    def test_matches_full_conversion(
+        self,
+        markdown_converter,
+        incremental,
+        remove_header,
+        remove_metadata_section,
+    ):
+        """Testa que o resultado é idêntico ao de convert_document()."""
+        markdown = build_report()
+
+        for text in (markdown, build_report(edited=3)):
+            assert incremental.convert_document(
+                text, remove_header, remove_metadata_section
+            ) == markdown_converter.convert_document(
+                text, remove_header, remove_metadata_section
+            )
+
+    def test_reconverts_only_changed_sections(self, markdown_converter, incremental):
+        """Testa que só a seção editada é convertida novamente."""
+        incremental.convert(build_report())
+        assert incremental.last_stats["rendered"] == incremental.last_stats["sections"]
+
+        edited = build_report(edited=5)
+        html = incremental.convert(edited)
+
+        assert incremental.last_stats["rendered"] == 1
+        assert "Texto editado da seção 5." in html
+        assert html == markdown_converter.convert(edited)
+
+    def test_header_removal_follows_document(self, markdown_converter, incremental):
+        """Testa que a remoção do primeiro H1 é recalculada a cada conversão."""
+        markdown = build_report() + "\n# Anexo\n\nTexto do anexo.\n"
+        incremental.convert(markdown)
+
+        without_title = markdown.replace("# Relatório de Teste\n", "", 1)
+        html = incremental.convert(without_title)
+
+        assert "<h1>Anexo</h1>" not in html
+        assert html == markdown_converter.convert(without_title)
+
+    def test_metadata_before_first_h1(self, markdown_converter, incremental):
+        """Testa a seção de metadados logo antes do primeiro H1."""
+        markdown = build_report().replace("# Relatório de Teste\n\n", "")
+        markdown = markdown.replace(
+            "\n## 0. SEÇÃO 0", "\n# Relatório\n\nTexto\n\n## 0. SEÇÃO 0"
+        )
+
+        assert incremental.convert_document(
+            markdown, remove_metadata_section=True
+        ) == markdown_converter.convert_document(markdown, remove_metadata_section=True)
+
+    def test_clear_discards_sections(self, incremental):
+        """Testa que clear() força a conversão de todas as seções."""
+        markdown = build_report()
+        incremental.convert(markdown)
+        incremental.clear()
+        incremental.convert(markdown)
+
+        assert incremental.last_stats["rendered"] == incremental.last_stats["sections"]
@@ -0,0 +1,102 @@
+"""Testes para a leitura de tabelas direto do markdown."""
+
+import markdown
+import pytest
+from bs4 import BeautifulSoup
+
+from utils.metadata_scanner import inline_text, iter_table_rows
+
+
+def rendered_rows(markdown_text):
+    """Linhas das tabelas renderizadas pelo python-markdown, como texto."""
+    html = markdown.markdown(
+        markdown_text, extensions=["tables", "fenced_code", "md_in_html"]
+    )
+    soup = BeautifulSoup(html, "html.parser")
+    return [
+        [cell.get_text().strip() for cell in row.find_all("td")]
+        for row in soup.find_all("tr")
+        if row.find_all("td")
+    ]
+
+
+def scanned_rows(markdown_text):
+    return [
+        [inline_text(cell).strip() for cell in cells]
+        for cells in iter_table_rows(markdown_text)
+    ]
+
+
+class TestMetadataScanner:
+    """Testes para o scanner de tabelas pipe."""
+
+    @pytest.mark.parametrize(
+        "markdown_text",
+        [
+            "| Parâmetro | Valor |\n|---|---|\n| **Exequente** | Banco *X* |\n",
+            "Parâmetro | Valor\n:-- | --:\nVara | 1ª Vara\n",
+            "| A | B |\n|---|---|\n| `a | b` | [link](http://x) |\n| só uma |\n",
+            "| A | B |\n|---|---|\n| 1 \\| 2 | R$ 1&nbsp;000 |\n",
+            "Texto\n\n| A | B |\n|---|---|\n| x | y |\n\n```\n| C | D |\n|---|---|\n```\n",
+            "| A | B |\n| x | y |\n",
+            "```\n\n| A | B |\n|---|---|\n| x | y |\n",
+            "~~~\n| A | B |\n|---|---|\n| x | y |\n```\n",
+            "```\nx\n```\n| A | B |\n|---|---|\n| x | y |\n",
+            "| A | B |\n|---|---|\n",
+        ],
+    )
+    def test_rows_match_rendered_tables(self, markdown_text):
+        """Testa que as células lidas são iguais ao get_text() do HTML gerado."""
+        assert scanned_rows(markdown_text) == rendered_rows(markdown_text)
+
+    def test_skips_tables_inside_raw_html(self):
+        """Testa que tabelas em HTML bruto só são lidas com markdown="1"."""
+        markdown_text = """<details>
+<summary>Bruto</summary>
+
+| A | B |
+|---|---|
+| bruto | 1 |
+</details>
+
+<div markdown="1">
+
+| A | B |
+|---|---|
+| processado | 2 |
+
+</div>
+"""
+        assert scanned_rows(markdown_text) == [["processado", "2"]]
+
+    def test_inline_text_replaces_line_breaks(self):
+        """Testa a troca de <br> pelo separador informado."""
+        assert inline_text("Empresa A<br>Empresa B", br=", ") == "Empresa A, Empresa B"
+        assert inline_text("**Empresa A**<br/>B") == "Empresa AB"
+
+    def test_extract_metadata_from_table(
+        self, markdown_converter, sample_markdown_with_table
+    ):
+        """Testa que extract_metadata() lê a tabela sem renderizar o documento."""
+        metadata = markdown_converter.extract_metadata(sample_markdown_with_table)
+
+        tables = BeautifulSoup(
+            markdown_converter.convert(sample_markdown_with_table, remove_header=False),
+            "html.parser",
+        ).find_all("table")
+        expected = markdown_converter._extract_from_tables(tables)
+
+        assert expected
+        for key, value in expected.items():
+            assert metadata[key] == value
+
+    def test_unclosed_fence_is_text(self, markdown_converter):
+        """Testa que uma cerca sem fechamento não esconde a tabela seguinte."""
+        markdown_text = (
+            "# Relatório\n\n```\n\n| Parâmetro | Valor |\n|---|---|\n"
+            "| Exequente | Fazenda |"
+        )
+
+        metadata = markdown_converter.extract_metadata(markdown_text)
+
+        assert metadata["exequente"] == "Fazenda"
@@ -0,0 +1,244 @@
+"""Testes para a folha de estilo de impressão do PDFConverter."""
+
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from bs4 import BeautifulSoup
+
+from utils import pdf_converter
+from utils.pdf_converter import (
+    PDFConverter,
+    merge_pdfs,
+    print_css,
+    print_stylesheet,
+    render_fingerprint,
+    split_report,
+)
+
+
+class TestPrintStylesheet:
+    """Testes para o cache da folha de impressão e as fontes compartilhadas."""
+
+    def test_print_css_orientation_and_theme(self):
+        """Testa o tamanho da página e as cores do tema no CSS."""
+        portrait = print_css("portrait")
+        landscape = print_css("landscape", {"colors": {"primary": "#0a5"}})
+
+        assert "size: A4;" in portrait
+        assert "color: #BE3000;" in portrait
+        assert "rgba(190, 48, 0, 0.1)" in portrait
+        assert "size: A4 landscape;" in landscape
+        assert "color: #00aa55;" in landscape
+        assert "rgba(0, 170, 85, 0.05)" in landscape
+
+    def test_invalid_theme_color_uses_default(self):
+        """Testa que uma cor que não é hexadecimal volta para a padrão."""
+        css = print_css("portrait", {"colors": {"primary": "var(--x)"}})
+
+        assert css == print_css("portrait")
+
+    def test_stylesheet_is_cached(self):
+        """Testa que a folha é parseada uma vez por orientação e cor."""
+        theme = {"colors": {"primary": "#BE3000"}}
+
+        assert print_stylesheet("portrait") is print_stylesheet("portrait", theme)
+        assert print_stylesheet("portrait") is not print_stylesheet("landscape")
+        assert print_stylesheet("portrait") is not print_stylesheet(
+            "portrait", {"colors": {"primary": "#123456"}}
+        )
+
+    def test_font_config_is_shared(self):
+        """Testa que os conversores usam a mesma FontConfiguration."""
+        assert PDFConverter().font_config is PDFConverter().font_config
+
+    def test_skips_variables_when_css_is_compiled(self):
+        """Testa que só HTML com :root no <head> passa pela substituição."""
+        converter = PDFConverter()
+
+        assert converter._has_css_variables(
+            "<html><head><style>:root { --a: 1px; }</style></head></html>"
+        )
+        assert not converter._has_css_variables(
+            "<html><head><style>h1 { color: red; }</style></head>"
+            "<body><code>:root</code></body></html>"
+        )
+
+    def test_pdf_bytes_in_memory(self, tmp_path, monkeypatch):
+        """Testa que html_to_pdf_bytes() retorna o PDF sem gravar arquivos."""
+        monkeypatch.chdir(tmp_path)
+
+        content = PDFConverter().html_to_pdf_bytes("<html><body>x</body></html>")
+
+        assert content.startswith(b"%PDF")
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestRenderPool:
+    """Testes para o pool de processos de render."""
+
+    def test_renders_in_pool(self, tmp_path):
+        """Testa bytes e arquivo gerados por um processo do pool já aquecido."""
+        pool = pdf_converter.start_render_pool(1, use_asset_cache=False)
+        try:
+            converter = PDFConverter(render_workers=1, render_timeout=60)
+            html = "<html><body>pool</body></html>"
+            content = converter.html_to_pdf_bytes(html, "landscape")
+            converter.html_to_pdf(html, str(tmp_path / "saida.pdf"))
+
+            assert content.startswith(b"%PDF")
+            assert (tmp_path / "saida.pdf").read_bytes() == content
+            assert pdf_converter.get_render_pool(1) is pool
+        finally:
+            pdf_converter._reset_render_pool(pool)
+
+        assert pdf_converter._render_pool is None
+
+    def test_pool_without_timeout(self, monkeypatch):
+        """Testa o render no pool sem render_timeout (espera sem prazo)."""
+        pool = ThreadPoolExecutor(max_workers=1)
+        monkeypatch.setattr(pdf_converter, "get_render_pool", lambda *a: pool)
+        monkeypatch.setattr(pdf_converter, "_render_in_worker", lambda *a: b"%PDF")
+
+        try:
+            content = PDFConverter(render_workers=1).html_to_pdf_bytes(
+                "<html><body>pool</body></html>"
+            )
+        finally:
+            pool.shutdown()
+
+        assert content == b"%PDF"
+
+    def test_split_render_shares_one_deadline(self, monkeypatch):
+        """Testa que as seções dividem um único render_timeout."""
+        pool = ThreadPoolExecutor(max_workers=1)
+        monkeypatch.setattr(pdf_converter, "get_render_pool", lambda *a: pool)
+        monkeypatch.setattr(
+            pdf_converter, "split_report", lambda html, n: ["a", "b", "c"]
+        )
+        monkeypatch.setattr(
+            pdf_converter, "_render_in_worker", lambda *a: time.sleep(0.2) or b"%PDF"
+        )
+        converter = PDFConverter(
+            render_workers=2, render_timeout=0.3, split_min_chars=1
+        )
+
+        try:
+            with pytest.raises(Exception, match="Tempo esgotado"):
+                converter._render_in_pool("<html></html>", "portrait", None)
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+
+REPORT_HTML = """<html><head><title>Relatório</title></head><body>
+<header class="header"><h1>Relatório</h1></header>
+<div class="container">
+<p>Introdução</p>
+<h1>Capítulo</h1>
+<h2>Seção 1</h2><p>um</p><table><tr><td>1</td></tr></table>
+<h2>Seção 2</h2><h3>Subseção</h3><p>dois</p>
+<details><summary>Detalhes</summary><p>mais</p></details>
+<h2>Seção 3</h2><p>três</p><p>três de novo</p>
+<h2>Seção 4</h2><p>quatro</p>
+</div>
+<footer class="footer"><p>Rodapé</p></footer>
+</body></html>"""
+
+
+def make_pdf(pages, title):
+    pypdf = pytest.importorskip("pypdf")
+    writer = pypdf.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(100, 100)
+    writer.add_outline_item(title, 0)
+    writer.add_metadata({"/Title": title})
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+class TestSplitRender:
+    """Testes para a divisão por seções e a junção dos PDFs."""
+
+    def test_split_keeps_sections_header_and_footer(self):
+        """Testa que as seções ficam em ordem, com cabeçalho e rodapé uma vez."""
+        chunks = split_report(REPORT_HTML, 2)
+
+        assert len(chunks) == 2
+        assert "Relatório</h1>" in chunks[0] and "Relatório</h1>" not in chunks[1]
+        assert "Rodapé" in chunks[1] and "Rodapé" not in chunks[0]
+        text = "".join(chunks)
+        positions = [text.index(f"Seção {i}") for i in range(1, 5)]
+        assert positions == sorted(positions)
+        assert all("<title>Relatório</title>" in chunk for chunk in chunks)
+
+    @pytest.mark.parametrize("max_chunks", [2, 3, 4, 8])
+    def test_split_only_before_headings(self, max_chunks):
+        """Testa que as partes só são cortadas antes de H1/H2, nunca após eles."""
+        chunks = split_report(REPORT_HTML, max_chunks)
+        bodies = [
+            BeautifulSoup(chunk, "html.parser").select_one(".container")
+            for chunk in chunks
+        ]
+
+        assert 1 < len(chunks) <= max_chunks
+        for body in bodies:
+            tags = body.find_all(recursive=False)
+            assert tags[-1].name not in ("h1", "h2")
+        for body in bodies[1:]:
+            assert body.find(recursive=False).name in ("h1", "h2")
+        # O H1 seguido direto do H2 fica na mesma parte que o corpo da seção
+        first_h2 = next(b for b in bodies if b.find("h2"))
+        assert first_h2.find("h1") is not None
+
+    def test_split_without_sections(self):
+        """Testa que HTML fora do template ou com uma seção não é dividido."""
+        html = "<html><body><p>x</p></body></html>"
+
+        assert split_report(html, 4) == [html]
+        assert split_report(REPORT_HTML, 1) == [REPORT_HTML]
+
+    def test_merge_pages_and_outline(self):
+        """Testa a ordem das páginas e os marcadores apontando para a parte certa."""
+        pypdf = pytest.importorskip("pypdf")
+
+        merged = pypdf.PdfReader(
+            io.BytesIO(merge_pdfs([make_pdf(2, "Parte 1"), make_pdf(3, "Parte 2")]))
+        )
+
+        assert len(merged.pages) == 5
+        assert [item.title for item in merged.outline] == ["Parte 1", "Parte 2"]
+        assert merged.get_destination_page_number(merged.outline[1]) == 2
+        assert merged.metadata.title == "Parte 1"
+
+
+class TestRenderFingerprint:
+    """Testes para o fingerprint usado na deduplicação de PDFs."""
+
+    def test_changes_with_render_inputs(self):
+        """Testa que HTML, orientação e cor do tema mudam o fingerprint."""
+        html = "<html><body>x</body></html>"
+        base = render_fingerprint(html)
+
+        assert render_fingerprint(html, " Portrait ") == base
+        assert render_fingerprint(html, "portrait", {"colors": {}}) == base
+        assert render_fingerprint(html + " ") != base
+        assert render_fingerprint(html, "landscape") != base
+        assert render_fingerprint(
+            html, "portrait", {"colors": {"primary": "#123"}}
+        ) != (base)
+
+    def test_changes_with_custom_config(self):
+        """Testa que ajustes diferentes de custom_config mudam o fingerprint."""
+        html = "<html><body>x</body></html>"
+        theme = {"colors": {"primary": "#123"}}
+
+        fonts = render_fingerprint(html, "portrait", theme, None, {"fonts": {"a": 1}})
+        other = render_fingerprint(html, "portrait", theme, None, {"fonts": {"a": 2}})
+
+        assert render_fingerprint(html, "portrait", theme, None, {}) == (
+            render_fingerprint(html, "portrait", theme)
+        )
+        assert fonts != render_fingerprint(html, "portrait", theme)
+        assert fonts != other
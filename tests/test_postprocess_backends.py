@@ -0,0 +1,128 @@
+"""Testes de paridade entre os backends de pós-processamento HTML."""
+
+import os
+
+import pytest
+
+from utils.markdown_converter import MarkdownConverter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+NESTED_DETAILS_MARKDOWN = """# Relatório
+
+## 1. INFORMAÇÕES GERAIS
+
+| Parâmetro | Valor |
+|-----------|-------|
+| Exequente | Banco X |
+| Executado | Empresa Y |
+| Vara | --- |
+
+Classificação: IRRECUPERÁVEL (Sequência: 1, 2, 3)
+
+<details>
+<summary>Análise</summary>
+
+**Pontos:**
+
+- Item A
+- Item B
+
+<details>
+<summary>Nível 2</summary>
+
+| Descrição | Valor |
+|-----------|-------|
+| Débito | R$ 1.000,00 |
+
+</details>
+</details>
+
+## 2. CONCLUSÃO
+
+Texto final com `código` e <span>HTML</span>.
+"""
+
+
+@pytest.fixture
+def lxml_converter():
+    pytest.importorskip("lxml")
+    return MarkdownConverter(postprocess_backend="lxml")
+
+
+class TestPostprocessBackends:
+    """Testes para o backend lxml comparado ao html.parser."""
+
+    def test_invalid_backend_raises(self):
+        """Testa que um backend desconhecido é rejeitado."""
+        with pytest.raises(ValueError, match="Backend de pós-processamento"):
+            MarkdownConverter(postprocess_backend="html5lib")
+
+    @pytest.mark.parametrize(
+        "filename",
+        ["EXEMPLO_MARKDOWN_PROFISSIONAL.md", "EXEMPLO_RELATORIO_COMPLETO.md"],
+    )
+    def test_lxml_matches_html_parser_on_examples(
+        self, markdown_converter, lxml_converter, filename
+    ):
+        """Testa que os exemplos do repositório geram o mesmo documento."""
+        with open(os.path.join(ROOT_DIR, filename), encoding="utf-8") as f:
+            markdown = f.read()
+
+        assert lxml_converter.convert_document(
+            markdown
+        ) == markdown_converter.convert_document(markdown)
+
+    def test_lxml_matches_html_parser_on_fixtures(
+        self,
+        markdown_converter,
+        lxml_converter,
+        sample_markdown,
+        sample_markdown_with_table,
+    ):
+        """Testa a paridade nos markdowns de exemplo das fixtures."""
+        for markdown in (sample_markdown, sample_markdown_with_table):
+            assert lxml_converter.convert_document(
+                markdown
+            ) == markdown_converter.convert_document(markdown)
+
+    @pytest.mark.parametrize("remove_header", [True, False])
+    @pytest.mark.parametrize("remove_metadata_section", [True, False])
+    def test_lxml_matches_html_parser_with_nested_details(
+        self,
+        markdown_converter,
+        lxml_converter,
+        remove_header,
+        remove_metadata_section,
+    ):
+        """Testa details aninhados, células vazias e remoção de seções."""
+        expected = markdown_converter.convert(
+            NESTED_DETAILS_MARKDOWN, remove_header, remove_metadata_section
+        )
+
+        assert (
+            lxml_converter.convert(
+                NESTED_DETAILS_MARKDOWN, remove_header, remove_metadata_section
+            )
+            == expected
+        )
+        assert ("classification-info" in expected) != remove_metadata_section
+
+    def test_lxml_matches_html_parser_on_raw_tables(
+        self, markdown_converter, lxml_converter
+    ):
+        """Testa tabelas HTML sem <thead>, com tabela aninhada e células vazias."""
+        markdown = """# Relatório
+
+<table>
+<tr><th>Data</th><th>Evento</th></tr>
+<tr><td>01/01</td><td>N/A</td></tr>
+<tr><td>-</td><td><table><tr><td>nenhum</td></tr></table></td></tr>
+</table>
+
+| Campo | Valor |
+|---|---|
+| A | N/A |
+| - | - |
+"""
+        assert lxml_converter.convert(markdown) == markdown_converter.convert(markdown)
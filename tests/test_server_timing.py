@@ -0,0 +1,105 @@
+"""Testes para os tempos por requisição no header Server-Timing."""
+
+import json
+import logging
+
+from flask import Flask
+
+from app import create_app
+from config import Config
+from utils import server_timing
+from utils.server_timing import header_value, instrument, record, timed
+
+AUTH_HEADER = {"Authorization": "Bearer mock-token"}
+
+
+@instrument("db")
+class FakeService:
+    def get(self):
+        return "ok"
+
+    def list(self):
+        return [self.get(), self.get()]
+
+    def _private(self):
+        return "privado"
+
+
+def timing_names(response):
+    return [
+        part.split(";")[0] for part in response.headers["Server-Timing"].split(", ")
+    ]
+
+
+class TestServerTiming:
+    """Testes para a medição por fase e a saída no header e no log."""
+
+    def test_header_value(self):
+        """Testa o formato do header, com contagem para fases repetidas."""
+        value = header_value({"parse": [0.0123, 1], "db get": [0.002, 3]}, total=0.5)
+
+        assert value == ('parse;dur=12.3, db_get;dur=2.0;desc="3x", total;dur=500.0')
+
+    def test_instrument_counts_outermost_call(self):
+        """Testa que chamadas aninhadas contam só na chamada externa."""
+        app = Flask(__name__)
+        server_timing.init_app(app)
+
+        @app.route("/")
+        def index():
+            service = FakeService()
+            service.list()
+            service.get()
+            service._private()
+            return "ok"
+
+        response = app.test_client().get("/")
+
+        assert timing_names(response) == ["db-list", "db-get", "total"]
+
+    def test_header_off_by_default(self, client):
+        """Testa que o app não expõe o header sem SERVER_TIMING_HEADER=1."""
+        assert "Server-Timing" not in client.get("/api/health").headers
+
+    def test_convert_reports_phases(
+        self, sample_markdown, mock_auth, mock_supabase, monkeypatch
+    ):
+        """Testa as fases de auth e conversão em /api/convert/preview."""
+        monkeypatch.setattr(Config, "SERVER_TIMING_HEADER", True)
+        client = create_app().test_client()
+
+        response = client.post(
+            "/api/convert/preview",
+            json={"markdown": sample_markdown},
+            headers=AUTH_HEADER,
+        )
+
+        names = timing_names(response)
+        assert names[:2] == ["auth-jwt", "auth-profile"]
+        assert {"parse", "postprocess", "template"} <= set(names)
+        assert names[-1] == "total"
+
+    def test_log_line(self, caplog):
+        """Testa a linha JSON no log, sem o header."""
+        app = Flask(__name__)
+        server_timing.init_app(app, header=False, log=True)
+
+        @app.route("/rota")
+        def rota():
+            with timed("fase"):
+                pass
+            record("fase", 0.001)
+            return "ok"
+
+        with caplog.at_level(logging.INFO, logger="utils.server_timing"):
+            response = app.test_client().get("/rota")
+
+        assert "Server-Timing" not in response.headers
+        line = json.loads(caplog.records[-1].getMessage())
+        assert line["path"] == "/rota"
+        assert line["status"] == 200
+        assert line["timings"]["fase"]["count"] == 2
+
+    def test_record_outside_request_is_ignored(self):
+        """Testa que medições fora de uma requisição não falham."""
+        record("fase", 1.0)
@@ -0,0 +1,33 @@
+"""Testes para o CSS compilado do ThemeManager."""
+
+
+class TestCompileCss:
+    """Testes para a compilação e o cache do CSS do tema."""
+
+    def test_resolves_variables(self, theme_manager):
+        """Testa que o CSS sai sem :root e sem var(), com as cores do tema."""
+        theme = theme_manager.get_theme_config("juridico")
+        css = theme_manager.compile_css(theme)
+
+        assert ":root" not in css
+        assert "var(" not in css
+        assert theme["colors"]["primary"] in css
+
+    def test_cached_by_theme_config(self, theme_manager):
+        """Testa o cache pela configuração e o limite de entradas."""
+        theme_manager.max_css = 1
+        juridico = theme_manager.get_theme_config("juridico")
+        corporativo = theme_manager.get_theme_config("corporativo")
+
+        first = theme_manager.compile_css(juridico)
+        assert theme_manager.compile_css(dict(juridico)) is first
+        theme_manager.compile_css(corporativo)
+        assert len(theme_manager._css) == 1
+        assert theme_manager.compile_css(juridico) is not first
+
+    def test_theme_values_cannot_close_style(self, theme_manager):
+        """Testa que um valor do tema não fecha a tag <style>."""
+        theme = theme_manager.get_theme_config("juridico")
+        theme = {**theme, "colors": {**theme["colors"], "primary": "red</style>"}}
+
+        assert "</style>" not in theme_manager.compile_css(theme)
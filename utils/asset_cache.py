@@ -0,0 +1,175 @@
+"""Cache em disco dos recursos externos (CSS, fontes, logos) usados nos PDFs."""
+
+import hashlib
+import logging
+import time
+
+from config import Config
+from utils.disk_cache import DiskCache, pack_entry, unpack_entry
+
+try:
+    from weasyprint import default_url_fetcher
+except ImportError:
+    default_url_fetcher = None
+
+logger = logging.getLogger(__name__)
+
+CACHED_SCHEMES = ("http://", "https://")
+
+
+class AssetCache(DiskCache):
+    """url_fetcher do WeasyPrint com cache persistente dos recursos remotos.
+
+    Ordem de busca de uma URL http(s):
+    - Memória (LRU por processo) e disco em cache_folder, dentro do TTL.
+    - bundle_folder: recursos distribuídos com o código (nunca expiram).
+    - Rede, com timeout curto; se falhar, usa a cópia vencida do disco e
+      evita repetir a tentativa por failure_ttl segundos.
+
+    No modo offline a rede nunca é usada: só o disco (com qualquer idade) e
+    o bundle. URLs data: e file: vão direto para o fetcher padrão.
+    """
+
+    suffix = ".asset"
+    label = "cache de recursos"
+
+    def __init__(
+        self,
+        cache_folder=None,
+        bundle_folder=None,
+        ttl=7 * 24 * 3600,
+        max_disk_bytes=64 * 1024 * 1024,
+        max_entries=64,
+        timeout=5,
+        offline=False,
+        failure_ttl=60,
+        fetcher=None,
+    ):
+        super().__init__(cache_folder, max_entries, max_disk_bytes)
+        self.bundle_folder = bundle_folder
+        self.ttl = ttl
+        self.timeout = timeout
+        self.offline = offline
+        self.failure_ttl = failure_ttl
+        self.fetcher = fetcher or default_url_fetcher
+        self._failures = {}
+
+    @staticmethod
+    def make_key(url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    # ========== API ==========
+
+    def fetch(self, url):
+        """Mesmo retorno do default_url_fetcher do WeasyPrint."""
+        if not url.startswith(CACHED_SCHEMES):
+            return self.fetcher(url)
+
+        key = self.make_key(url)
+        entry = self._recall(key)
+        if entry is None or not self._usable(entry):
+            # Outro worker pode já ter atualizado o disco
+            stored = self._read_disk(key)
+            if stored is not None:
+                entry = stored
+                self._remember(key, entry)
+        if entry is not None and self._usable(entry):
+            return self._response(entry)
+
+        if self.bundle_folder:
+            bundled = self._load(self._disk_path(key, self.bundle_folder))
+            if bundled is not None:
+                return self._response(bundled)
+
+        if self.offline:
+            raise ValueError(f"Recurso fora do cache no modo offline: {url}")
+
+        try:
+            fetched = self._fetch_remote(url, key)
+        except Exception:
+            if entry is None:
+                raise
+            logger.warning("Falha ao atualizar recurso, usando cópia vencida: %s", url)
+            return self._response(entry)
+
+        self._remember(key, fetched)
+        self._write_disk(key, fetched)
+        return self._response(fetched)
+
+    def clear(self):
+        """Esvazia a memória e o disco (o bundle não é alterado)."""
+        with self._lock:
+            self._failures.clear()
+        super().clear()
+
+    # ========== REDE ==========
+
+    def _fetch_remote(self, url, key):
+        with self._lock:
+            failed_at = self._failures.get(key)
+        if failed_at is not None and time.time() - failed_at < self.failure_ttl:
+            raise ValueError(f"Recurso indisponível (falha recente): {url}")
+
+        try:
+            result = self.fetcher(url, timeout=self.timeout)
+            if "file_obj" in result:
+                try:
+                    body = result["file_obj"].read()
+                finally:
+                    result["file_obj"].close()
+            else:
+                body = result["string"]
+            if isinstance(body, str):
+                body = body.encode(result.get("encoding") or "utf-8")
+        except Exception:
+            with self._lock:
+                self._failures[key] = time.time()
+            raise
+
+        with self._lock:
+            self._failures.pop(key, None)
+        return {
+            "meta": {
+                "url": url,
+                "mime_type": result.get("mime_type"),
+                "encoding": result.get("encoding"),
+                "redirected_url": result.get("redirected_url") or url,
+                "fetched_at": time.time(),
+            },
+            "body": body,
+        }
+
+    def _usable(self, entry):
+        """No modo offline qualquer cópia serve; online, só dentro do TTL."""
+        return self.offline or time.time() - entry["meta"]["fetched_at"] < self.ttl
+
+    @staticmethod
+    def _response(entry):
+        meta = entry["meta"]
+        return {
+            "string": entry["body"],
+            "mime_type": meta["mime_type"],
+            "encoding": meta["encoding"],
+            "redirected_url": meta["redirected_url"],
+        }
+
+    # ========== DISCO ==========
+
+    def _encode(self, entry):
+        """Uma linha JSON com os metadados e depois o conteúdo."""
+        return pack_entry(entry["meta"], entry["body"])
+
+    def _decode(self, data):
+        meta, body = unpack_entry(data)
+        return {"meta": meta, "body": body}
+
+
+# Instancia singleton
+asset_cache = AssetCache(
+    cache_folder=Config.ASSET_CACHE_FOLDER,
+    bundle_folder=Config.ASSET_BUNDLE_FOLDER,
+    ttl=Config.ASSET_CACHE_TTL,
+    max_disk_bytes=Config.ASSET_CACHE_MAX_BYTES,
+    timeout=Config.ASSET_FETCH_TIMEOUT,
+    offline=Config.PDF_OFFLINE,
+)
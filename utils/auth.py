@@ -6,6 +6,7 @@ from flask import g, jsonify, request
 from jwt import PyJWKClient
 
 from config import Config
+from utils.server_timing import timed
 
 logger = logging.getLogger(__name__)
 
@@ -70,12 +71,14 @@ def auth_required(f):
             return jsonify({"error": "Token ausente"}), 401
 
         token = auth_header.split(" ", 1)[1]
-        payload = verify_supabase_token(token)
+        with timed("auth-jwt"):
+            payload = verify_supabase_token(token)
         if not payload:
             return jsonify({"error": "Token invalido ou expirado"}), 401
 
         user_id = payload.get("sub")
-        profile = get_user_profile(user_id)
+        with timed("auth-profile"):
+            profile = get_user_profile(user_id)
         if not profile:
             return jsonify({"error": "Profile nao encontrado"}), 401
 
@@ -92,12 +95,13 @@ def get_client_carteira_ids(user_id):
     from utils.supabase_client import supa_service
 
     try:
-        result = (
-            supa_service.client.table("cliente_carteira_access")
-            .select("carteira_id")
-            .eq("profile_id", user_id)
-            .execute()
-        )
+        with timed("auth-carteiras"):
+            result = (
+                supa_service.client.table("cliente_carteira_access")
+                .select("carteira_id")
+                .eq("profile_id", user_id)
+                .execute()
+            )
         return {item["carteira_id"] for item in result.data}
     except Exception:
         logger.exception("Erro ao buscar carteiras do cliente %s", user_id)
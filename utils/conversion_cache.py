@@ -0,0 +1,89 @@
+"""Cache de conversoes MD->HTML enderecado por conteudo (memoria LRU + disco)."""
+
+import hashlib
+import json
+import os
+
+from utils.disk_cache import DiskCache
+
+# Incrementar quando o formato das entradas mudar, para invalidar as antigas
+# persistidas em disco. Mudancas no codigo do conversor ja entram na chave
+# pelo converter_source_hash().
+CACHE_VERSION = 1
+
+# Modulos cujo codigo determina o HTML gerado a partir do markdown
+CONVERTER_MODULES = (
+    "markdown_converter.py",
+    "metadata_scanner.py",
+    "lxml_postprocessor.py",
+    "theme_manager.py",
+)
+
+
+def converter_source_hash(modules=CONVERTER_MODULES):
+    """Hash do codigo do conversor, para invalidar o cache apos um deploy."""
+    folder = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for name in modules:
+        digest.update(name.encode("utf-8") + b"\0")
+        with open(os.path.join(folder, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class ConversionCache(DiskCache):
+    """Cache de duas camadas para resultados de conversao.
+
+    - Memoria: LRU limitado por numero de entradas (por processo).
+    - Disco: arquivos JSON em cache_folder, limitados por tamanho total e
+      compartilhados entre workers do gunicorn (sobrevive a restarts).
+    """
+
+    suffix = ".json"
+    label = "cache de conversao"
+
+    @staticmethod
+    def make_key(markdown_text, theme_config, custom_config=None, options=None):
+        """Gera a chave SHA-256 a partir de todas as entradas da conversao."""
+        payload = json.dumps(
+            {
+                "version": CACHE_VERSION,
+                "theme": theme_config,
+                "custom_config": custom_config or {},
+                "options": options or {},
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        digest = hashlib.sha256()
+        digest.update(payload.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(markdown_text.encode("utf-8"))
+        return digest.hexdigest()
+
+    # ========== API ==========
+
+    def get(self, key):
+        """Retorna o valor em cache ou None. Promove hits do disco para memoria."""
+        value = self._recall(key)
+        if value is not None:
+            return value
+
+        value = self._read_disk(key)
+        if value is not None:
+            self._remember(key, value)
+        return value
+
+    def set(self, key, value):
+        """Armazena um valor serializavel em JSON nas duas camadas."""
+        self._remember(key, value)
+        self._write_disk(key, value)
+
+    # ========== DISCO ==========
+
+    def _encode(self, value):
+        return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+    def _decode(self, data):
+        return json.loads(data)
@@ -0,0 +1,309 @@
+"""Pipeline de conversao MD->HTML->PDF compartilhado pelas rotas."""
+
+import logging
+import time
+from datetime import datetime
+
+from utils.conversion_cache import ConversionCache
+
+logger = logging.getLogger(__name__)
+
+# Estágios na ordem de execução
+STAGES = ("parse", "postprocess", "template", "pdf", "persist")
+
+# Estágios que produzem rendered_html e title, cobertos pelo cache de conversão
+CACHED_STAGES = ("parse", "postprocess", "template")
+
+
+def generate_filename(extension="html"):
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"relatorio_{timestamp}.{extension}"
+
+
+class ConversionContext:
+    """
+    Estado de uma conversão, lido e preenchido pelos estágios do pipeline.
+
+    Args:
+        markdown_text: Markdown de entrada (None quando rendered_html é dado)
+        theme_name: Nome do tema, registrado nos documentos
+        theme_config: Configuração do tema usada no template
+        custom_config: Ajustes de cores e fontes enviados pelo cliente
+        formats: Arquivos gerados: "html", "pdf" ou ambos
+        orientation: Orientação do PDF ("portrait" ou "landscape")
+        rendered_html: HTML final já pronto; pula parse, postprocess e template
+        persist: Envia os arquivos ao Storage e registra em documentos
+        document_fields: Campos extras dos registros (processo_id, title, ...)
+    """
+
+    def __init__(
+        self,
+        markdown_text=None,
+        theme_name="juridico",
+        theme_config=None,
+        custom_config=None,
+        formats=("html",),
+        orientation="portrait",
+        rendered_html=None,
+        persist=True,
+        document_fields=None,
+    ):
+        self.markdown_text = markdown_text
+        self.theme_name = theme_name
+        self.theme_config = theme_config
+        self.custom_config = custom_config or {}
+        self.formats = tuple(formats)
+        self.orientation = orientation
+        self.document_fields = document_fields or {}
+
+        # Preenchidos pelos estágios
+        self.fragments = None
+        self.html = None
+        self.title = None
+        self.metadata = None
+        self.rendered_html = rendered_html
+        self.pdf_content = None
+        # file_type -> {"filename", "storage_path", "record", "signed_url"}
+        self.documents = {}
+
+        # Estágio -> segundos; estágios pulados não aparecem aqui
+        self.timings = {}
+        self.skip = set()
+        self.cache_key = None
+        self.cache_hit = False
+        if rendered_html is not None:
+            self.skip.update(CACHED_STAGES)
+        if "pdf" not in self.formats:
+            self.skip.add("pdf")
+        if not persist:
+            self.skip.add("persist")
+
+
+class ConversionPipeline:
+    """
+    Executa os estágios parse -> postprocess -> template -> pdf -> persist.
+
+    Cada estágio é uma função que recebe o ConversionContext e pode ser
+    trocada com set_stage(). Hooks registrados com add_hook() rodam antes e
+    depois de cada estágio: o hook "before" pode pular o estágio retornando
+    True, e o "after" recebe a duração medida. O cache de conversão é um par
+    de hooks instalado por use_cache().
+    """
+
+    def __init__(
+        self,
+        converter,
+        theme_manager=None,
+        pdf_converter=None,
+        storage=None,
+        render=None,
+        parallel_min_chars=None,
+        max_workers=None,
+    ):
+        self.converter = converter
+        self.theme_manager = theme_manager
+        self.pdf_converter = pdf_converter
+        self.storage = storage
+        self.render = render
+        self.parallel_min_chars = parallel_min_chars
+        self.max_workers = max_workers
+        self.cache = None
+        self._before_hooks = []
+        self._after_hooks = []
+        self.stages = {
+            "parse": self._parse,
+            "postprocess": self._postprocess,
+            "template": self._template,
+            "pdf": self._pdf,
+            "persist": self._persist,
+        }
+
+    # ========== CONFIGURAÇÃO ==========
+
+    def set_stage(self, name, func):
+        """Substitui a função de um estágio; func recebe o ConversionContext."""
+        if name not in self.stages:
+            raise ValueError(f"Estágio desconhecido: '{name}'")
+        self.stages[name] = func
+
+    def add_hook(self, before=None, after=None):
+        """
+        Registra hooks de estágio.
+
+        Args:
+            before: func(stage, ctx); retornar True pula o estágio
+            after: func(stage, ctx, seconds), chamado só para estágios executados
+        """
+        if before:
+            self._before_hooks.append(before)
+        if after:
+            self._after_hooks.append(after)
+
+    def use_cache(self, cache, options=None):
+        """
+        Reaproveita rendered_html e title do ConversionCache: num acerto os
+        estágios parse, postprocess e template são pulados.
+
+        Args:
+            cache: Instância de ConversionCache (pode ser trocada em self.cache)
+            options: func(ctx) -> dict com as demais entradas da chave
+        """
+        self.cache = cache
+
+        def before(stage, ctx):
+            if stage != CACHED_STAGES[0] or self.cache is None:
+                return False
+            ctx.cache_key = ConversionCache.make_key(
+                ctx.markdown_text,
+                ctx.theme_config,
+                ctx.custom_config,
+                options=options(ctx) if options else None,
+            )
+            cached = self.cache.get(ctx.cache_key)
+            if cached is None:
+                return False
+            logger.debug("Cache de conversao: hit %s", ctx.cache_key[:12])
+            ctx.rendered_html = cached["rendered_html"]
+            ctx.title = cached["title"]
+            ctx.cache_hit = True
+            ctx.skip.update(CACHED_STAGES)
+            return True
+
+        def after(stage, ctx, seconds):
+            if stage == CACHED_STAGES[-1] and ctx.cache_key:
+                self.cache.set(
+                    ctx.cache_key,
+                    {"rendered_html": ctx.rendered_html, "title": ctx.title},
+                )
+
+        self.add_hook(before, after)
+
+    # ========== EXECUÇÃO ==========
+
+    def context(self, markdown_text=None, theme_name=None, **kwargs):
+        """
+        Cria o ConversionContext com o tema resolvido pelo ThemeManager e os
+        ajustes de custom_config aplicados. Os demais argumentos vão para
+        ConversionContext.
+        """
+        theme_name = theme_name.lower().strip() if theme_name else "juridico"
+        theme_config = None
+        if self.theme_manager is not None:
+            theme_config = self.theme_manager.get_theme_config(theme_name)
+            custom_config = kwargs.get("custom_config")
+            if custom_config:
+                if "colors" in custom_config:
+                    theme_config["colors"].update(custom_config["colors"])
+                if "fonts" in custom_config:
+                    theme_config["fonts"].update(custom_config["fonts"])
+        return ConversionContext(
+            markdown_text, theme_name=theme_name, theme_config=theme_config, **kwargs
+        )
+
+    def run(self, ctx, until=None):
+        """
+        Executa os estágios em ordem, medindo cada um em ctx.timings.
+
+        Args:
+            ctx: ConversionContext
+            until: Último estágio a executar (padrão: todos)
+        """
+        for name in STAGES:
+            if name not in ctx.skip and not any(
+                hook(name, ctx) for hook in self._before_hooks
+            ):
+                start = time.perf_counter()
+                self.stages[name](ctx)
+                seconds = time.perf_counter() - start
+                ctx.timings[name] = seconds
+                for hook in self._after_hooks:
+                    hook(name, ctx, seconds)
+            if name == until:
+                break
+        logger.debug(
+            "Pipeline de conversao: %s",
+            ", ".join(f"{name}={s * 1000:.1f}ms" for name, s in ctx.timings.items()),
+        )
+        return ctx
+
+    # ========== ESTÁGIOS ==========
+
+    def _parse(self, ctx):
+        parallel = (
+            self.parallel_min_chars is not None
+            and len(ctx.markdown_text) >= self.parallel_min_chars
+        )
+        ctx.fragments = self.converter.parse(
+            ctx.markdown_text, parallel=parallel, max_workers=self.max_workers
+        )
+
+    def _postprocess(self, ctx):
+        document = self.converter.postprocess(
+            ctx.fragments, ctx.markdown_text, max_workers=self.max_workers
+        )
+        ctx.fragments = None
+        ctx.html = document["html"]
+        ctx.title = document["title"]
+        ctx.metadata = document["metadata"]
+
+    def _template(self, ctx):
+        ctx.rendered_html = self.render(
+            "base.html",
+            title=ctx.title,
+            header_title=ctx.title,
+            content=ctx.html,
+            theme=ctx.theme_config,
+            theme_css=self.theme_manager.compile_css(ctx.theme_config),
+            metadata=ctx.metadata,
+            current_year=datetime.now().year,
+        )
+
+    def _pdf(self, ctx):
+        ctx.pdf_content = self.pdf_converter.html_to_pdf_bytes(
+            ctx.rendered_html, ctx.orientation, ctx.theme_config
+        )
+
+    def _persist(self, ctx):
+        """
+        Envia cada arquivo ao Storage e registra em documentos. Se um registro
+        falhar, remove do Storage os arquivos que ainda não foram registrados.
+        """
+        contents = {}
+        if "html" in ctx.formats:
+            contents["html"] = ctx.rendered_html.encode("utf-8")
+        if "pdf" in ctx.formats:
+            contents["pdf"] = ctx.pdf_content
+
+        pending = []
+        for file_type, content in contents.items():
+            storage_path = self.storage.upload_file(content, file_type)
+            ctx.documents[file_type] = {
+                "filename": generate_filename(file_type),
+                "storage_path": storage_path,
+            }
+            pending.append(storage_path)
+
+        for file_type, content in contents.items():
+            document = ctx.documents[file_type]
+            try:
+                document["record"] = self.storage.create_documento(
+                    {
+                        **ctx.document_fields,
+                        "filename": document["filename"],
+                        "file_type": file_type,
+                        "storage_path": document["storage_path"],
+                        "file_size": len(content),
+                        "title": ctx.document_fields.get("title", ctx.title),
+                        "theme": ctx.document_fields.get("theme", ctx.theme_name),
+                    }
+                )
+            except Exception:
+                for storage_path in pending:
+                    self.storage.delete_file(storage_path)
+                raise
+            pending.remove(document["storage_path"])
+
+        for document in ctx.documents.values():
+            document["signed_url"] = self.storage.get_signed_url(
+                document["storage_path"]
+            )
@@ -0,0 +1,160 @@
+"""Base dos caches de duas camadas (memoria LRU + disco) do projeto."""
+
+import abc
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def pack_entry(meta, body):
+    """Entrada em disco com metadados: uma linha JSON e depois o conteudo."""
+    return json.dumps(meta).encode("utf-8") + b"\n" + body
+
+
+def unpack_entry(data):
+    """Inverso de pack_entry(): (meta, body). ValueError se estiver corrompida."""
+    meta, _sep, body = data.partition(b"\n")
+    return json.loads(meta), body
+
+
+class DiskCache(abc.ABC):
+    """Cache de duas camadas com chaves hexadecimais.
+
+    - Memoria: LRU limitado por numero de entradas (por processo).
+    - Disco: um arquivo <key><suffix> por entrada em cache_folder, limitado
+      por tamanho total e compartilhado entre processos. A escrita e atomica
+      e a poda remove primeiro as entradas lidas ha mais tempo.
+
+    Subclasses definem suffix, label (para o log) e a serializacao em
+    _encode()/_decode(); sem elas a classe nao pode ser instanciada.
+    """
+
+    suffix = ".cache"
+    label = "cache"
+
+    def __init__(self, cache_folder=None, max_entries=128, max_disk_bytes=0):
+        self.cache_folder = cache_folder
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None
+
+    @abc.abstractmethod
+    def _encode(self, value):
+        """Serializa o valor em bytes para o disco."""
+
+    @abc.abstractmethod
+    def _decode(self, data):
+        """Inverso de _encode(); ValueError ou KeyError se estiver corrompido."""
+
+    def clear(self):
+        """Esvazia a memoria e o disco."""
+        with self._lock:
+            self._memory.clear()
+        if not self.cache_folder or not os.path.isdir(self.cache_folder):
+            return
+        for path, _size, _mtime in self._disk_entries():
+            with contextlib.suppress(OSError):
+                os.remove(path)
+        self._disk_bytes = 0
+
+    # ========== MEMORIA ==========
+
+    def _recall(self, key):
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+            return value
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    # ========== DISCO ==========
+
+    def _disk_path(self, key, folder=None):
+        return os.path.join(folder or self.cache_folder, key[:2], key + self.suffix)
+
+    def _load(self, path):
+        """Valor gravado em path, ou None se faltar ou estiver corrompido."""
+        try:
+            with open(path, "rb") as f:
+                return self._decode(f.read())
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _read_disk(self, key):
+        if not self.cache_folder:
+            return None
+        path = self._disk_path(key)
+        value = self._load(path)
+        if value is not None:
+            # Atualiza mtime para que a poda remova primeiro as menos usadas
+            with contextlib.suppress(OSError):
+                os.utime(path)
+        return value
+
+    def _write_disk(self, key, value):
+        if not self.cache_folder or self.max_disk_bytes <= 0:
+            return
+        path = self._disk_path(key)
+        data = self._encode(value)
+        if len(data) > self.max_disk_bytes:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Escrita atomica: outros workers nunca leem um arquivo parcial
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.warning("Falha ao gravar %s: %s", self.label, path)
+            return
+
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _p, size, _m in self._disk_entries())
+        else:
+            self._disk_bytes += len(data)
+        if self._disk_bytes > self.max_disk_bytes:
+            self._prune_disk()
+
+    def _disk_entries(self):
+        entries = []
+        for root, _dirs, files in os.walk(self.cache_folder):
+            for name in files:
+                if not name.endswith(self.suffix):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _prune_disk(self):
+        """Remove as entradas menos recentes ate ficar em ~90% do limite."""
+        entries = sorted(self._disk_entries(), key=lambda e: e[2])
+        total = sum(size for _p, size, _m in entries)
+        target = int(self.max_disk_bytes * 0.9)
+        for path, size, _mtime in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
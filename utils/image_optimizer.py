@@ -0,0 +1,217 @@
+"""Reducao das imagens dos PDFs: resolucao da pagina e recompressao, com cache."""
+
+import hashlib
+import io
+import json
+import logging
+
+from config import Config
+from utils.disk_cache import DiskCache, pack_entry, unpack_entry
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_MIME_TYPES = {
+    "image/png",
+    "image/jpeg",
+    "image/jpg",
+    "image/webp",
+    "image/bmp",
+    "image/tiff",
+}
+# Resolução de referência do CSS (1px = 1/96 pol.)
+CSS_DPI = 96
+# Largura útil do A4 com as margens de 1cm da folha de impressão, em mm
+CONTENT_WIDTH_MM = {"portrait": 190, "landscape": 277}
+# max-width dos logos no template (.header-logo, .footer-logo-container img)
+LOGO_MAX_CSS_PX = 150
+# PNG sem transparência só vira JPEG se ficar abaixo desta fração do PNG
+# otimizado: fotos e digitalizações ganham muito, capturas de tela com texto
+# (que o JPEG borra) continuam PNG
+JPEG_MAX_RATIO = 0.5
+
+
+class ImageOptimizer(DiskCache):
+    """Reduz as imagens que o WeasyPrint embute no PDF.
+
+    Cada imagem é reduzida para a largura útil da página (ou do logo) na
+    resolução dpi e recomprimida (PNG otimizado ou JPEG). Como a imagem
+    reduzida nunca fica menor que a área onde é exibida, o layout não muda.
+    Resultados em cache (memória LRU + disco) pelo hash da imagem original e
+    das configurações.
+    """
+
+    suffix = ".img"
+    label = "cache de imagens"
+
+    def __init__(
+        self,
+        cache_folder=None,
+        dpi=150,
+        jpeg_quality=80,
+        max_disk_bytes=128 * 1024 * 1024,
+        max_entries=64,
+    ):
+        super().__init__(cache_folder, max_entries, max_disk_bytes)
+        self.dpi = dpi
+        self.jpeg_quality = jpeg_quality
+
+    def settings(self):
+        """Configurações que mudam o resultado (entram no fingerprint do PDF)."""
+        return {"dpi": self.dpi, "jpeg_quality": self.jpeg_quality}
+
+    def max_pixels(self, orientation="portrait", css_px=None):
+        """
+        Largura máxima em pixels da área de conteúdo (ou de css_px) em dpi.
+        Nunca abaixo de 96 dpi (1 pixel por px CSS): a imagem seria ampliada
+        na página e ficaria borrada.
+        """
+        dpi = max(self.dpi, CSS_DPI)
+        if css_px is not None:
+            return round(css_px * dpi / CSS_DPI)
+        width_mm = CONTENT_WIDTH_MM.get(orientation, CONTENT_WIDTH_MM["portrait"])
+        return round(width_mm / 25.4 * dpi)
+
+    # ========== API ==========
+
+    def wrap(self, fetcher, orientation="portrait", logo_url=None):
+        """url_fetcher que passa as imagens retornadas por fetcher por optimize()."""
+        content_px = self.max_pixels(orientation)
+        logo_px = self.max_pixels(orientation, LOGO_MAX_CSS_PX)
+
+        def fetch(url):
+            result = fetcher(url)
+            mime_type = (result.get("mime_type") or "").lower()
+            if mime_type not in IMAGE_MIME_TYPES:
+                return result
+
+            if "file_obj" in result:
+                try:
+                    body = result["file_obj"].read()
+                finally:
+                    result["file_obj"].close()
+            else:
+                body = result["string"]
+            response = {
+                key: value
+                for key, value in result.items()
+                if key not in ("file_obj", "string")
+            }
+            response["string"], response["mime_type"] = self.optimize(
+                body, logo_px if url == logo_url else content_px, mime_type
+            )
+            return response
+
+        return fetch
+
+    def optimize(self, data, max_px, mime_type=None):
+        """
+        Returns:
+            (bytes, mime_type) reduzidos, ou os originais se não houver ganho
+        """
+        if Image is None:
+            return data, mime_type
+
+        key = self._make_key(data, max_px)
+        entry = self._recall(key)
+        if entry is None:
+            entry = self._read_disk(key)
+            if entry is None:
+                entry = self._process(data, max_px)
+                self._write_disk(key, entry)
+            self._remember(key, entry)
+
+        optimized_mime, optimized = entry
+        if optimized_mime is None:
+            return data, mime_type
+        return optimized, optimized_mime
+
+    # ========== PROCESSAMENTO ==========
+
+    def _make_key(self, data, max_px):
+        digest = hashlib.sha256(
+            json.dumps({**self.settings(), "max_px": max_px}, sort_keys=True).encode()
+        )
+        digest.update(b"\0")
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _process(self, data, max_px):
+        """(mime_type, bytes) do menor resultado, ou (None, b"") sem ganho."""
+        try:
+            with Image.open(io.BytesIO(data)) as source:
+                if getattr(source, "is_animated", False):
+                    return None, b""
+                source_format = source.format
+                image = ImageOps.exif_transpose(source)
+                has_alpha = image.mode in ("RGBA", "LA", "PA") or (
+                    image.mode == "P" and "transparency" in image.info
+                )
+                if image.mode not in ("L", "RGB", "RGBA", "LA"):
+                    image = image.convert("RGBA" if has_alpha else "RGB")
+
+                resized = image.width > max_px
+                if resized:
+                    height = max(1, round(image.height * max_px / image.width))
+                    image = image.resize((max_px, height), Image.Resampling.LANCZOS)
+
+                candidates = []
+                if has_alpha or source_format != "JPEG":
+                    candidates.append(("image/png", self._save(image, "PNG")))
+                if not has_alpha:
+                    jpeg = self._save(image, "JPEG")
+                    png_size = len(candidates[0][1]) if candidates else None
+                    if png_size is None or len(jpeg) < JPEG_MAX_RATIO * png_size:
+                        candidates.append(("image/jpeg", jpeg))
+        except (OSError, ValueError, Image.DecompressionBombError):
+            logger.warning("Imagem não pôde ser otimizada", exc_info=True)
+            return None, b""
+
+        mime_type, optimized = min(candidates, key=lambda c: len(c[1]))
+        if not resized and len(optimized) >= len(data):
+            return None, b""
+        return mime_type, optimized
+
+    def _save(self, image, image_format):
+        output = io.BytesIO()
+        if image_format == "JPEG":
+            if image.mode != "L":
+                image = image.convert("RGB")
+            image.save(
+                output,
+                "JPEG",
+                quality=self.jpeg_quality,
+                optimize=True,
+                progressive=True,
+            )
+        else:
+            image.save(output, "PNG", optimize=True)
+        return output.getvalue()
+
+    # ========== DISCO ==========
+
+    def _encode(self, entry):
+        """Uma linha JSON com o mime_type e depois a imagem."""
+        mime_type, optimized = entry
+        return pack_entry({"mime_type": mime_type}, optimized)
+
+    def _decode(self, data):
+        meta, optimized = unpack_entry(data)
+        return meta["mime_type"], optimized
+
+
+# Instancia singleton (None com PDF_IMAGE_DPI=0)
+image_optimizer = (
+    ImageOptimizer(
+        cache_folder=Config.IMAGE_CACHE_FOLDER,
+        dpi=Config.PDF_IMAGE_DPI,
+        jpeg_quality=Config.PDF_IMAGE_JPEG_QUALITY,
+        max_disk_bytes=Config.IMAGE_CACHE_MAX_BYTES,
+    )
+    if Config.PDF_IMAGE_DPI
+    else None
+)
@@ -0,0 +1,138 @@
+"""Conversao incremental MD->HTML para sessoes de edicao."""
+
+import hashlib
+import threading
+
+from utils.markdown_converter import MarkdownConverter
+
+
+class IncrementalConverter:
+    """
+    Reconverte apenas as seções H1/H2 que mudaram desde a última conversão.
+
+    O HTML de cada seção fica memorizado pelo hash do seu texto; numa nova
+    conversão as seções inalteradas são reaproveitadas e o resultado é
+    emendado na ordem do documento. As passagens que dependem do documento
+    inteiro (preparo do markdown, remoção do primeiro H1 e da seção de
+    metadados, título e metadados) são refeitas a cada chamada, então o HTML
+    é idêntico ao de MarkdownConverter.convert_document().
+
+    Usa só as etapas públicas por seção do MarkdownConverter (split_sections,
+    render_section, first_occurrence_indexes, metadata_runs_into_header,
+    postprocess_section e merge_metadata). Guarda apenas as seções da última
+    conversão; use uma instância por documento em edição.
+    """
+
+    def __init__(self, converter=None):
+        self.converter = converter or MarkdownConverter()
+        # (hash, é a última seção) -> HTML da seção antes do pós-processamento
+        self._fragments = {}
+        # (hash, é a última seção, remove_header, remove_metadata_section)
+        # -> (html, table_metadata) da seção pós-processada
+        self._results = {}
+        self._lock = threading.Lock()
+        # Seções da última conversão e quantas precisaram ser reconvertidas
+        self.last_stats = {"sections": 0, "rendered": 0}
+
+    @staticmethod
+    def _section_key(section_text):
+        return hashlib.sha256(section_text.encode("utf-8")).hexdigest()
+
+    def convert(self, markdown_text, remove_header=True, remove_metadata_section=False):
+        """Converte markdown para HTML; mesmos argumentos de MarkdownConverter.convert()"""
+        return self.convert_document(
+            markdown_text, remove_header, remove_metadata_section
+        )["html"]
+
+    def convert_document(
+        self, markdown_text, remove_header=True, remove_metadata_section=False
+    ):
+        """
+        Converte markdown em HTML, título e metadados reaproveitando as seções
+        já convertidas.
+
+        Returns:
+            dict com as chaves "html", "title" e "metadata"
+        """
+        with self._lock:
+            result = self._convert_sections(
+                markdown_text, remove_header, remove_metadata_section
+            )
+
+        if result is None:
+            return self.converter.convert_document(
+                markdown_text, remove_header, remove_metadata_section
+            )
+
+        html, table_metadata = result
+        return {
+            "html": html,
+            "title": self.converter.extract_title(markdown_text),
+            "metadata": self.converter.merge_metadata(markdown_text, table_metadata),
+        }
+
+    def clear(self):
+        """Descarta as seções memorizadas"""
+        with self._lock:
+            self._fragments = {}
+            self._results = {}
+
+    def _convert_sections(self, markdown_text, remove_header, remove_metadata_section):
+        converter = self.converter
+        sections = converter.split_sections(markdown_text)
+        self.last_stats = {"sections": len(sections), "rendered": len(sections)}
+        if len(sections) < 2:
+            return None
+
+        last = len(sections) - 1
+        keys = [(self._section_key(text), i == last) for i, text in enumerate(sections)]
+
+        fragments = {}
+        rendered = 0
+        for key, text in zip(keys, sections, strict=True):
+            if key in fragments:
+                continue
+            fragment = self._fragments.get(key)
+            if fragment is None:
+                fragment = converter.render_section(text, key[1])
+                if fragment is None:
+                    return None
+                rendered += 1
+            fragments[key] = fragment
+
+        header_index, metadata_index = converter.first_occurrence_indexes(
+            [fragments[key] for key in keys], remove_header, remove_metadata_section
+        )
+        if converter.metadata_runs_into_header(header_index, metadata_index):
+            # As duas seções dependem uma da outra; converte o documento inteiro
+            self._fragments = fragments
+            self._results = {}
+            self.last_stats["rendered"] = rendered
+            return None
+
+        results = {}
+        for i, key in enumerate(keys):
+            result_key = (*key, i == header_index, i == metadata_index)
+            if result_key in results:
+                continue
+            result = self._results.get(result_key)
+            if result is None:
+                result = converter.postprocess_section(
+                    fragments[key], result_key[2], result_key[3]
+                )
+            results[result_key] = result
+
+        # Mantém só as seções do documento atual
+        self._fragments = fragments
+        self._results = results
+        self.last_stats["rendered"] = rendered
+
+        table_metadata = {}
+        parts = []
+        for i, key in enumerate(keys):
+            html, section_metadata = results[
+                (*key, i == header_index, i == metadata_index)
+            ]
+            table_metadata.update(section_metadata)
+            parts.append(html)
+        return "".join(parts), table_metadata
@@ -0,0 +1,450 @@
+"""Backend de pos-processamento HTML com lxml.
+
+Aplica sobre uma arvore lxml as mesmas transformacoes que
+MarkdownConverter._postprocess aplica com BeautifulSoup (html.parser) e
+serializa no mesmo formato do BeautifulSoup, para que o HTML final seja
+identico. A arvore do lxml vive em C, o que reduz tempo e memoria nos
+relatorios grandes.
+
+Limitacao: o parser do libxml2 segue as regras de aninhamento do HTML4 e
+fecha <p> antes de blocos como <div> ou <table>, descarta <html>/<head>/<body>
+internos e junta textos vizinhos ao ignorar tags de fechamento avulsas. HTML
+bruto invalido desse tipo pode gerar uma saida diferente da do html.parser.
+"""
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Elemento raiz artificial que envolve o fragmento durante o parse
+_ROOT_TAG = "axion-root"
+
+# Mesmos conjuntos usados pelo HTMLTreeBuilder do BeautifulSoup
+_VOID_TAGS = frozenset(
+    {
+        "area",
+        "base",
+        "basefont",
+        "bgsound",
+        "br",
+        "col",
+        "command",
+        "embed",
+        "frame",
+        "hr",
+        "image",
+        "img",
+        "input",
+        "isindex",
+        "keygen",
+        "link",
+        "menuitem",
+        "meta",
+        "nextid",
+        "param",
+        "source",
+        "spacer",
+        "track",
+        "wbr",
+    }
+)
+_RAW_TEXT_TAGS = frozenset({"script", "style"})
+_PRESERVE_WHITESPACE_TAGS = frozenset({"pre", "textarea"})
+_ASCII_SPACES = " \n\t\f\r"
+_MULTI_VALUED_ATTRIBUTES = {
+    "*": {"class", "accesskey", "dropzone"},
+    "a": {"rel", "rev"},
+    "link": {"rel", "rev"},
+    "area": {"rel"},
+    "td": {"headers"},
+    "th": {"headers"},
+    "form": {"accept-charset"},
+    "object": {"archive"},
+    "icon": {"sizes"},
+    "iframe": {"sandbox"},
+    "output": {"for"},
+}
+
+
+def is_available():
+    """Indica se o lxml esta instalado."""
+    return etree is not None
+
+
+# ========== ARVORE ==========
+
+
+def parse_fragment(html):
+    """Faz o parse de um fragmento HTML e retorna o elemento raiz artificial."""
+    parser = etree.HTMLParser(remove_blank_text=False, remove_comments=False)
+    document = etree.fromstring(
+        f"<html><body><{_ROOT_TAG}>{html}</{_ROOT_TAG}></body></html>", parser
+    )
+    root = document.find(f"body/{_ROOT_TAG}")
+    _collapse_whitespace(root)
+    return root
+
+
+def _collapse_whitespace(root):
+    """Reduz textos só de espaços a "\n" ou " ", como o BeautifulSoup faz no parse."""
+
+    def collapse(text):
+        if text and not text.strip(_ASCII_SPACES):
+            return "\n" if "\n" in text else " "
+        return text
+
+    preserved = set()
+    for element in root.iter(*_PRESERVE_WHITESPACE_TAGS):
+        preserved.update(element.iter())
+
+    for element in root.iter():
+        if element not in preserved and _is_element(element):
+            element.text = collapse(element.text)
+        if element is not root and element.getparent() not in preserved:
+            element.tail = collapse(element.tail)
+
+
+def _is_element(node):
+    return isinstance(node.tag, str)
+
+
+def _text(element):
+    """Equivalente ao get_text() do BeautifulSoup (ignora comentarios)."""
+    return "".join(element.itertext())
+
+
+def _next_element(element):
+    """Proximo irmao que e uma tag (como find_next_sibling())."""
+    for sibling in element.itersiblings():
+        if _is_element(sibling):
+            return sibling
+    return None
+
+
+def _remove(element):
+    """Remove o elemento mantendo o texto seguinte (o tail do lxml)."""
+    parent = element.getparent()
+    if element.tail:
+        previous = element.getprevious()
+        if previous is not None:
+            previous.tail = (previous.tail or "") + element.tail
+        else:
+            parent.text = (parent.text or "") + element.tail
+    parent.remove(element)
+
+
+def _clear(element):
+    for child in list(element):
+        element.remove(child)
+    element.text = None
+
+
+def _append_text(element, text):
+    if len(element):
+        last = element[-1]
+        last.tail = (last.tail or "") + text
+    else:
+        element.text = (element.text or "") + text
+
+
+# ========== SERIALIZACAO (formato do BeautifulSoup, formatter "minimal") ==========
+
+
+def _escape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _quote_attribute(value):
+    if '"' in value:
+        if "'" in value:
+            return '"' + value.replace('"', "&quot;") + '"'
+        return "'" + value + "'"
+    return '"' + value + '"'
+
+
+def _format_attributes(element):
+    multi_valued = _MULTI_VALUED_ATTRIBUTES["*"] | _MULTI_VALUED_ATTRIBUTES.get(
+        element.tag, set()
+    )
+    parts = []
+    for key, value in sorted(element.attrib.items()):
+        if key in multi_valued:
+            value = " ".join(value.split())
+        parts.append(f" {key}={_quote_attribute(_escape(value))}")
+    return "".join(parts)
+
+
+def _serialize_node(node, out, parent_tag, with_tail=True):
+    if _is_element(node):
+        tag = node.tag
+        attributes = _format_attributes(node)
+        if tag in _VOID_TAGS and node.text is None and not len(node):
+            out.append(f"<{tag}{attributes}/>")
+        else:
+            out.append(f"<{tag}{attributes}>")
+            _serialize_children(node, out)
+            out.append(f"</{tag}>")
+    elif node.tag is etree.Comment:
+        out.append(f"<!--{node.text or ''}-->")
+    elif node.tag is etree.PI:
+        out.append(f"<?{node.target} {node.text or ''}>")
+
+    if with_tail and node.tail:
+        out.append(node.tail if parent_tag in _RAW_TEXT_TAGS else _escape(node.tail))
+
+
+def _serialize_children(element, out):
+    if element.text:
+        raw = element.tag in _RAW_TEXT_TAGS
+        out.append(element.text if raw else _escape(element.text))
+    for child in element:
+        _serialize_node(child, out, element.tag)
+
+
+def serialize(element):
+    """Serializa o elemento como str(tag) do BeautifulSoup."""
+    out = []
+    _serialize_node(element, out, None, with_tail=False)
+    return "".join(out)
+
+
+def serialize_children(element):
+    out = []
+    _serialize_children(element, out)
+    return "".join(out)
+
+
+def _raw_string(node):
+    """Equivalente ao str() de um filho no BeautifulSoup."""
+    if _is_element(node):
+        return serialize(node)
+    # Comentarios viram apenas o texto, como str(Comment) no BeautifulSoup
+    return node.text or ""
+
+
+# ========== TRANSFORMACOES ==========
+
+
+def _extract_table_metadata(converter, root):
+    """Le a tabela de metadados reaproveitando _extract_from_tables.
+
+    Apenas as tabelas de nivel mais externo (fora de <details>) sao
+    convertidas para BeautifulSoup, o que mantem o custo pequeno.
+    """
+    tables = [
+        table
+        for table in root.iter("table")
+        if next(table.iterancestors("details", "table"), None) is None
+    ]
+    if not tables:
+        return {}
+    soup = BeautifulSoup("".join(serialize(t) for t in tables), "html.parser")
+    return converter._extract_from_tables(
+        [t for t in soup.find_all("table") if not t.find_parent("details")]
+    )
+
+
+def _remove_metadata_section(converter, root):
+    for h2 in list(root.iter("h2")):
+        if not converter._is_metadata_heading(_text(h2).strip()):
+            continue
+        next_elem = _next_element(h2)
+        _remove(h2)
+        while next_elem is not None:
+            if next_elem.tag in ("h1", "h2"):
+                break
+            next_sibling = _next_element(next_elem)
+            _remove(next_elem)
+            next_elem = next_sibling
+        break
+
+
+def _cell_text(cell):
+    if not len(cell):
+        return cell.text or ""
+    return _text(cell)
+
+
+def _postprocess_tables(converter, root):
+    is_empty_data = converter._is_empty_data
+    for table in list(root.iter("table")):
+        rows_to_remove = []
+        # Lista fixa, como o find_all(): limpar uma célula pode soltar da
+        # árvore uma tabela aninhada e interromper o iter()
+        for row in list(table.iter("tr")):
+            cells = list(row.iter("td"))
+            if not cells:
+                continue
+
+            empty = [is_empty_data(_cell_text(cell)) for cell in cells]
+            for cell, is_empty in zip(cells, empty, strict=True):
+                if is_empty:
+                    _clear(cell)
+
+            nested = any(empty) and any(cell.getparent() is not row for cell in cells)
+            if all(empty) or (
+                nested and all(is_empty_data(_text(cell)) for cell in cells)
+            ):
+                rows_to_remove.append(row)
+
+        for row in rows_to_remove:
+            _remove(row)
+        _tag_header_rows(table)
+
+
+def _tag_header_rows(table):
+    """Linhas só com <th> do início de uma tabela sem <thead> vão para um <thead>."""
+    children = [child for child in table if _is_element(child)]
+    if any(child.tag == "thead" for child in children):
+        return
+
+    container = table
+    if children and children[0].tag == "tbody":
+        container = children[0]
+    if container.text and container.text.strip():
+        return
+
+    header_rows = []
+    for node in container:
+        if not _is_element(node) or node.tag != "tr":
+            break
+        cells = [
+            cell for cell in node if _is_element(cell) and cell.tag in ("td", "th")
+        ]
+        if not cells or any(cell.tag != "th" for cell in cells):
+            break
+        header_rows.append(node)
+        if node.tail and node.tail.strip():
+            break
+
+    if not header_rows:
+        return
+
+    thead = etree.Element("thead")
+    tail = header_rows[-1].tail
+    header_rows[-1].tail = None
+    if container is table:
+        table.insert(table.index(header_rows[0]), thead)
+        thead.tail = tail
+    else:
+        table.insert(table.index(container), thead)
+        container.text = (container.text or "") + (tail or "") or None
+    for row in header_rows:
+        thead.append(row)
+
+
+def _leaf_details(root):
+    """<details> sem outros <details> dentro, em ordem do documento (pos-ordem)."""
+    leaves = []
+    has_nested = [False]
+    for event, element in etree.iterwalk(root, events=("start", "end")):
+        if event == "start":
+            has_nested.append(False)
+            continue
+        nested = has_nested.pop()
+        is_details = element.tag == "details"
+        if is_details and not nested:
+            leaves.append(element)
+        if is_details or nested:
+            has_nested[-1] = True
+    return leaves
+
+
+def _render_details_markdown(converter, details):
+    summary = next(details.iter("summary"), None)
+    if summary is None:
+        return False
+
+    content_parts = []
+    if details.text:
+        content_parts.append(details.text)
+    for child in details:
+        if child.tag != "summary":
+            content_parts.append(_raw_string(child))
+        if child.tail:
+            content_parts.append(child.tail)
+
+    if not content_parts:
+        return False
+
+    content_text = "".join(content_parts).strip()
+    if not converter._has_unprocessed_markdown(content_text):
+        return False
+
+    with converter._md_engine() as md_instance:
+        processed_html = md_instance.convert(content_text)
+
+    _clear(details)
+    details.append(summary)
+    summary.tail = None
+
+    # Mesmo resultado do laço de append do BeautifulSoup, que move os
+    # nós enquanto itera e por isso acrescenta só os de índice par.
+    content_root = parse_fragment(processed_html)
+    nodes = [content_root.text] if content_root.text else []
+    for child in content_root:
+        nodes.append(child)
+        if child.tail:
+            nodes.append(child.tail)
+    for node in nodes[::2]:
+        if isinstance(node, str):
+            _append_text(details, node)
+        else:
+            node.tail = None
+            details.append(node)
+    return True
+
+
+def _process_details_content(converter, root):
+    max_iterations = 10
+    for details in _leaf_details(root):
+        for _ in range(max_iterations):
+            if not _render_details_markdown(converter, details):
+                break
+            if next(details.iterdescendants("details"), None) is not None:
+                break
+
+
+def postprocess(
+    converter,
+    html,
+    remove_header=True,
+    remove_metadata_section=False,
+    with_metadata=False,
+):
+    """Pos-processa o HTML com lxml.
+
+    Returns:
+        (html, table_metadata); table_metadata e None se with_metadata=False
+    """
+    root = parse_fragment(html)
+
+    table_metadata = None
+    if with_metadata:
+        table_metadata = _extract_table_metadata(converter, root)
+
+    if remove_header:
+        first_h1 = next(root.iter("h1"), None)
+        if first_h1 is not None:
+            _remove(first_h1)
+
+    if remove_metadata_section:
+        _remove_metadata_section(converter, root)
+
+    _postprocess_tables(converter, root)
+    _process_details_content(converter, root)
+
+    for table in root.iter("table"):
+        if table.get("class") is None:
+            table.set("class", "")
+
+    for p in root.iter("p"):
+        text = _text(p)
+        if text.strip().startswith("Classificação:") and "IRRECUPERÁVEL" in text:
+            classes = (p.get("class") or "").split() + ["classification-info"]
+            p.set("class", " ".join(classes))
+
+    return converter._finalize_html(serialize_children(root)), table_metadata
@@ -1,11 +1,196 @@
+import multiprocessing
+import os
 import re
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from html import unescape
 
 import markdown
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+from utils import lxml_postprocessor, metadata_scanner
+
+# Backends de pós-processamento do HTML gerado pelo markdown
+POSTPROCESS_BACKENDS = ("html.parser", "lxml")
+
+# Conversão paralela por seções: o documento só é dividido em títulos H1/H2 de
+# nível superior, fora de blocos de código, comentários e tags HTML abertas.
+_SECTION_HEADING_PATTERN = re.compile(r"^#{1,2}(?!#)")
+_FENCE_PATTERN = re.compile(r"^(`{3,}|~{3,})")
+_HTML_TAG_PATTERN = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9-]*)\b[^>]*?(/?)>")
+_REFERENCE_DEFINITION_PATTERN = re.compile(r"^ {0,3}\[[^\]]+\]:", re.MULTILINE)
+_VOID_TAGS = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "param",
+    "source",
+    "track",
+    "wbr",
+}
+# Cada seção é convertida seguida deste título, que reproduz o início da seção
+# seguinte; assim o separador gerado pelo markdown é o mesmo do documento inteiro.
+_SECTION_SENTINEL = "## axion-section-break"
+_SECTION_SENTINEL_HTML = "<h2>axion-section-break</h2>"
+_H1_PATTERN = re.compile(r"<h1[\s/>]", re.IGNORECASE)
+_H2_PATTERN = re.compile(r"<h2\b[^>]*>(.*?)</h2>", re.IGNORECASE | re.DOTALL)
+_COMMENT_PATTERN = re.compile(r"<!--.*?-->", re.DOTALL)
+
+# Pré-processamento dos <details> no markdown
+_DETAILS_TAG_PATTERN = re.compile(r"<details\b[^>]*>|</details>", re.IGNORECASE)
+_SUMMARY_OPEN_PATTERN = re.compile(r"\s*(<summary\b[^>]*>)", re.IGNORECASE)
+# Marcador de um bloco já convertido: "{nonce}-{índice}". O nonce é sorteado a
+# cada chamada, para que texto do usuário nunca seja tomado por um marcador
+_DETAILS_PLACEHOLDER = '<details data-axion-block="{}-{}"></details>'
+_LIST_ITEM_PATTERN = re.compile(r"^\s*[\*\-]\s+")
+# Rótulo em negrito dos campos do cabeçalho (**Campo:** Valor)
+_BOLD_LABEL_PATTERN = re.compile(r"\*\*.*?:\*\*")
+# Campos do cabeçalho removidos do corpo pelo preparo do markdown
+_METADATA_PARAGRAPH_PREFIXES = (
+    "**Processo Principal",
+    "**Tipo de Ação",
+    "**Autor",
+    "**Réu",
+    "**Exequente",
+    "**Executado",
+    "**Vara:",
+    "**Data desta Análise",
+    "**Data da Análise",
+)
+_GEMINI_REFERENCE_PATTERN = re.compile(
+    r"\[(?:Gemini|Source|Citation).*?\]", re.IGNORECASE
+)
+_GEMINI_REFERENCE_START_PATTERN = re.compile(r"\[(?i:Gemini|Source|Citation)")
+# "Geração" sem IGNORECASE: as classes explícitas são bem mais rápidas
+_GENERATION_WORD_PATTERN = re.compile(r"[Gg][Ee][Rr][Aa][çcÇC][ãÃ][oO]")
+
+# Referências documentais (Sequência: 2, 611) -> (Seq.: 2, 611), na ordem de
+# prioridade em que as formas eram aplicadas uma a uma
+_PAGE_REFERENCE_PATTERN = re.compile(r",\s*Pág\.\s*\d+", re.IGNORECASE)
+_REFERENCE_PATTERNS = (
+    r"\(Sequência:\s*([0-9,\s]+)\)",
+    r"\(Seq\.\s*([0-9,\s]+)\)",
+    r"\(Seq\.?:\s*([0-9,\s]+)\)",
+    r"\(Ref\.?:\s*Doc\.?\s*Seq\.?\s*([0-9,\s]+)\)",
+    r"\(Autos\s*\(?\s*Seq\.?\s*([0-9,\s]+)\)?\)",
+    r"\(Fonte:\s*Doc\.?\s*Seq\.?\s*([0-9,\s]+)\)",
+)
+# Todas as formas numa única varredura. "(Autos (Seq. N))" fica de fora porque
+# o "(Seq. N)" interno tem prioridade e é convertido sozinho.
+_REFERENCE_PATTERN = re.compile(
+    "|".join(
+        f"({pattern})"
+        for pattern in _REFERENCE_PATTERNS[:4]
+        + (r"\(Autos\s*(?!\(Seq\.\s*[0-9,\s]+\))\(?\s*Seq\.?\s*([0-9,\s]+)\)?\)",)
+        + _REFERENCE_PATTERNS[5:]
+    ),
+    re.IGNORECASE,
+)
+_REFERENCE_SPAN_OPEN = '<span class="reference-span">'
+_NESTED_REFERENCE_SPAN_PATTERN = re.compile(
+    r'<span class="reference-span">(<span class="reference-span">[^<]+</span>)</span>'
+)
+
+
+def _may_have_generation_dates(text):
+    """
+    Indica se o texto tem a palavra "Geração" ou se ela pode surgir ao
+    remover uma referência do Gemini colada a uma das suas letras.
+    """
+    if _GENERATION_WORD_PATTERN.search(text):
+        return True
+    return any(
+        match.start() and text[match.start() - 1] in "geraçcãGERAÇCÃ"
+        for match in _GEMINI_REFERENCE_START_PATTERN.finditer(text)
+    )
+
+
+_section_executor = None
+_section_executor_lock = threading.Lock()
+
+
+def _get_section_executor(max_workers=None):
+    """
+    Pool de processos compartilhado pelas conversões paralelas. Usa "spawn":
+    o pool é criado dentro de workers gthread, e um fork copiaria locks
+    seguros por outras threads (pools do markdown, logging, caches).
+    """
+    global _section_executor
+    with _section_executor_lock:
+        if _section_executor is None:
+            _section_executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _section_executor
+
+
+_MD_EXTENSIONS = ["tables", "fenced_code", "sane_lists", "attr_list", "md_in_html"]
+
+
+def _build_md_instance(use_nl2br=True):
+    extensions = list(_MD_EXTENSIONS)
+    if use_nl2br:
+        extensions.append("nl2br")
+    return markdown.Markdown(extensions=extensions, extension_configs={"tables": {}})
+
+
+class MarkdownEnginePool:
+    """
+    Pool thread-safe de instâncias markdown.Markdown já construídas.
+
+    Carregar as extensões é a parte cara de criar uma instância; o pool mantém
+    instâncias ociosas e chama reset() antes de devolvê-las, para que nenhum
+    estado (htmlStash, referências) vaze entre conversões.
+    """
+
+    def __init__(self, use_nl2br=True, max_idle=8):
+        self.use_nl2br = use_nl2br
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self):
+        with self._lock:
+            md = self._idle.pop() if self._idle else None
+        if md is None:
+            md = _build_md_instance(self.use_nl2br)
+        try:
+            yield md
+        finally:
+            md.reset()
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(md)
+
+
+# Um pool por conjunto de extensões (com e sem nl2br), compartilhado no processo
+_md_engine_pools = {
+    True: MarkdownEnginePool(use_nl2br=True),
+    False: MarkdownEnginePool(use_nl2br=False),
+}
 
 
 class MarkdownConverter:
-    def __init__(self):
+    def __init__(self, postprocess_backend="html.parser"):
+        if postprocess_backend not in POSTPROCESS_BACKENDS:
+            raise ValueError(
+                f"Backend de pós-processamento inválido: '{postprocess_backend}'. "
+                "Use 'html.parser' ou 'lxml'"
+            )
+        if postprocess_backend == "lxml" and not lxml_postprocessor.is_available():
+            raise ImportError("O backend 'lxml' requer o pacote lxml instalado")
+        self.postprocess_backend = postprocess_backend
         self.empty_data_patterns = [
             r"^\s*N/?A\s*$",
             r"^\s*Não\s+(informado|encontrado|aplicável)\s*$",
@@ -13,6 +198,11 @@ class MarkdownConverter:
             r"^\s*-\s*$",
             r"^\s*$",
         ]
+        # Os padrões acima numa única expressão, compilada uma vez
+        self._empty_data_pattern = re.compile(
+            "|".join(f"(?:{pattern})" for pattern in self.empty_data_patterns),
+            re.IGNORECASE,
+        )
         self.risk_action_types = [
             "Embargos de execução",
             "Embargos à Execução",
@@ -21,109 +211,214 @@ class MarkdownConverter:
             "Embargos de Terceiro",
         ]
 
-    def _create_md_instance(self, use_nl2br=True):
-        extensions = ["tables", "fenced_code", "sane_lists", "attr_list", "md_in_html"]
-        if use_nl2br:
-            extensions.append("nl2br")
-        return markdown.Markdown(
-            extensions=extensions, extension_configs={"tables": {}}
-        )
+    def _md_engine(self, use_nl2br=True):
+        """Empresta uma instância markdown do pool (usar com `with`)"""
+        return _md_engine_pools[use_nl2br].acquire()
 
     def _preprocess_details_markdown(self, markdown_text):
         """
         Pré-processa o conteúdo markdown dentro de tags <details> ANTES da conversão principal.
         Isso resolve o problema de listas não serem convertidas dentro de <details>.
+
+        Percorre o texto uma única vez com uma pilha de <details> abertos: cada
+        bloco é convertido ao ser fechado, então os internos são convertidos
+        antes dos externos. Tags sem par ficam como estão.
         """
-        # Regex para encontrar blocos <details>...</details>
-        details_pattern = re.compile(
-            r"(<details[^>]*>)\s*(<summary[^>]*>.*?</summary>)(.*?)(</details>)",
-            re.DOTALL | re.IGNORECASE,
+        lowered = markdown_text.lower()
+        nonce = secrets.token_hex(8)
+        placeholder = re.compile(
+            rf'<details data-axion-block="{nonce}-(\d+)"></details>'
         )
+        # HTML já convertido de cada bloco; no conteúdo do bloco externo ele
+        # aparece como um marcador, para não ser reconvertido a cada nível
+        blocks = []
+        root_parts = []
+        # Cada item: [tag de abertura, summary (ou None), partes do conteúdo,
+        # texto original entre a abertura e o fim do summary]
+        stack = []
+        pos = 0
+
+        while True:
+            match = _DETAILS_TAG_PATTERN.search(markdown_text, pos)
+            parts = stack[-1][2] if stack else root_parts
+            if not match:
+                parts.append(markdown_text[pos:])
+                break
 
-        def ensure_blank_line_before_lists(content):
-            """
-            Garante que há uma linha em branco antes de listas.
-            Markdown requer linha em branco antes de listas para reconhecê-las.
-            """
-            lines = content.split("\n")
-            result = []
-            for i, line in enumerate(lines):
-                # Verifica se a linha atual é um item de lista
-                is_list_item = re.match(r"^\s*[\*\-]\s+", line)
-                if is_list_item and i > 0:
-                    # Verifica se a linha anterior não é vazia e não é item de lista
-                    prev_line = lines[i - 1].strip()
-                    prev_is_list = re.match(r"^\s*[\*\-]\s+", lines[i - 1])
-                    if prev_line and not prev_is_list:
-                        result.append("")  # Adiciona linha em branco
-                result.append(line)
-            return "\n".join(result)
-
-        def process_details_content(match):
-            details_open = match.group(1)
-            summary = match.group(2)
-            content = match.group(3)
-            details_close = match.group(4)
-
-            # Processar o conteúdo como markdown (sem nl2br para preservar listas)
-            if content.strip():
-                # Garantir linha em branco antes de listas
-                content = ensure_blank_line_before_lists(content)
-                md_instance = self._create_md_instance(use_nl2br=False)
-                processed_content = md_instance.convert(content)
+            parts.append(markdown_text[pos : match.start()])
+            tag = match.group(0)
+            pos = match.end()
+
+            if not tag.startswith("</"):
+                # O <summary> precisa vir logo após a abertura do <details>
+                summary = None
+                summary_start = pos
+                summary_match = _SUMMARY_OPEN_PATTERN.match(markdown_text, pos)
+                if summary_match:
+                    summary_end = lowered.find("</summary>", summary_match.end())
+                    if summary_end != -1:
+                        summary_end += len("</summary>")
+                        summary = markdown_text[summary_match.start(1) : summary_end]
+                        pos = summary_end
+                stack.append([tag, summary, [], markdown_text[summary_start:pos]])
+            elif stack:
+                details_open, summary, content_parts, _raw = stack.pop()
+                parts = stack[-1][2] if stack else root_parts
+                content = "".join(content_parts)
+                if summary is None:
+                    parts.append(f"{details_open}{content}{tag}")
+                else:
+                    blocks.append(
+                        self._render_details_block(
+                            details_open, summary, content, tag, blocks, placeholder
+                        )
+                    )
+                    parts.append(_DETAILS_PLACEHOLDER.format(nonce, len(blocks) - 1))
             else:
-                processed_content = content
-
-            return f"{details_open}\n{summary}\n{processed_content}\n{details_close}"
+                # </details> sem abertura correspondente
+                parts.append(tag)
+
+        # <details> sem fechamento: mantém o texto original
+        while stack:
+            details_open, _summary, content_parts, raw_summary = stack.pop()
+            parts = stack[-1][2] if stack else root_parts
+            parts.append(details_open + raw_summary + "".join(content_parts))
+
+        return self._expand_details_blocks("".join(root_parts), blocks, placeholder)
+
+    def _render_details_block(
+        self, details_open, summary, content, details_close, blocks, placeholder
+    ):
+        """Converte o conteúdo de um <details> (sem nl2br para preservar listas)"""
+        if content.strip():
+            # Garantir linha em branco antes de listas
+            content = self._ensure_blank_line_before_lists(content)
+            with self._md_engine(use_nl2br=False) as md_instance:
+                processed = md_instance.convert(content)
+
+            # Se o markdown alterou algum marcador (ex.: dentro de bloco de
+            # código), converte de novo com o HTML dos blocos internos no lugar
+            expected = sorted(placeholder.findall(content))
+            if sorted(placeholder.findall(processed)) != expected:
+                content = self._expand_details_blocks(content, blocks, placeholder)
+                with self._md_engine(use_nl2br=False) as md_instance:
+                    processed = md_instance.convert(content)
+            content = processed
+
+        return f"{details_open}\n{summary}\n{content}\n{details_close}"
+
+    def _expand_details_blocks(self, text, blocks, placeholder):
+        """
+        Substitui os marcadores pelo HTML dos blocos, sem recursão.
 
-        # Processar de dentro para fora (details aninhados)
-        max_iterations = 10
-        for _ in range(max_iterations):
-            new_text = details_pattern.sub(process_details_content, markdown_text)
-            if new_text == markdown_text:
-                break
-            markdown_text = new_text
+        Cada bloco é expandido uma única vez; marcadores fora do intervalo ou
+        repetidos ficam no texto como estão.
+        """
+        if not blocks:
+            return text
+
+        output = []
+        expanded = set()
+        # re.split alterna texto (índice par) e número do bloco (índice ímpar)
+        stack = [enumerate(placeholder.split(text))]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+            elif item[0] % 2:
+                index = int(item[1])
+                if index < len(blocks) and index not in expanded:
+                    expanded.add(index)
+                    stack.append(enumerate(placeholder.split(blocks[index])))
+                else:
+                    output.append(placeholder.pattern.replace(r"(\d+)", item[1]))
+            else:
+                output.append(item[1])
+        return "".join(output)
 
-        return markdown_text
+    def _ensure_blank_line_before_lists(self, content):
+        """
+        Garante que há uma linha em branco antes de listas.
+        Markdown requer linha em branco antes de listas para reconhecê-las.
+        """
+        lines = content.split("\n")
+        result = []
+        for i, line in enumerate(lines):
+            # Verifica se a linha atual é um item de lista
+            if i > 0 and _LIST_ITEM_PATTERN.match(line):
+                # Verifica se a linha anterior não é vazia e não é item de lista
+                prev_line = lines[i - 1]
+                if prev_line.strip() and not _LIST_ITEM_PATTERN.match(prev_line):
+                    result.append("")  # Adiciona linha em branco
+            result.append(line)
+        return "\n".join(result)
+
+    @staticmethod
+    def _format_reference(numbers_str):
+        numbers = [
+            int(n.strip()) for n in numbers_str.split(",") if n.strip().isdigit()
+        ]
+        numbers.sort()
+        formatted_nums = ", ".join(map(str, numbers))
+        return f"{_REFERENCE_SPAN_OPEN}(Seq.: {formatted_nums})</span>"
 
     def _process_document_references(self, html_text):
         """
         Converte referências documentais para o formato padrão:
         (Sequência: 2, 611, 625) -> <span class="reference-span">(Seq.: 2, 611, 625)</span>
-        """
-        html_text = re.sub(r",\s*Pág\.\s*\d+", "", html_text, flags=re.IGNORECASE)
 
-        patterns = [
-            r"(?<!</span>)\(Sequência:\s*([0-9,\s]+)\)",
-            r"(?<!</span>)\(Seq\.\s*([0-9,\s]+)\)",
-            r"(?<!</span>)\(Seq\.?:\s*([0-9,\s]+)\)",
-            r"(?<!</span>)\(Ref\.?:\s*Doc\.?\s*Seq\.?\s*([0-9,\s]+)\)",
-            r"(?<!</span>)\(Autos\s*\(?\s*Seq\.?\s*([0-9,\s]+)\)?\)",
-            r"(?<!</span>)\(Fonte:\s*Doc\.?\s*Seq\.?\s*([0-9,\s]+)\)",
-        ]
+        Todas as formas são reescritas numa única varredura. Uma referência
+        colada logo após um </span> não é convertida, inclusive quando esse
+        </span> vem de uma referência de forma mais prioritária convertida
+        antes dela.
+        """
+        html_text = _PAGE_REFERENCE_PATTERN.sub("", html_text)
+        if _REFERENCE_SPAN_OPEN in html_text:
+            # Spans já existentes interagem com a limpeza de spans aninhados
+            return self._process_document_references_by_pattern(html_text)
+
+        previous_end = -1
+        previous_priority = None
+
+        def replace(match):
+            nonlocal previous_end, previous_priority
+            start = match.start()
+            # Cada forma ocupa dois grupos: o externo e o dos números
+            priority = (match.lastindex - 1) // 2
+            blocked = html_text[max(start - 7, 0) : start].lower() == "</span>" or (
+                start == previous_end
+                and previous_priority is not None
+                and previous_priority < priority
+            )
+            previous_end = match.end()
+            previous_priority = None if blocked else priority
+            if blocked:
+                return match.group(0)
+            return self._format_reference(match.group(match.lastindex + 1))
 
-        def format_reference(match):
-            numbers_str = match.group(1)
-            numbers = [
-                int(n.strip()) for n in numbers_str.split(",") if n.strip().isdigit()
-            ]
-            numbers.sort()
-            formatted_nums = ", ".join(map(str, numbers))
-            return f'<span class="reference-span">(Seq.: {formatted_nums})</span>'
+        return _REFERENCE_PATTERN.sub(replace, html_text)
 
-        for pattern in patterns:
+    def _process_document_references_by_pattern(self, html_text):
+        """
+        Aplica cada forma de referência numa passada própria, em ordem de
+        prioridade, e desfaz os spans aninhados que isso produz.
+        Usado quando o HTML já tem spans de referência.
+        """
+        for pattern in _REFERENCE_PATTERNS:
             html_text = re.sub(
-                pattern, format_reference, html_text, flags=re.IGNORECASE
+                r"(?<!</span>)" + pattern,
+                lambda match: self._format_reference(match.group(1)),
+                html_text,
+                flags=re.IGNORECASE,
             )
 
-        return html_text
+        return _NESTED_REFERENCE_SPAN_PATTERN.sub(r"\1", html_text)
 
-    def _clean_gemini_references(self, html_text):
-        """Remove referências do Gemini no formato [...]"""
-        html_text = re.sub(
-            r"\[(?:Gemini|Source|Citation).*?\]", "", html_text, flags=re.IGNORECASE
-        )
-        return html_text
+    def _clean_gemini_references(self, line):
+        """Remove referências do Gemini no formato [...] de uma linha"""
+        if "[" not in line:
+            return line
+        return _GEMINI_REFERENCE_PATTERN.sub("", line)
 
     def _remove_old_generation_dates(self, html_text):
         """Remove linhas com 'Data de Geração' antigas"""
@@ -142,30 +437,143 @@ class MarkdownConverter:
         """Verifica se o texto contém dados vazios/irrelevantes"""
         if not text:
             return True
-        text = text.strip()
-        for pattern in self.empty_data_patterns:
-            if re.match(pattern, text, re.IGNORECASE):
-                return True
-        return False
+        return self._empty_data_pattern.match(text.strip()) is not None
 
-    def _clean_empty_table_cells(self, soup):
-        """Remove células e linhas de tabela com dados vazios ou N/A"""
+    def _postprocess_tables(self, soup):
+        """
+        Percorre cada tabela uma vez: limpa células com dados vazios ou N/A,
+        remove as linhas que ficaram vazias e leva as linhas de cabeçalho para
+        um <thead>.
+        """
         for table in soup.find_all("table"):
+            rows = self._flat_table_rows(table)
+            if rows is None:
+                # Tabela aninhada: as células de cada linha são buscadas só
+                # depois de processar as anteriores, que podem removê-las
+                rows = ((row, row.find_all("td")) for row in table.find_all("tr"))
+
             rows_to_remove = []
-            for row in table.find_all("tr"):
-                cells = row.find_all("td")
-                if cells:
-                    for cell in cells:
-                        if self._is_empty_data(cell.get_text()):
-                            cell.string = ""
+            for row, cells in rows:
+                if not cells:
+                    continue
 
-                    if all(self._is_empty_data(cell.get_text()) for cell in cells):
-                        rows_to_remove.append(row)
+                # O texto de cada célula é lido uma vez
+                empty = [self._is_empty_data(self._cell_text(cell)) for cell in cells]
+                for cell, is_empty in zip(cells, empty, strict=True):
+                    if is_empty:
+                        cell.string = ""
+
+                # Com células aninhadas, limpar uma muda o texto da que a contém
+                nested = any(empty) and any(cell.parent is not row for cell in cells)
+                if all(empty) or (
+                    nested
+                    and all(self._is_empty_data(cell.get_text()) for cell in cells)
+                ):
+                    rows_to_remove.append(row)
 
-            for row in rows_to_remove:
-                row.decompose()
+            self._decompose_all(rows_to_remove)
+            self._tag_header_rows(soup, table)
         return soup
 
+    @staticmethod
+    def _cell_text(cell):
+        """get_text() da célula, sem percorrer a árvore quando ela só tem texto"""
+        contents = cell.contents
+        if len(contents) == 1 and type(contents[0]) is NavigableString:
+            return contents[0]
+        return cell.get_text()
+
+    @staticmethod
+    def _flat_table_rows(table):
+        """
+        Lista as linhas (tr, células td) de uma tabela numa única passada.
+        Retorna None se houver tabelas, linhas ou células aninhadas.
+        """
+        rows = []
+        for node in table.descendants:
+            if not isinstance(node, Tag):
+                continue
+            if node.name == "tr":
+                parent = node.parent
+                if parent is not table and (
+                    parent.name not in ("thead", "tbody", "tfoot")
+                    or parent.parent is not table
+                ):
+                    return None
+                rows.append((node, []))
+            elif node.name == "td":
+                if not rows or node.parent is not rows[-1][0]:
+                    return None
+                rows[-1][1].append(node)
+            elif node.name == "table":
+                return None
+        return rows
+
+    @staticmethod
+    def _decompose_all(elements):
+        """
+        Remove os elementos (em ordem do documento) de uma só vez.
+        Cada pai é percorrido uma vez para achar as posições, e a remoção vai
+        do fim para o início; sem isso extract() procura cada elemento no pai
+        e remover milhares de linhas de uma tabela fica quadrático.
+        """
+        indexes = {}
+        parents = set()
+        for element in elements:
+            parent = element.parent
+            if parent is not None and id(parent) not in parents:
+                parents.add(id(parent))
+                for index, child in enumerate(parent.contents):
+                    indexes[id(child)] = index
+
+        for element in reversed(elements):
+            element.extract(_self_index=indexes.get(id(element)))
+            element.decompose()
+
+    def _tag_header_rows(self, soup, table):
+        """
+        Em tabelas sem <thead>, move as linhas só com <th> do início da tabela
+        para um <thead>, que o CSS de impressão repete a cada página.
+        """
+        children = [child for child in table.children if isinstance(child, Tag)]
+        if any(child.name == "thead" for child in children):
+            return
+
+        container = table
+        if children and children[0].name == "tbody":
+            container = children[0]
+
+        header_nodes = []
+        pending = []
+        for node in container.children:
+            if type(node) is NavigableString and not node.strip():
+                pending.append(node)
+                continue
+            if not isinstance(node, Tag):
+                break
+            cells = node.find_all(["td", "th"], recursive=False)
+            if (
+                node.name != "tr"
+                or not cells
+                or any(cell.name != "th" for cell in cells)
+            ):
+                break
+            if header_nodes:
+                header_nodes.extend(pending)
+            header_nodes.append(node)
+            pending = []
+
+        if not header_nodes:
+            return
+
+        thead = soup.new_tag("thead")
+        if container is table:
+            header_nodes[0].insert_before(thead)
+        else:
+            container.insert_before(thead)
+        for node in header_nodes:
+            thead.append(node)
+
     # Formatação de risco removida - usuário prefere formatação manual
     # def _format_risk_actions(self, soup):
     #     """Formata tipos de ação de risco com classe risk-alto"""
@@ -184,183 +592,201 @@ class MarkdownConverter:
     #                 break
     #     return soup
 
-    def _improve_italic_conversion(self, markdown_text):
-        """
-        NÃO faz pré-processamento de markdown - deixa a biblioteca markdown fazer seu trabalho.
-        A biblioteca markdown já converte corretamente:
-        - **texto** -> <strong>texto</strong>
-        - *texto* -> <em>texto</em>
-        """
-        return markdown_text
+    def _has_unprocessed_markdown(self, content_text):
+        """Verifica se o conteúdo de um <details> ainda tem markdown não processado"""
+        return (
+            "###" in content_text
+            or "##" in content_text
+            or (content_text.count("|") > 5 and "\n|" in content_text)
+            or ("**" in content_text and "<strong>" not in content_text)
+            or bool(re.search(r"^\s*[\*\-]\s+", content_text, re.MULTILINE))
+        )
 
-    def _process_details_content(self, soup):
+    def _leaf_details(self, root):
         """
-        Processa o conteúdo markdown dentro de tags <details>, incluindo details aninhados
-        Processa de dentro para fora (leaf-first)
+        Lista os <details> que não contêm outros <details>, em ordem do documento.
+        Percorre a árvore uma única vez, em pós-ordem, sem recursão.
         """
-        max_iterations = 10
-        iteration = 0
-
-        while iteration < max_iterations:
-            iteration += 1
-            details_processed = False
-
-            # Encontrar todos os details
-            all_details = soup.find_all("details")
-
-            for details in all_details:
-                summary = details.find("summary")
-                if not summary:
-                    continue
+        leaves = []
+        stack = [[root, iter(root.children), False]]
+        while stack:
+            frame = stack[-1]
+            child = next(frame[1], None)
+            if child is not None:
+                if isinstance(child, Tag):
+                    stack.append([child, iter(child.children), False])
+                continue
 
-                # Verificar se este details contém outros details (não processar se contém)
-                nested_details = details.find_all("details")
-                # Remover o próprio details da lista
-                nested_details = [d for d in nested_details if d != details]
+            stack.pop()
+            node, _children, has_nested = frame
+            is_details = node.name == "details"
+            if is_details and not has_nested:
+                leaves.append(node)
+            if stack and (is_details or has_nested):
+                stack[-1][2] = True
+        return leaves
 
-                if nested_details:
-                    # Tem details aninhados, pular este e processar os internos primeiro
-                    continue
-
-                # Pegar o conteúdo após o summary
-                content_parts = []
-                for element in list(details.children):
-                    if element != summary and element.name != "summary":
-                        content_parts.append(str(element))
+    def _render_details_markdown(self, details):
+        """
+        Converte o markdown ainda presente em um <details>.
+        Retorna False se não havia nada a processar.
+        """
+        summary = details.find("summary")
+        if not summary:
+            return False
 
-                if not content_parts:
-                    continue
+        # Pegar o conteúdo após o summary
+        content_parts = []
+        for element in list(details.children):
+            if element != summary and element.name != "summary":
+                content_parts.append(str(element))
 
-                content_text = "".join(content_parts).strip()
+        if not content_parts:
+            return False
 
-                # Verificar se ainda há markdown não processado
-                has_unprocessed_markdown = (
-                    "###" in content_text
-                    or "##" in content_text
-                    or (content_text.count("|") > 5 and "\n|" in content_text)
-                    or ("**" in content_text and "<strong>" not in content_text)
-                    or bool(re.search(r"^\s*[\*\-]\s+", content_text, re.MULTILINE))
-                )
+        content_text = "".join(content_parts).strip()
 
-                if not has_unprocessed_markdown:
-                    continue
+        if not self._has_unprocessed_markdown(content_text):
+            return False
 
-                details_processed = True
+        # Processar como markdown
+        with self._md_engine() as md_instance:
+            processed_html = md_instance.convert(content_text)
 
-                # Processar como markdown
-                md_instance = self._create_md_instance()
-                processed_html = md_instance.convert(content_text)
+        # Limpar o details e reconstruir com conteúdo processado
+        details.clear()
+        details.append(summary)
 
-                # Limpar o details e reconstruir com conteúdo processado
-                details.clear()
-                details.append(summary)
+        # Adicionar o conteúdo processado
+        content_soup = BeautifulSoup(processed_html, "html.parser")
+        for child in content_soup.children:
+            details.append(child)
+        return True
 
-                # Adicionar o conteúdo processado
-                content_soup = BeautifulSoup(processed_html, "html.parser")
-                for child in content_soup.children:
-                    details.append(child)
+    def _process_details_content(self, soup):
+        """
+        Processa o conteúdo markdown dentro de tags <details>, incluindo details aninhados
+        Processa de dentro para fora (leaf-first): só os details sem outros details
+        dentro são reconvertidos, cada um visitado uma única vez
+        """
+        max_iterations = 10
 
-            if not details_processed:
-                break
+        for details in self._leaf_details(soup):
+            # Reconverte enquanto a heurística ainda encontrar markdown
+            for _ in range(max_iterations):
+                if not self._render_details_markdown(details):
+                    break
+                if details.find("details"):
+                    break
 
         return soup
 
-    def _preprocess_markdown(self, markdown_text):
-        """Preprocessa Markdown antes da conversão"""
-        markdown_text = self._improve_italic_conversion(markdown_text)
-
-        markdown_text = self._clean_gemini_references(markdown_text)
-        markdown_text = self._remove_old_generation_dates(markdown_text)
-
-        lines = markdown_text.split("\n")
-        processed_lines = []
-
-        for i, line in enumerate(lines):
-            processed_lines.append(line)
-
-            if i < len(lines) - 1:
-                next_line = lines[i + 1].strip()
-
-                if (
-                    next_line.startswith("|")
-                    and not line.strip().startswith("|")
-                    and line.strip()
-                    and processed_lines[-1] != ""
-                ):
-                    processed_lines.append("")
-
-        return "\n".join(processed_lines)
+    def _blank_line_before_tables(self, lines):
+        """Gera as linhas com uma linha em branco antes de cada tabela"""
+        previous = ""
+        for line in lines:
+            stripped = line.strip()
+            if stripped.startswith("|") and previous and not previous.startswith("|"):
+                yield ""
+            yield line
+            previous = stripped
 
-    def _remove_metadata_paragraphs(self, markdown_text):
+    def _iter_clean_lines(self, markdown_text):
         """
-        Remove os parágrafos de metadados do início do markdown para evitar duplicação
+        Gera as linhas do markdown sem os parágrafos de metadados do início
+        (evita duplicação) e sem as referências do Gemini.
         Os parágrafos estão em formato: **Campo:** valor com dois espaços no final (markdown line break)
 
         Suporta formatos novos e antigos:
         - Novo: Tipo de Ação, Autor(es), Réu(s), Data desta Análise
         - Antigo: Exequente(s), Executado(s), Data da Análise
         """
-        lines = markdown_text.split("\n")
-        cleaned_lines = []
         in_metadata_block = False
         found_h1 = False
 
-        for _i, line in enumerate(lines):
-            stripped = line.strip()
+        # Itera as linhas como split("\n"), sem criar a lista inteira
+        start = 0
+        while start >= 0:
+            end = markdown_text.find("\n", start)
+            if end < 0:
+                line = markdown_text[start:]
+                start = -1
+            else:
+                line = markdown_text[start:end]
+                start = end + 1
 
+            stripped = line.strip()
             if stripped.startswith("# "):
                 found_h1 = True
-                cleaned_lines.append(line)
-                continue
-
-            if found_h1 and not in_metadata_block and not stripped:
-                cleaned_lines.append(line)
+            elif found_h1 and not in_metadata_block and not stripped:
                 in_metadata_block = True
-                continue
-
-            if in_metadata_block:
-                if (
-                    stripped.startswith("**Processo Principal")
-                    or stripped.startswith("**Tipo de Ação")
-                    or stripped.startswith("**Autor")
-                    or stripped.startswith("**Réu")
-                    or stripped.startswith("**Exequente")
-                    or stripped.startswith("**Executado")
-                    or stripped.startswith("**Vara:")
-                    or stripped.startswith("**Data desta Análise")
-                    or stripped.startswith("**Data da Análise")
-                ):
+            elif in_metadata_block:
+                if stripped.startswith(_METADATA_PARAGRAPH_PREFIXES):
                     continue
-                elif not stripped:
-                    in_metadata_block = False
-                    cleaned_lines.append(line)
-                    continue
-                else:
-                    in_metadata_block = False
-                    cleaned_lines.append(line)
-            else:
-                cleaned_lines.append(line)
+                in_metadata_block = False
 
-        return "\n".join(cleaned_lines)
+            yield self._clean_gemini_references(line)
 
-    def convert(self, markdown_text, remove_header=True, remove_metadata_section=False):
+    def _iter_prepared_lines(self, markdown_text):
         """
-        Converte markdown para HTML
-
-        Args:
-            markdown_text: Texto markdown a ser convertido
-            remove_header: Remove o primeiro H1 do conteúdo (padrão: True)
-            remove_metadata_section: Remove a seção "INFORMAÇÕES DO TÍTULO EXECUTIVO" (padrão: False)
+        Gera as linhas do markdown preparado numa única passada: remove os
+        parágrafos de metadados e as referências do Gemini e insere a linha
+        em branco antes das tabelas.
         """
-        markdown_text = self._remove_metadata_paragraphs(markdown_text)
-        markdown_text = self._preprocess_markdown(markdown_text)
+        lines = self._iter_clean_lines(markdown_text)
+        if _may_have_generation_dates(markdown_text):
+            # As datas de geração antigas podem ocupar várias linhas
+            lines = self._remove_old_generation_dates("\n".join(lines)).split("\n")
+        return self._blank_line_before_tables(lines)
+
+    def _prepare_markdown(self, markdown_text):
+        """Passes de linha que dependem do documento inteiro (cabeçalho, tabelas)"""
+        return "\n".join(self._iter_prepared_lines(markdown_text))
+
+    def _markdown_to_html(self, markdown_text):
+        """Converte o markdown já preparado, incluindo o conteúdo dos <details>"""
         markdown_text = self._preprocess_details_markdown(markdown_text)
 
-        md = self._create_md_instance()
-        html = md.convert(markdown_text)
+        with self._md_engine() as md:
+            return md.convert(markdown_text)
+
+    def _postprocess_html(
+        self, html, remove_header, remove_metadata_section, with_metadata=False
+    ):
+        """
+        Pós-processa o HTML no backend configurado, a partir de um único parse.
+        Com with_metadata=True também lê a tabela de metadados da mesma árvore.
+
+        Returns:
+            (html, table_metadata); table_metadata é None se with_metadata=False
+        """
+        if self.postprocess_backend == "lxml":
+            return lxml_postprocessor.postprocess(
+                self, html, remove_header, remove_metadata_section, with_metadata
+            )
 
         soup = BeautifulSoup(html, "html.parser")
 
+        table_metadata = None
+        if with_metadata:
+            # Lê a tabela antes do pós-processamento, que limpa células e pode
+            # remover a seção de metadados. Tabelas dentro de <details> são
+            # ignoradas, como no parse isolado de extract_metadata(), onde
+            # <details> é HTML bruto.
+            tables = [t for t in soup.find_all("table") if not t.find_parent("details")]
+            table_metadata = self._extract_from_tables(tables)
+
+        html = self._postprocess(soup, remove_header, remove_metadata_section)
+        return html, table_metadata
+
+    def _is_metadata_heading(self, h2_text):
+        """Verifica se o título H2 abre a seção INFORMAÇÕES DO TÍTULO EXECUTIVO"""
+        return "INFORMAÇÕES DO TÍTULO EXECUTIVO" in h2_text.upper() or (
+            h2_text.startswith("1.") and "INFORMAÇÕES" in h2_text.upper()
+        )
+
+    def _postprocess(self, soup, remove_header=True, remove_metadata_section=False):
+        """Aplica as transformações na árvore e serializa o HTML final"""
         if remove_header:
             first_h1 = soup.find("h1")
             if first_h1 and isinstance(first_h1, Tag):
@@ -371,9 +797,7 @@ class MarkdownConverter:
             for h2 in h2_list:
                 if isinstance(h2, Tag):
                     h2_text = h2.get_text().strip()
-                    if "INFORMAÇÕES DO TÍTULO EXECUTIVO" in h2_text.upper() or (
-                        h2_text.startswith("1.") and "INFORMAÇÕES" in h2_text.upper()
-                    ):
+                    if self._is_metadata_heading(h2_text):
                         next_elem = h2.find_next_sibling()
                         h2.decompose()
 
@@ -389,7 +813,7 @@ class MarkdownConverter:
                             next_elem = next_sibling
                         break
 
-        soup = self._clean_empty_table_cells(soup)
+        soup = self._postprocess_tables(soup)
         # soup = self._format_risk_actions(soup)  # Removido - formatação manual pelo usuário
         soup = self._process_details_content(soup)
 
@@ -411,16 +835,317 @@ class MarkdownConverter:
         #     elif 'BAIXO' in text:
         #         strong['class'] = strong.get('class', []) + ['risk-baixo']
 
-        html = str(soup)
-        html = self._process_document_references(html)
+        return self._finalize_html(str(soup))
+
+    def _finalize_html(self, html):
+        """Passes de texto sobre o HTML serializado, comuns a todos os backends"""
+        return self._process_document_references(html)
+
+    # ========== SEÇÕES ==========
+    # Conversão por seções H1/H2, usada pelo caminho paralelo e pelo
+    # IncrementalConverter: split_sections() -> render_section() de cada uma
+    # -> first_occurrence_indexes() -> postprocess_section() -> HTML emendado
+    # na ordem, com o mesmo resultado de convert_document(). Quando
+    # metadata_runs_into_header(), a seção de metadados e a do primeiro H1
+    # são pós-processadas como uma só
+
+    def split_sections(self, markdown_text):
+        """
+        Prepara o markdown e o divide em seções que podem ser convertidas
+        isoladamente (uma só se o documento não puder ser dividido).
+        """
+        return self._split_sections(self._prepare_markdown(markdown_text))
+
+    def _split_sections(self, markdown_text):
+        """
+        Divide o markdown preparado em seções que começam em títulos H1/H2.
 
-        html = re.sub(
-            r'<span class="reference-span">(<span class="reference-span">[^<]+</span>)</span>',
-            r"\1",
-            html,
+        Só divide onde a conversão da seção isolada é idêntica à do documento
+        inteiro: fora de blocos de código, comentários e tags HTML abertas, e
+        nunca quando há definições de link por referência (escopo do documento).
+        """
+        if _REFERENCE_DEFINITION_PATTERN.search(markdown_text):
+            return [markdown_text]
+
+        sections = []
+        current = []
+        depth = 0
+        fence = None
+        in_comment = False
+
+        for line in markdown_text.split("\n"):
+            if fence:
+                if line.rstrip(" ") == fence:
+                    fence = None
+                current.append(line)
+                continue
+
+            if (
+                current
+                and not depth
+                and not in_comment
+                and _SECTION_HEADING_PATTERN.match(line)
+            ):
+                sections.append("\n".join(current))
+                current = []
+            current.append(line)
+
+            fence_match = _FENCE_PATTERN.match(line)
+            if fence_match and not in_comment:
+                fence = fence_match.group(1)
+                continue
+
+            text = _COMMENT_PATTERN.sub("", line)
+            if in_comment:
+                if "-->" not in text:
+                    continue
+                in_comment = False
+                text = text.split("-->", 1)[1]
+            if "<!--" in text:
+                in_comment = True
+                text = text.split("<!--", 1)[0]
+
+            for tag in _HTML_TAG_PATTERN.finditer(text):
+                closing, name, self_closing = tag.groups()
+                if self_closing or name.lower() in _VOID_TAGS:
+                    continue
+                depth = max(depth - 1, 0) if closing else depth + 1
+
+        sections.append("\n".join(current))
+        return sections
+
+    def render_section(self, section_text, is_last):
+        """
+        Converte uma seção de split_sections() em HTML. Retorna None se o
+        resultado não puder ser emendado com segurança (o marcador de quebra
+        não fechou a seção); nesse caso converta o documento inteiro.
+        """
+        if is_last:
+            return self._markdown_to_html(section_text)
+
+        html = self._markdown_to_html(f"{section_text}\n{_SECTION_SENTINEL}")
+        if not html.endswith(_SECTION_SENTINEL_HTML):
+            return None
+        return html[: -len(_SECTION_SENTINEL_HTML)]
+
+    def postprocess_section(self, html, remove_header, remove_metadata_section):
+        """Pós-processa o HTML de uma seção e lê sua tabela de metadados"""
+        return self._postprocess_html(
+            html, remove_header, remove_metadata_section, with_metadata=True
         )
 
-        return html
+    def _has_metadata_heading(self, html):
+        for match in _H2_PATTERN.finditer(html):
+            h2_text = unescape(re.sub(r"<[^>]+>", "", match.group(1))).strip()
+            if self._is_metadata_heading(h2_text):
+                return True
+        return False
+
+    def first_occurrence_indexes(
+        self, fragments, remove_header, remove_metadata_section
+    ):
+        """
+        Remoções que valem só para a primeira ocorrência no documento inteiro:
+        retorna os índices das seções com o primeiro H1 e com a seção de
+        metadados (None quando não se aplica).
+        """
+        header_index = None
+        if remove_header:
+            header_index = next(
+                (
+                    i
+                    for i, fragment in enumerate(fragments)
+                    if _H1_PATTERN.search(_COMMENT_PATTERN.sub("", fragment))
+                ),
+                None,
+            )
+        metadata_index = None
+        if remove_metadata_section:
+            metadata_index = next(
+                (
+                    i
+                    for i, fragment in enumerate(fragments)
+                    if self._has_metadata_heading(fragment)
+                ),
+                None,
+            )
+        return header_index, metadata_index
+
+    @staticmethod
+    def metadata_runs_into_header(header_index, metadata_index):
+        """
+        Indica se a seção de metadados vem logo antes da seção do primeiro H1.
+        Com o H1 removido, a remoção dos metadados continua nessa seção até o
+        próximo H1/H2, então as duas precisam ser pós-processadas juntas.
+        """
+        return metadata_index is not None and header_index == metadata_index + 1
+
+    def _render_parallel(self, markdown_text, max_workers):
+        """
+        Converte as seções do documento em um pool de processos, na ordem
+        original e sem pós-processamento.
+
+        Returns:
+            lista com o HTML de cada seção, ou None se o documento não puder
+            ser dividido
+        """
+        sections = self.split_sections(markdown_text)
+        if len(sections) < 2:
+            return None
+
+        executor = _get_section_executor(max_workers)
+        last = len(sections) - 1
+        fragments = list(
+            executor.map(
+                self.render_section,
+                sections,
+                [i == last for i in range(len(sections))],
+                chunksize=self._chunksize(len(sections), max_workers),
+            )
+        )
+        if any(fragment is None for fragment in fragments):
+            return None
+        return fragments
+
+    def _postprocess_parallel(
+        self, fragments, remove_header, remove_metadata_section, max_workers
+    ):
+        """
+        Pós-processa as seções de _render_parallel() no pool e emenda o HTML,
+        com o mesmo resultado do caminho serial.
+
+        Returns:
+            (html, table_metadata)
+        """
+        executor = _get_section_executor(max_workers)
+        header_index, metadata_index = self.first_occurrence_indexes(
+            fragments, remove_header, remove_metadata_section
+        )
+        if self.metadata_runs_into_header(header_index, metadata_index):
+            fragments = [
+                *fragments[:metadata_index],
+                fragments[metadata_index] + fragments[header_index],
+                *fragments[header_index + 1 :],
+            ]
+            header_index = metadata_index
+        results = list(
+            executor.map(
+                self.postprocess_section,
+                fragments,
+                [i == header_index for i in range(len(fragments))],
+                [i == metadata_index for i in range(len(fragments))],
+                chunksize=self._chunksize(len(fragments), max_workers),
+            )
+        )
+
+        table_metadata = {}
+        for _html, section_metadata in results:
+            table_metadata.update(section_metadata)
+        return "".join(html for html, _metadata in results), table_metadata
+
+    @staticmethod
+    def _chunksize(count, max_workers):
+        return max(1, count // (4 * (max_workers or os.cpu_count() or 1)))
+
+    def convert(
+        self,
+        markdown_text,
+        remove_header=True,
+        remove_metadata_section=False,
+        parallel=False,
+        max_workers=None,
+    ):
+        """
+        Converte markdown para HTML
+
+        Args:
+            markdown_text: Texto markdown a ser convertido
+            remove_header: Remove o primeiro H1 do conteúdo (padrão: True)
+            remove_metadata_section: Remove a seção "INFORMAÇÕES DO TÍTULO EXECUTIVO" (padrão: False)
+            parallel: Converte as seções H1/H2 em um pool de processos (padrão: False).
+                O HTML é idêntico ao da conversão serial.
+            max_workers: Número de processos do pool (padrão: número de CPUs)
+        """
+        if parallel:
+            fragments = self._render_parallel(markdown_text, max_workers)
+            if fragments is not None:
+                return self._postprocess_parallel(
+                    fragments, remove_header, remove_metadata_section, max_workers
+                )[0]
+
+        html = self._markdown_to_html(self._prepare_markdown(markdown_text))
+        return self._postprocess_html(html, remove_header, remove_metadata_section)[0]
+
+    def parse(self, markdown_text, parallel=False, max_workers=None):
+        """
+        Primeira etapa de convert_document(): prepara o markdown e gera o HTML
+        ainda sem pós-processamento. Os argumentos são os mesmos de convert().
+
+        Returns:
+            lista de fragmentos HTML para postprocess(): um por seção na
+            conversão paralela, ou um só com o documento inteiro
+        """
+        if parallel:
+            fragments = self._render_parallel(markdown_text, max_workers)
+            if fragments is not None:
+                return fragments
+        return [self._markdown_to_html(self._prepare_markdown(markdown_text))]
+
+    def postprocess(
+        self,
+        fragments,
+        markdown_text,
+        remove_header=True,
+        remove_metadata_section=False,
+        max_workers=None,
+    ):
+        """
+        Segunda etapa de convert_document(): pós-processa os fragmentos de
+        parse() e lê título e metadados do markdown original.
+
+        Returns:
+            dict com as chaves "html", "title" e "metadata"
+        """
+        if len(fragments) > 1:
+            html, table_metadata = self._postprocess_parallel(
+                fragments, remove_header, remove_metadata_section, max_workers
+            )
+        else:
+            html, table_metadata = self._postprocess_html(
+                fragments[0], remove_header, remove_metadata_section, with_metadata=True
+            )
+
+        return {
+            "html": html,
+            "title": self.extract_title(markdown_text),
+            "metadata": self.merge_metadata(markdown_text, table_metadata),
+        }
+
+    def convert_document(
+        self,
+        markdown_text,
+        remove_header=True,
+        remove_metadata_section=False,
+        parallel=False,
+        max_workers=None,
+    ):
+        """
+        Converte markdown em HTML, título e metadados a partir de um único parse.
+
+        Equivale a chamar convert(), extract_title() e extract_metadata(), mas a
+        tabela de metadados é lida da mesma árvore usada para gerar o HTML, sem
+        reconverter o documento. Os argumentos são os mesmos de convert().
+
+        Returns:
+            dict com as chaves "html", "title" e "metadata"
+        """
+        return self.postprocess(
+            self.parse(markdown_text, parallel, max_workers),
+            markdown_text,
+            remove_header,
+            remove_metadata_section,
+            max_workers,
+        )
 
     def extract_title(self, markdown_text):
         lines = markdown_text.split("\n")
@@ -432,55 +1157,89 @@ class MarkdownConverter:
     def _extract_from_table(self, markdown_text):
         """
         Extrai metadados da tabela markdown "INFORMAÇÕES DO TÍTULO EXECUTIVO"
+        Lê as tabelas direto das linhas do markdown, sem gerar HTML
         """
-        metadata = {}
+        return self._metadata_from_rows(
+            (
+                metadata_scanner.inline_text(cells[0]).strip(),
+                lambda cell=cells[1]: metadata_scanner.inline_text(cell),
+                lambda cell=cells[1]: metadata_scanner.inline_text(cell, br=", "),
+            )
+            for cells in metadata_scanner.iter_table_rows(markdown_text)
+            if len(cells) >= 2
+        )
 
-        md_temp = self._create_md_instance()
-        html_temp = md_temp.convert(markdown_text)
-        soup_temp = BeautifulSoup(html_temp, "html.parser")
+    def _extract_from_tables(self, tables):
+        """
+        Lê os pares parâmetro/valor das tabelas já parseadas.
+        Não altera a árvore, que pode ser a mesma usada para gerar o HTML.
+        """
 
-        for table in soup_temp.find_all("table"):
-            rows = table.find_all("tr")
-            for row in rows:
+        def value_with_breaks(cell):
+            # <br> vira ", " sem modificar a célula original
+            return "".join(
+                ", " if isinstance(node, Tag) else str(node)
+                for node in cell.descendants
+                if not isinstance(node, Tag) or node.name == "br"
+            )
+
+        rows = []
+        for table in tables:
+            for row in table.find_all("tr"):
                 cells = row.find_all("td")
                 if len(cells) >= 2:
-                    param_cell = cells[0].get_text().strip()
                     value_cell = cells[1]
+                    rows.append(
+                        (
+                            cells[0].get_text().strip(),
+                            value_cell.get_text,
+                            lambda cell=value_cell: value_with_breaks(cell),
+                        )
+                    )
+        return self._metadata_from_rows(rows)
+
+    def _metadata_from_rows(self, rows):
+        """
+        Mapeia as linhas parâmetro/valor das tabelas para os campos de metadados.
 
-                    if "exequente" in param_cell.lower():
-                        metadata["exequente"] = value_cell.get_text().strip()
-                    elif "executado" in param_cell.lower():
-                        br_tags = value_cell.find_all("br")
-                        if br_tags:
-                            for br in br_tags:
-                                br.replace_with(", ")
-                        value_text = value_cell.get_text().strip()
-                        value_text = re.sub(r"\s*,\s*", ", ", value_text)
-                        value_text = re.sub(r",\s*,", ",", value_text)
-                        if len(value_text) > 250:
-                            parts = [
-                                p.strip() for p in value_text.split(",") if p.strip()
-                            ]
-                            if len(parts) > 4:
-                                value_text = ", ".join(parts[:4]) + "..."
-                        metadata["executado"] = value_text
-                    elif "valor da causa" in param_cell.lower():
-                        metadata["valor_causa"] = value_cell.get_text().strip()
-                    elif "natureza do tributo" in param_cell.lower():
-                        metadata["natureza_tributo"] = value_cell.get_text().strip()
-                    elif "data de inscrição" in param_cell.lower():
-                        metadata["data_inscricao"] = value_cell.get_text().strip()
-                    elif "encargos" in param_cell.lower():
-                        encargos_text = value_cell.get_text().strip()
-                        if len(encargos_text) > 300:
-                            encargos_text = encargos_text[:300] + "..."
-                        metadata["encargos"] = encargos_text
-                    elif "certidão de dívida ativa" in param_cell.lower() or (
-                        "cda" in param_cell.lower() and "nº" in param_cell.lower()
-                    ):
-                        metadata["cda"] = value_cell.get_text().strip()
-                    elif "vara" in param_cell.lower():
-                        metadata["vara"] = value_cell.get_text().strip()
+        Args:
+            rows: tuplas (texto do parâmetro, texto do valor, texto do valor com
+                cada <br> trocado por ", "); os textos do valor são funções sem
+                argumentos, avaliadas só para os parâmetros reconhecidos
+        """
+        metadata = {}
+
+        for param_cell, value_text, value_with_breaks in rows:
+            param = param_cell.lower()
+
+            if "exequente" in param:
+                metadata["exequente"] = value_text().strip()
+            elif "executado" in param:
+                executado = value_with_breaks().strip()
+                executado = re.sub(r"\s*,\s*", ", ", executado)
+                executado = re.sub(r",\s*,", ",", executado)
+                if len(executado) > 250:
+                    parts = [p.strip() for p in executado.split(",") if p.strip()]
+                    if len(parts) > 4:
+                        executado = ", ".join(parts[:4]) + "..."
+                metadata["executado"] = executado
+            elif "valor da causa" in param:
+                metadata["valor_causa"] = value_text().strip()
+            elif "natureza do tributo" in param:
+                metadata["natureza_tributo"] = value_text().strip()
+            elif "data de inscrição" in param:
+                metadata["data_inscricao"] = value_text().strip()
+            elif "encargos" in param:
+                encargos_text = value_text().strip()
+                if len(encargos_text) > 300:
+                    encargos_text = encargos_text[:300] + "..."
+                metadata["encargos"] = encargos_text
+            elif "certidão de dívida ativa" in param or (
+                "cda" in param and "nº" in param
+            ):
+                metadata["cda"] = value_text().strip()
+            elif "vara" in param:
+                metadata["vara"] = value_text().strip()
 
         return metadata
 
@@ -513,30 +1272,30 @@ class MarkdownConverter:
                 "**Processo Principal nº:**" in line
                 or "**Processo Principal n°:**" in line
             ):
-                valor = re.sub(r"\*\*.*?:\*\*", "", line).strip()
+                valor = _BOLD_LABEL_PATTERN.sub("", line).strip()
                 metadata["processo"] = valor
             elif "**Tipo de Ação:**" in line:
-                valor = re.sub(r"\*\*.*?:\*\*", "", line).strip()
+                valor = _BOLD_LABEL_PATTERN.sub("", line).strip()
                 metadata["tipo_acao"] = valor
             # Novos campos (Autor/Réu) com prioridade, depois antigos (Exequente/Executado)
             elif "**Autor(es):**" in line or "**Autor:**" in line:
-                valor = re.sub(r"\*\*.*?:\*\*", "", line).strip()
+                valor = _BOLD_LABEL_PATTERN.sub("", line).strip()
                 metadata["autor"] = valor
             elif "**Exequente(s):**" in line:
-                valor = re.sub(r"\*\*.*?:\*\*", "", line).strip()
+                valor = _BOLD_LABEL_PATTERN.sub("", line).strip()
                 metadata["exequente"] = valor
             elif "**Réu(s):**" in line or "**Réu:**" in line:
-                valor = re.sub(r"\*\*.*?:\*\*", "", line).strip()
+                valor = _BOLD_LABEL_PATTERN.sub("", line).strip()
                 metadata["reu"] = valor
             elif "**Executado(s):**" in line:
-                valor = re.sub(r"\*\*.*?:\*\*", "", line).strip()
+                valor = _BOLD_LABEL_PATTERN.sub("", line).strip()
                 metadata["executado"] = valor
             elif "**Vara:**" in line:
-                valor = re.sub(r"\*\*.*?:\*\*", "", line).strip()
+                valor = _BOLD_LABEL_PATTERN.sub("", line).strip()
                 metadata["vara"] = valor
             # Novo formato "Data desta Análise" com prioridade, depois antigo "Data da Análise"
             elif "**Data desta Análise:**" in line or "**Data da Análise:**" in line:
-                valor = re.sub(r"\*\*.*?:\*\*", "", line).strip()
+                valor = _BOLD_LABEL_PATTERN.sub("", line).strip()
                 metadata["data"] = valor
 
         return metadata
@@ -553,6 +1312,15 @@ class MarkdownConverter:
         - Novo: tipo_acao, autor, reu
         - Antigo: exequente, executado
         """
+        return self.merge_metadata(
+            markdown_text, self._extract_from_table(markdown_text)
+        )
+
+    def merge_metadata(self, markdown_text, table_metadata):
+        """
+        Combina os metadados dos parágrafos do cabeçalho com os já extraídos da
+        tabela (por extract_metadata() ou pelos postprocess_section()).
+        """
         metadata = {
             "processo": "",
             "tipo_acao": "",
@@ -592,9 +1360,6 @@ class MarkdownConverter:
             if processo_match:
                 metadata["processo"] = processo_match.group(1)
 
-        # Extrai das tabelas (valores com CPF/CNPJ/CDA)
-        table_metadata = self._extract_from_table(markdown_text)
-
         # Merge seletivo: só preenche campos vazios ou campos que não são do cabeçalho
         for key, value in table_metadata.items():
             if key in header_fields:
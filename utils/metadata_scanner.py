@@ -0,0 +1,290 @@
+"""Leitura das tabelas pipe direto das linhas do markdown, sem gerar HTML.
+
+Segue as regras da extensao "tables" do python-markdown para decidir o que
+e tabela e como as celulas sao divididas, e as regras de HTML bruto do
+md_in_html para ignorar tabelas dentro de blocos HTML sem markdown="1".
+O texto de cada celula equivale ao get_text() da celula renderizada.
+"""
+
+import re
+from bisect import bisect_right
+from html import unescape
+
+_FENCE_PATTERN = re.compile(r"^(`{3,}|~{3,})")
+_CLOSING_FENCE_PATTERN = re.compile(r"^(`{3,}|~{3,}) *$")
+_HEADING_PATTERN = re.compile(r"^#{1,6}")
+_HR_PATTERN = re.compile(
+    r"^ {0,3}(?:(?:-[ ]{0,2}){3,}|(?:_[ ]{0,2}){3,}|(?:\*[ ]{0,2}){3,})$"
+)
+_BLOCK_TAG_PATTERN = re.compile(r"^ {0,3}<([a-zA-Z][a-zA-Z0-9]*)\b([^>]*)>?")
+_CLOSING_TAG_PATTERN = re.compile(r"^ {0,3}</([a-zA-Z][a-zA-Z0-9]*)\s*>")
+_HTML_TAG_PATTERN = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9-]*)\b[^>]*?(/?)>")
+_MARKDOWN_ATTRIBUTE_PATTERN = re.compile(
+    r"""\bmarkdown(?:\s*=\s*["']?(1|block|markdown)["']?)?(?=[\s/>]|$)"""
+)
+# Mesmo critério do TableProcessor (RE_CODE_PIPES e RE_END_BORDER)
+_CODE_PIPES_PATTERN = re.compile(r"(?:(\\\\)|(\\`+)|(`+)|(\\\|)|(\|))")
+_END_BORDER_PATTERN = re.compile(r"(?<!\\)(?:\\\\)*\|$")
+_SEPARATOR_CHARS = frozenset("|:- ")
+
+# Elementos de bloco do python-markdown (Markdown.block_level_elements)
+_BLOCK_LEVEL_TAGS = frozenset(
+    {
+        "address", "article", "aside", "blockquote", "body", "canvas", "center",
+        "colgroup", "dd", "details", "div", "dl", "dt", "fieldset", "figcaption",
+        "figure", "footer", "form", "group", "h1", "h2", "h3", "h4", "h5", "h6",
+        "header", "hgroup", "hr", "html", "iframe", "legend", "li", "main", "map",
+        "math", "menu", "nav", "noscript", "object", "ol", "option", "output", "p",
+        "pre", "progress", "script", "section", "style", "summary", "table",
+        "tbody", "td", "textarea", "tfoot", "th", "thead", "tr", "ul", "video",
+    }
+)  # fmt: skip
+_VOID_TAGS = frozenset(
+    {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta"}
+    | {"param", "source", "track", "wbr"}
+)
+
+# Conversão inline -> texto (equivalente ao get_text() do HTML renderizado)
+_ESCAPABLE = "\\`*_{}[]()>#+-.!|"
+_CODE_SPAN_PATTERN = re.compile(r"(?<!`)(`+)(?!`)(.+?)(?<!`)\1(?!`)")
+_ESCAPE_PATTERN = re.compile(r"\\([\\`*_{}\[\]()>#+\-.!|])")
+_IMAGE_PATTERN = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+_LINK_PATTERN = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_AUTOLINK_PATTERN = re.compile(r"<((?:https?|ftp)://[^>]*|[^>@\s]+@[^>\s]+)>")
+_BR_PATTERN = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_INLINE_TAG_PATTERN = re.compile(r"<!--.*?-->|</?[a-zA-Z][^>]*>", re.DOTALL)
+_EMPHASIS_PATTERNS = (
+    re.compile(r"(\*{1,3})(?=\S)(.+?)(?<=\S)\1"),
+    re.compile(r"(?<!\w)(_{1,3})(?=\S)(.+?)(?<=\S)\1(?!\w)"),
+)
+# Marcadores privados para proteger trechos já resolvidos
+_PROTECT_START = "\x02"
+_PROTECT_END = "\x03"
+_PROTECTED_PATTERN = re.compile("\x02(\\d+)\x03")
+
+
+def inline_text(text, br=""):
+    """
+    Texto de um trecho markdown inline, como o get_text() do HTML gerado.
+
+    Args:
+        text: Markdown inline (ex.: conteúdo de uma célula)
+        br: Texto usado no lugar de cada <br>
+    """
+    protected = []
+
+    def protect(value):
+        protected.append(value)
+        return f"{_PROTECT_START}{len(protected) - 1}{_PROTECT_END}"
+
+    text = text.replace(_PROTECT_START, "").replace(_PROTECT_END, "")
+    # Escapes primeiro, para que \` não abra um trecho de código
+    text = _ESCAPE_PATTERN.sub(lambda m: protect(m.group(1)), text)
+    text = _CODE_SPAN_PATTERN.sub(lambda m: protect(m.group(2).strip()), text)
+    text = _AUTOLINK_PATTERN.sub(lambda m: protect(m.group(1)), text)
+    text = _BR_PATTERN.sub(lambda m: protect(br), text)
+    text = _INLINE_TAG_PATTERN.sub("", text)
+    text = _IMAGE_PATTERN.sub("", text)
+    text = _LINK_PATTERN.sub(r"\1", text)
+    for _ in range(3):
+        previous = text
+        for pattern in _EMPHASIS_PATTERNS:
+            text = pattern.sub(r"\2", text)
+        if text == previous:
+            break
+    text = unescape(text)
+    return _PROTECTED_PATTERN.sub(lambda m: protected[int(m.group(1))], text)
+
+
+# ========== TABELAS ==========
+
+
+def _split(row):
+    """Divide a linha nas barras fora de trechos de código (TableProcessor._split)."""
+    pipes = []
+    tics = []
+    tic_points = []
+    for match in _CODE_PIPES_PATTERN.finditer(row):
+        if match.group(2):
+            tics.append(len(match.group(2)) - 1)
+            tic_points.append((match.start(2), match.end(2) - 1, 1))
+        elif match.group(3):
+            tics.append(len(match.group(3)))
+            tic_points.append((match.start(3), match.end(3) - 1, 0))
+        elif match.group(5):
+            pipes.append(match.start(5))
+
+    regions = []
+    pos = 0
+    while pos < len(tics):
+        size = tics[pos] - tic_points[pos][2]
+        if size and size in tics[pos + 1 :]:
+            index = tics[pos + 1 :].index(size) + 1
+            regions.append((tic_points[pos][0], tic_points[pos + index][1]))
+            pos += index + 1
+        else:
+            pos += 1
+
+    cells = []
+    start = 0
+    for pipe in pipes:
+        if any(begin <= pipe <= end for begin, end in regions):
+            continue
+        cells.append(row[start:pipe])
+        start = pipe + 1
+    cells.append(row[start:])
+    return cells
+
+
+def _split_row(row, border):
+    if border:
+        if row.startswith("|"):
+            row = row[1:]
+        row = _END_BORDER_PATTERN.sub("", row)
+    return _split(row)
+
+
+def _table_rows(block):
+    """Linhas do corpo da tabela, já com o número de colunas do cabeçalho."""
+    rows = [line.strip(" ") for line in block]
+    if len(rows) < 2 or block[0].startswith("    "):
+        return None
+
+    # A linha separadora só tem "|", ":", "-" e espaços; descarta parágrafos cedo
+    if not set(rows[1]) <= _SEPARATOR_CHARS:
+        return None
+
+    header = rows[0]
+    border = header.startswith("|") or bool(_END_BORDER_PATTERN.search(header))
+    columns = len(_split_row(header, border))
+    is_table = columns > 1
+    if not is_table and columns == 1 and border:
+        is_table = all(
+            row.startswith("|") or _END_BORDER_PATTERN.search(row) for row in rows[1:]
+        )
+    if not is_table:
+        return None
+
+    separator = _split_row(rows[1], border)
+    if len(separator) != columns or not set("".join(separator)) <= _SEPARATOR_CHARS:
+        return None
+
+    body = []
+    for row in rows[2:]:
+        cells = _split_row(row, border)
+        body.append(
+            [cells[i].strip(" ") if i < len(cells) else "" for i in range(columns)]
+        )
+    # Tabela sem corpo: o TableProcessor gera uma linha de células vazias
+    return body or [[""] * columns]
+
+
+def _blocks(markdown_text):
+    """
+    Blocos de linhas consecutivas como o python-markdown os vê: separados por
+    linhas em branco, títulos, linhas horizontais e tags HTML de bloco.
+    Conteúdo de blocos de código e de HTML bruto é descartado. Uma cerca de
+    código sem fechamento é texto comum, como no fenced_code.
+    """
+    lines = [
+        line.expandtabs(4)
+        for line in markdown_text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    ]
+    # Linhas que podem fechar cada cerca, em ordem
+    closing_fences = {}
+    for index, line in enumerate(lines):
+        if line[:1] in ("`", "~"):
+            closing_match = _CLOSING_FENCE_PATTERN.match(line)
+            if closing_match:
+                closing_fences.setdefault(closing_match.group(1), []).append(index)
+
+    block = []
+    fence_end = None
+    # Tags de bloco abertas: [nome, markdown habilitado, profundidade]
+    stack = []
+
+    for index, line in enumerate(lines):
+        if fence_end is not None:
+            if index == fence_end:
+                fence_end = None
+            continue
+
+        if stack and not stack[-1][1]:
+            # Dentro de HTML bruto: só acompanha o fechamento
+            for tag in _HTML_TAG_PATTERN.finditer(line):
+                closing, name, self_closing = tag.groups()
+                if self_closing or name.lower() in _VOID_TAGS:
+                    continue
+                stack[-1][2] += -1 if closing else 1
+                if stack[-1][2] == 0:
+                    stack.pop()
+                    break
+            continue
+
+        stripped = line.strip()
+        if not stripped:
+            if block:
+                yield block
+            block = []
+            continue
+
+        fence_match = line[0] in "`~" and _FENCE_PATTERN.match(line)
+        if fence_match:
+            candidates = closing_fences.get(fence_match.group(1), ())
+            position = bisect_right(candidates, index)
+            if position < len(candidates):
+                # O bloco de código fecha o bloco de linhas anterior e o seguinte
+                if block:
+                    yield block
+                block = []
+                fence_end = candidates[position]
+                continue
+
+        is_tag = stripped[0] == "<"
+        closing_match = is_tag and stack and _CLOSING_TAG_PATTERN.match(line)
+        if closing_match and closing_match.group(1).lower() == stack[-1][0]:
+            if block:
+                yield block
+            block = []
+            stack.pop()
+            continue
+
+        tag_match = is_tag and _BLOCK_TAG_PATTERN.match(line)
+        if tag_match and tag_match.group(1).lower() in _BLOCK_LEVEL_TAGS:
+            if block:
+                yield block
+            block = []
+            name = tag_match.group(1).lower()
+            markdown_enabled = bool(
+                _MARKDOWN_ATTRIBUTE_PATTERN.search(tag_match.group(2))
+            )
+            depth = 0
+            for tag in _HTML_TAG_PATTERN.finditer(line):
+                closing, tag_name, self_closing = tag.groups()
+                if self_closing or tag_name.lower() in _VOID_TAGS:
+                    continue
+                depth += -1 if closing else 1
+            if depth > 0:
+                stack.append([name, markdown_enabled, depth])
+            continue
+
+        if _HEADING_PATTERN.match(line) or (
+            stripped[0] in "-_*" and _HR_PATTERN.match(stripped)
+        ):
+            if block:
+                yield block
+            block = []
+            continue
+
+        block.append(line)
+
+    if block:
+        yield block
+
+
+def iter_table_rows(markdown_text):
+    """Gera as linhas do corpo (listas de células em markdown) de cada tabela."""
+    for block in _blocks(markdown_text):
+        rows = _table_rows(block)
+        if rows:
+            yield from rows
@@ -1,15 +1,371 @@
-from weasyprint import CSS, HTML
+import functools
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import weasyprint
+from bs4 import BeautifulSoup, Tag
+from weasyprint import CSS, HTML, default_url_fetcher
 
 try:
     from weasyprint.text.fonts import FontConfiguration
 except ImportError:
     from weasyprint.fonts import FontConfiguration
-import re
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:
+    PdfReader = PdfWriter = None
+
+logger = logging.getLogger(__name__)
+
+# Incrementar quando o render mudar de forma incompatível, para que PDFs
+# gerados antes não sejam reaproveitados (ver render_fingerprint)
+RENDER_VERSION = 2
+
+# Cor primária do tema padrão (juridico), usada quando o tema não é informado
+DEFAULT_PRIMARY_COLOR = "#BE3000"
+_HEX_COLOR_PATTERN = re.compile(r"^#([0-9a-fA-F]{3}|[0-9a-fA-F]{6})$")
+
+# Folha de estilo de impressão; {page_size} e as cores vêm de print_css()
+PRINT_CSS_TEMPLATE = """
+@page {{
+    size: {page_size};
+    margin: 1.5cm 1cm;
+    orphans: 2;
+    widows: 2;
+}}
+
+* {{
+    -webkit-print-color-adjust: exact !important;
+    print-color-adjust: exact !important;
+    color-adjust: exact !important;
+}}
+
+body {{
+    font-size: 10pt;
+    line-height: 1.4;
+    orphans: 2;
+    widows: 2;
+}}
+
+img {{
+    max-width: 100%;
+    height: auto;
+}}
+
+.header {{
+    padding: 20px 15px !important;
+    margin-bottom: 15px !important;
+    page-break-inside: avoid;
+}}
+
+.header h1 {{
+    font-size: 18pt !important;
+    margin-bottom: 8px !important;
+    line-height: 1.2 !important;
+}}
+
+.header p {{
+    font-size: 9pt !important;
+    margin-bottom: 3px !important;
+}}
+
+.container {{
+    padding: 10px !important;
+}}
+
+.card {{
+    padding: 15px !important;
+    margin-bottom: 15px !important;
+    page-break-inside: avoid;
+}}
+
+h1 {{
+    font-size: 16pt !important;
+    margin: 15px 0 10px 0 !important;
+    page-break-after: avoid;
+    page-break-inside: avoid;
+}}
+
+h2 {{
+    font-size: 14pt !important;
+    margin: 12px 0 8px 0 !important;
+    page-break-after: avoid;
+    page-break-inside: avoid;
+}}
+
+h3 {{
+    font-size: 12pt !important;
+    margin: 10px 0 6px 0 !important;
+    page-break-after: avoid;
+    page-break-inside: avoid;
+}}
+
+h4, h5, h6 {{
+    font-size: 11pt !important;
+    margin: 8px 0 5px 0 !important;
+    page-break-after: avoid;
+}}
+
+p {{
+    font-size: 10pt !important;
+    margin-bottom: 8px !important;
+    orphans: 2;
+    widows: 2;
+}}
+
+.section-title {{
+    font-size: 13pt !important;
+    margin-bottom: 12px !important;
+    padding-bottom: 6px !important;
+    page-break-after: avoid;
+}}
+
+.subsection-title {{
+    font-size: 11pt !important;
+    margin: 10px 0 8px 0 !important;
+    page-break-after: avoid;
+}}
+
+table {{
+    font-size: 9pt !important;
+    margin: 10px 0 !important;
+    page-break-inside: avoid;
+}}
+
+table th {{
+    font-size: 9pt !important;
+    padding: 8px 10px !important;
+}}
+
+table td {{
+    font-size: 9pt !important;
+    padding: 6px 10px !important;
+}}
+
+thead {{
+    display: table-header-group;
+}}
+
+tr {{
+    page-break-inside: avoid;
+}}
+
+ul, ol {{
+    font-size: 10pt !important;
+    margin: 8px 0 !important;
+    padding-left: 25px !important;
+}}
+
+li {{
+    margin-bottom: 4px !important;
+}}
+
+strong, b {{
+    font-weight: 700 !important;
+}}
+
+.alerta-box-critico,
+.alerta-box-medio,
+.alerta-box-baixo {{
+    padding: 10px !important;
+    margin: 12px 0 !important;
+    font-size: 10pt !important;
+    page-break-inside: avoid;
+}}
+
+.executive-summary {{
+    margin-top: -30px !important;
+    page-break-inside: avoid;
+}}
+
+.footer {{
+    padding: 20px 15px !important;
+    margin-top: 20px !important;
+    font-size: 9pt !important;
+}}
+
+.footer h3 {{
+    font-size: 12pt !important;
+}}
+
+.footer p {{
+    font-size: 8pt !important;
+}}
+
+/* Estilos para menus collapse no PDF (sempre expandidos) */
+details {{
+    background-color: #f8f9fa;
+    border: 1px solid #dee2e6;
+    border-radius: 5px;
+    padding: 12px !important;
+    margin: 12px 0 !important;
+    page-break-inside: avoid;
+}}
+
+/* CRÍTICO: Força o conteúdo de <details> a sempre aparecer no PDF */
+details > *:not(summary) {{
+    display: block !important;
+}}
+
+summary {{
+    font-weight: 700 !important;
+    font-size: 11pt !important;
+    padding: 8px !important;
+    margin: -12px -12px 10px -12px !important;
+    border-radius: 5px 5px 0 0;
+    background-color: rgba({primary_rgb}, 0.1);
+    display: block !important;
+}}
+
+summary::before {{
+    content: '▼ ';
+    color: {primary};
+}}
+
+details details {{
+    margin-left: 15px !important;
+    margin-top: 10px !important;
+    background-color: #fff;
+}}
+
+details details summary {{
+    font-size: 10pt !important;
+    background-color: rgba({primary_rgb}, 0.05);
+}}
+"""
+
+_font_config = None
+_font_config_lock = threading.Lock()
+
+
+def get_font_config():
+    """FontConfiguration única do processo, compartilhada por todos os PDFConverter"""
+    global _font_config
+    with _font_config_lock:
+        if _font_config is None:
+            _font_config = FontConfiguration()
+        return _font_config
+
+
+def _primary_color(theme_config):
+    """Cor primária do tema em #rrggbb e em "r, g, b" para os rgba() do CSS"""
+    color = ((theme_config or {}).get("colors") or {}).get("primary", "")
+    match = _HEX_COLOR_PATTERN.match(color.strip())
+    if not match:
+        color = DEFAULT_PRIMARY_COLOR
+        match = _HEX_COLOR_PATTERN.match(color)
+    digits = match.group(1)
+    if len(digits) == 3:
+        digits = "".join(c * 2 for c in digits)
+    rgb = ", ".join(str(int(digits[i : i + 2], 16)) for i in (0, 2, 4))
+    return f"#{digits}", rgb
+
+
+def print_css(orientation="portrait", theme_config=None):
+    """Texto da folha de estilo de impressão para a orientação e o tema"""
+    primary, primary_rgb = _primary_color(theme_config)
+    return PRINT_CSS_TEMPLATE.format(
+        page_size="A4" if orientation == "portrait" else "A4 landscape",
+        primary=primary,
+        primary_rgb=primary_rgb,
+    )
+
+
+def render_fingerprint(
+    html_content,
+    orientation="portrait",
+    theme_config=None,
+    options=None,
+    custom_config=None,
+):
+    """
+    Hash de tudo que define o PDF: o HTML, a orientação, a folha de impressão
+    (que depende da cor do tema, já com custom_config aplicado), os ajustes
+    de custom_config (como em ConversionCache.make_key()), a versão do
+    WeasyPrint, RENDER_VERSION e as opções do conversor
+    (PDFConverter.render_options()).
+    """
+    orientation = (orientation or "portrait").strip().lower()
+    payload = json.dumps(
+        {
+            "version": RENDER_VERSION,
+            "weasyprint": getattr(weasyprint, "__version__", ""),
+            "orientation": orientation,
+            "print_css": print_css(orientation, theme_config),
+            "options": options or {},
+            "custom_config": custom_config or {},
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    digest = hashlib.sha256(payload.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(html_content.encode("utf-8"))
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=64)
+def _print_stylesheet(orientation, primary):
+    return CSS(
+        string=print_css(orientation, {"colors": {"primary": primary}}),
+        font_config=get_font_config(),
+    )
+
+
+def print_stylesheet(orientation="portrait", theme_config=None):
+    """
+    Folha de estilo de impressão já parseada, em cache por orientação e pela
+    cor primária do tema (a única parte do CSS que depende do tema).
+    """
+    return _print_stylesheet(orientation, _primary_color(theme_config)[0])
 
 
 class PDFConverter:
-    def __init__(self):
-        self.font_config = FontConfiguration()
+    def __init__(
+        self,
+        asset_cache=None,
+        render_workers=0,
+        render_timeout=None,
+        split_min_chars=0,
+        image_optimizer=None,
+    ):
+        self.font_config = get_font_config()
+        # AssetCache usado como url_fetcher; sem ele o WeasyPrint busca na rede
+        self.asset_cache = asset_cache
+        # ImageOptimizer aplicado às imagens retornadas pelo url_fetcher
+        self.image_optimizer = image_optimizer
+        # Com render_workers > 0 os renders vão para o pool de processos
+        # (get_render_pool) em vez de rodar no processo que atende a requisição
+        self.render_workers = render_workers
+        self.render_timeout = render_timeout
+        # HTML a partir deste tamanho é dividido por seções e renderizado em
+        # paralelo no pool (0 = nunca; requer pypdf e render_workers > 1)
+        self.split_min_chars = split_min_chars
+
+    def render_options(self):
+        """Opções do conversor que mudam o PDF gerado, para render_fingerprint()."""
+        return {
+            "images": self.image_optimizer.settings() if self.image_optimizer else None
+        }
+
+    def _url_fetcher(self, orientation, theme_config):
+        fetcher = self.asset_cache.fetch if self.asset_cache else default_url_fetcher
+        if self.image_optimizer is None:
+            return fetcher
+        return self.image_optimizer.wrap(
+            fetcher, orientation, (theme_config or {}).get("logo")
+        )
 
     def _extract_css_variables(self, html_content):
         """Extrai as variáveis CSS do HTML"""
@@ -41,7 +397,97 @@ class PDFConverter:
 
         return processed_html
 
-    def html_to_pdf(self, html_content, output_path, orientation="portrait"):
+    def _has_css_variables(self, html_content):
+        """
+        O HTML de base.html já vem com o CSS do tema compilado, sem :root no
+        <head>; só HTML antigo (salvo no Storage) ainda precisa da substituição.
+        """
+        head_end = html_content.find("</head>")
+        if head_end == -1:
+            head_end = len(html_content)
+        return html_content.find(":root", 0, head_end) != -1
+
+    def html_to_pdf(
+        self, html_content, output_path, orientation="portrait", theme_config=None
+    ):
+        """
+        Grava o PDF em output_path, que pode ser um caminho ou um objeto de
+        arquivo aberto em modo binário.
+        """
+        if not self.render_workers:
+            self._write_pdf(html_content, output_path, orientation, theme_config)
+            return True
+
+        content = self._render_in_pool(html_content, orientation, theme_config)
+        if hasattr(output_path, "write"):
+            output_path.write(content)
+        else:
+            with open(output_path, "wb") as f:
+                f.write(content)
+        return True
+
+    def html_to_pdf_bytes(
+        self, html_content, orientation="portrait", theme_config=None
+    ):
+        """Renderiza o PDF em memória e retorna os bytes, sem arquivo temporário."""
+        if self.render_workers:
+            return self._render_in_pool(html_content, orientation, theme_config)
+        return self._write_pdf(html_content, None, orientation, theme_config)
+
+    def _should_split(self, html_content):
+        return (
+            PdfWriter is not None
+            and self.split_min_chars > 0
+            and self.render_workers > 1
+            and len(html_content) >= self.split_min_chars
+        )
+
+    def _render_in_pool(self, html_content, orientation, theme_config):
+        pool = get_render_pool(
+            self.render_workers,
+            self.asset_cache is not None,
+            self.image_optimizer is not None,
+        )
+        chunks = [html_content]
+        if self._should_split(html_content):
+            chunks = split_report(html_content, self.render_workers)
+
+        # Um único prazo para todas as seções, não render_timeout por seção
+        # (sem render_timeout, espera o tempo que for preciso)
+        deadline = None
+        if self.render_timeout is not None:
+            deadline = time.monotonic() + self.render_timeout
+        futures = [
+            pool.submit(_render_in_worker, chunk, orientation, theme_config)
+            for chunk in chunks
+        ]
+        try:
+            parts = [
+                future.result(
+                    timeout=None
+                    if deadline is None
+                    else max(0, deadline - time.monotonic())
+                )
+                for future in futures
+            ]
+        except FutureTimeoutError as e:
+            for future in futures:
+                future.cancel()
+            raise Exception(
+                f"Tempo esgotado ao gerar o PDF ({self.render_timeout}s)"
+            ) from e
+        except BrokenProcessPool as e:
+            # Um processo do pool morreu (ex.: falta de memória): recria no próximo
+            _reset_render_pool(pool)
+            raise Exception(f"Erro ao converter HTML para PDF: {str(e)}") from e
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+
+        return parts[0] if len(parts) == 1 else merge_pdfs(parts)
+
+    def _write_pdf(self, html_content, target, orientation, theme_config):
         if not orientation:
             orientation = "portrait"
         orientation = orientation.strip().lower()
@@ -51,226 +497,21 @@ class PDFConverter:
             )
 
         try:
-            processed_html = self._replace_css_variables(html_content)
-
-            html = HTML(string=processed_html)
-
-            page_size = "A4" if orientation == "portrait" else "A4 landscape"
-
-            css = CSS(
-                string=f"""
-                @page {{
-                    size: {page_size};
-                    margin: 1.5cm 1cm;
-                    orphans: 2;
-                    widows: 2;
-                }}
-                
-                * {{
-                    -webkit-print-color-adjust: exact !important;
-                    print-color-adjust: exact !important;
-                    color-adjust: exact !important;
-                }}
-                
-                body {{
-                    font-size: 10pt;
-                    line-height: 1.4;
-                    orphans: 2;
-                    widows: 2;
-                }}
-                
-                .header {{
-                    padding: 20px 15px !important;
-                    margin-bottom: 15px !important;
-                    page-break-inside: avoid;
-                }}
-                
-                .header h1 {{
-                    font-size: 18pt !important;
-                    margin-bottom: 8px !important;
-                    line-height: 1.2 !important;
-                }}
-                
-                .header p {{
-                    font-size: 9pt !important;
-                    margin-bottom: 3px !important;
-                }}
-                
-                .container {{
-                    padding: 10px !important;
-                }}
-                
-                .card {{
-                    padding: 15px !important;
-                    margin-bottom: 15px !important;
-                    page-break-inside: avoid;
-                }}
-                
-                h1 {{
-                    font-size: 16pt !important;
-                    margin: 15px 0 10px 0 !important;
-                    page-break-after: avoid;
-                    page-break-inside: avoid;
-                }}
-                
-                h2 {{
-                    font-size: 14pt !important;
-                    margin: 12px 0 8px 0 !important;
-                    page-break-after: avoid;
-                    page-break-inside: avoid;
-                }}
-                
-                h3 {{
-                    font-size: 12pt !important;
-                    margin: 10px 0 6px 0 !important;
-                    page-break-after: avoid;
-                    page-break-inside: avoid;
-                }}
-                
-                h4, h5, h6 {{
-                    font-size: 11pt !important;
-                    margin: 8px 0 5px 0 !important;
-                    page-break-after: avoid;
-                }}
-                
-                p {{
-                    font-size: 10pt !important;
-                    margin-bottom: 8px !important;
-                    orphans: 2;
-                    widows: 2;
-                }}
-                
-                .section-title {{
-                    font-size: 13pt !important;
-                    margin-bottom: 12px !important;
-                    padding-bottom: 6px !important;
-                    page-break-after: avoid;
-                }}
-                
-                .subsection-title {{
-                    font-size: 11pt !important;
-                    margin: 10px 0 8px 0 !important;
-                    page-break-after: avoid;
-                }}
-                
-                table {{
-                    font-size: 9pt !important;
-                    margin: 10px 0 !important;
-                    page-break-inside: avoid;
-                }}
-                
-                table th {{
-                    font-size: 9pt !important;
-                    padding: 8px 10px !important;
-                }}
-                
-                table td {{
-                    font-size: 9pt !important;
-                    padding: 6px 10px !important;
-                }}
-                
-                thead {{
-                    display: table-header-group;
-                }}
-                
-                tr {{
-                    page-break-inside: avoid;
-                }}
-                
-                ul, ol {{
-                    font-size: 10pt !important;
-                    margin: 8px 0 !important;
-                    padding-left: 25px !important;
-                }}
-                
-                li {{
-                    margin-bottom: 4px !important;
-                }}
-                
-                strong, b {{
-                    font-weight: 700 !important;
-                }}
-                
-                .alerta-box-critico,
-                .alerta-box-medio,
-                .alerta-box-baixo {{
-                    padding: 10px !important;
-                    margin: 12px 0 !important;
-                    font-size: 10pt !important;
-                    page-break-inside: avoid;
-                }}
-                
-                .executive-summary {{
-                    margin-top: -30px !important;
-                    page-break-inside: avoid;
-                }}
-                
-                .footer {{
-                    padding: 20px 15px !important;
-                    margin-top: 20px !important;
-                    font-size: 9pt !important;
-                }}
-                
-                .footer h3 {{
-                    font-size: 12pt !important;
-                }}
-                
-                .footer p {{
-                    font-size: 8pt !important;
-                }}
-                
-                /* Estilos para menus collapse no PDF (sempre expandidos) */
-                details {{
-                    background-color: #f8f9fa;
-                    border: 1px solid #dee2e6;
-                    border-radius: 5px;
-                    padding: 12px !important;
-                    margin: 12px 0 !important;
-                    page-break-inside: avoid;
-                }}
-                
-                /* CRÍTICO: Força o conteúdo de <details> a sempre aparecer no PDF */
-                details > *:not(summary) {{
-                    display: block !important;
-                }}
-                
-                summary {{
-                    font-weight: 700 !important;
-                    font-size: 11pt !important;
-                    padding: 8px !important;
-                    margin: -12px -12px 10px -12px !important;
-                    border-radius: 5px 5px 0 0;
-                    background-color: rgba(190, 48, 0, 0.1);
-                    display: block !important;
-                }}
-                
-                summary::before {{
-                    content: '▼ ';
-                    color: #BE3000;
-                }}
-                
-                details details {{
-                    margin-left: 15px !important;
-                    margin-top: 10px !important;
-                    background-color: #fff;
-                }}
-                
-                details details summary {{
-                    font-size: 10pt !important;
-                    background-color: rgba(190, 48, 0, 0.05);
-                }}
-            """,
-                font_config=self.font_config,
+            if self._has_css_variables(html_content):
+                html_content = self._replace_css_variables(html_content)
+
+            html = HTML(
+                string=html_content,
+                url_fetcher=self._url_fetcher(orientation, theme_config),
             )
 
-            html.write_pdf(
-                output_path,
-                stylesheets=[css],
+            # Sem target, write_pdf() retorna os bytes do documento
+            return html.write_pdf(
+                target,
+                stylesheets=[print_stylesheet(orientation, theme_config)],
                 font_config=self.font_config,
                 presentational_hints=True,
             )
-
-            return True
         except Exception as e:
             raise Exception(f"Erro ao converter HTML para PDF: {str(e)}") from e
 
@@ -290,3 +531,173 @@ class PDFConverter:
             return self.html_to_pdf(html_content, output_path, orientation)
         except Exception as e:
             raise Exception(f"Erro ao ler arquivo HTML: {str(e)}") from e
+
+
+# ========== POOL DE RENDER ==========
+
+# Documento pequeno renderizado por cada processo ao iniciar: carrega as
+# fontes, o parser de CSS e a folha de impressão antes do primeiro pedido
+WARMUP_HTML = """<html><head><meta charset="utf-8"></head><body>
+<h1>Relatório</h1><h2>Seção</h2>
+<p><strong>Aquecimento</strong> do <em>render</em>: àéîõüç 0123456789</p>
+<table><thead><tr><th>Item</th><th>Valor</th></tr></thead>
+<tbody><tr><td>A</td><td>R$ 1.000,00</td></tr></tbody></table>
+<ul><li>Item</li></ul><blockquote>Citação</blockquote><code>codigo</code>
+</body></html>"""
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+_worker_converter = None
+
+
+def _init_render_worker(use_asset_cache, optimize_images):
+    """Prepara o processo do pool: fontes, conversor e um render de aquecimento."""
+    global _worker_converter
+
+    asset_cache = image_optimizer = None
+    if use_asset_cache:
+        from utils.asset_cache import asset_cache
+    if optimize_images:
+        from utils.image_optimizer import image_optimizer
+    _worker_converter = PDFConverter(
+        asset_cache=asset_cache, image_optimizer=image_optimizer
+    )
+    for orientation in ("portrait", "landscape"):
+        try:
+            _worker_converter.html_to_pdf_bytes(WARMUP_HTML, orientation)
+        except Exception:
+            logger.warning("Falha no render de aquecimento do PDF", exc_info=True)
+
+
+def _render_in_worker(html_content, orientation, theme_config):
+    return _worker_converter.html_to_pdf_bytes(html_content, orientation, theme_config)
+
+
+def _ping():
+    return True
+
+
+def get_render_pool(max_workers, use_asset_cache=True, optimize_images=True):
+    """
+    Pool de processos de render compartilhado pelos PDFConverter do processo.
+    Os argumentos só valem na criação. Usa "spawn": os processos não herdam
+    locks de threads do servidor e importam o WeasyPrint do zero uma vez.
+    """
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_render_worker,
+                initargs=(use_asset_cache, optimize_images),
+            )
+        return _render_pool
+
+
+def start_render_pool(max_workers, use_asset_cache=True, optimize_images=True):
+    """Cria o pool e já sobe os processos, para aquecer fora das requisições."""
+    pool = get_render_pool(max_workers, use_asset_cache, optimize_images)
+    for _ in range(max_workers):
+        pool.submit(_ping)
+    return pool
+
+
+def _reset_render_pool(pool):
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ========== RENDER POR SEÇÕES ==========
+
+
+# Títulos que abrem uma seção do relatório (pontos de corte do split_report)
+SPLIT_HEADINGS = ("h1", "h2")
+
+
+def split_report(html_content, max_chunks):
+    """
+    Divide o relatório de base.html em até max_chunks documentos completos,
+    cortando só antes dos <h1>/<h2> de primeiro nível de .container (cada
+    título fica com o conteúdo que o segue) e equilibrando o tamanho. O
+    cabeçalho fica só no primeiro e o rodapé só no último; cada parte começa
+    em uma página nova. Sem .container, retorna [html_content].
+    """
+    soup = BeautifulSoup(html_content, "html.parser")
+    container = soup.select_one("body .container")
+    if container is None or max_chunks < 2:
+        return [html_content]
+
+    sections = []
+    # A seção atual já tem conteúdo além dos títulos (títulos seguidos, como
+    # um H1 logo antes de um H2, ficam juntos com o corpo que vem depois)
+    has_body = False
+    for child in container.contents:
+        is_heading = isinstance(child, Tag) and child.name in SPLIT_HEADINGS
+        if not sections or (is_heading and has_body):
+            sections.append([])
+            has_body = False
+        sections[-1].append(str(child))
+        if not is_heading and str(child).strip():
+            has_body = True
+    sections = ["".join(parts) for parts in sections]
+    if len(sections) < 2:
+        return [html_content]
+
+    header = soup.select_one("body > .header")
+    footer = soup.select_one("body > .footer")
+    header_html = str(header) if header else ""
+    footer_html = str(footer) if footer else ""
+    marker = "<!--secoes-->"
+    container.clear()
+    container.append(BeautifulSoup(marker, "html.parser"))
+    template = str(soup)
+
+    groups = _group_sections(sections, max_chunks)
+    chunks = []
+    for i, group in enumerate(groups):
+        chunk = template
+        if i > 0 and header_html:
+            chunk = chunk.replace(header_html, "", 1)
+        if i < len(groups) - 1 and footer_html:
+            chunk = chunk.replace(footer_html, "", 1)
+        chunks.append(chunk.replace(marker, "".join(group), 1))
+    return chunks
+
+
+def _group_sections(sections, max_chunks):
+    """Agrupa seções consecutivas em até max_chunks grupos de tamanho parecido."""
+    total = sum(len(section) for section in sections)
+    groups, current, size = [], [], 0
+    for section in sections:
+        current.append(section)
+        size += len(section)
+        if (
+            len(groups) < max_chunks - 1
+            and size >= total * (len(groups) + 1) / max_chunks
+        ):
+            groups.append(current)
+            current = []
+    if current:
+        groups.append(current)
+    return groups
+
+
+def merge_pdfs(parts):
+    """
+    Junta os PDFs na ordem, com a numeração de páginas contínua e os
+    marcadores (outline) de cada parte apontando para as páginas certas.
+    Metadados (título) vêm da primeira parte.
+    """
+    writer = PdfWriter()
+    for content in parts:
+        writer.append(PdfReader(io.BytesIO(content)), import_outline=True)
+    metadata = PdfReader(io.BytesIO(parts[0])).metadata
+    if metadata:
+        writer.add_metadata(dict(metadata))
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
@@ -0,0 +1,130 @@
+"""Tempos por requisicao (auth, banco, conversao, PDF, Storage) no header Server-Timing."""
+
+import functools
+import inspect
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[^A-Za-z0-9!#$%&'*+.^_`|~-]")
+_local = threading.local()
+
+
+def record(name, seconds):
+    """Soma a duração de uma fase da requisição atual; fora de uma requisição é ignorada."""
+    if not has_request_context():
+        return
+    timings = g.setdefault("server_timings", {})
+    entry = timings.setdefault(name, [0.0, 0])
+    entry[0] += seconds
+    entry[1] += 1
+
+
+@contextmanager
+def timed(name):
+    """Mede o bloco e registra com record()."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def pipeline_hook(stage, ctx, seconds):
+    """Hook "after" do ConversionPipeline: registra cada estágio executado."""
+    record(stage, seconds)
+
+
+def instrument(prefix):
+    """
+    Decorator de classe: mede cada método público como "<prefix>-<método>".
+
+    Chamadas aninhadas (um método público chamando outro) contam só na mais
+    externa, para que a soma não conte o mesmo tempo duas vezes.
+    """
+
+    def wrap(name, method):
+        metric = f"{prefix}-{name}"
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "active", False):
+                return method(*args, **kwargs)
+            _local.active = True
+            try:
+                with timed(metric):
+                    return method(*args, **kwargs)
+            finally:
+                _local.active = False
+
+        return wrapper
+
+    def decorate(cls):
+        for name, method in list(vars(cls).items()):
+            if inspect.isfunction(method) and not name.startswith("_"):
+                setattr(cls, name, wrap(name, method))
+        return cls
+
+    return decorate
+
+
+def header_value(timings, total=None):
+    """Formata as medições no padrão do header Server-Timing."""
+    parts = []
+    for name, (seconds, count) in timings.items():
+        part = f"{_TOKEN_PATTERN.sub('_', name)};dur={seconds * 1000:.1f}"
+        if count > 1:
+            part += f';desc="{count}x"'
+        parts.append(part)
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def init_app(app, header=True, log=False):
+    """
+    Mede cada requisição e expõe o resultado.
+
+    Args:
+        header: Adiciona o header Server-Timing às respostas
+        log: Registra uma linha JSON por requisição no logger deste módulo
+    """
+    if not header and not log:
+        return
+
+    @app.before_request
+    def start_timing():
+        g.server_timing_start = time.perf_counter()
+
+    @app.after_request
+    def emit_timing(response):
+        start = g.get("server_timing_start")
+        if start is None:
+            return response
+        total = time.perf_counter() - start
+        timings = g.get("server_timings", {})
+        if header:
+            response.headers["Server-Timing"] = header_value(timings, total)
+        if log:
+            logger.info(
+                json.dumps(
+                    {
+                        "method": request.method,
+                        "path": request.path,
+                        "status": response.status_code,
+                        "total_ms": round(total * 1000, 1),
+                        "timings": {
+                            name: {"ms": round(seconds * 1000, 1), "count": count}
+                            for name, (seconds, count) in timings.items()
+                        },
+                    }
+                )
+            )
+        return response
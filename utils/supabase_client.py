@@ -4,6 +4,7 @@ import uuid
 from supabase import create_client
 
 from config import Config
+from utils.server_timing import instrument
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +32,7 @@ ALLOWED_SORT_FIELDS = {
 }
 
 
+@instrument("supabase")
 class SupabaseService:
     """Servico centralizado para operacoes no Supabase (Storage, DB, Auth)."""
 
@@ -274,6 +276,21 @@ class SupabaseService:
     def create_documento(self, data):
         return self._create("documentos", data)
 
+    def find_pdf_by_fingerprint(self, render_fingerprint, processo_id=None):
+        """PDF ja gerado com o mesmo fingerprint de render, no mesmo processo."""
+        query = (
+            self.client.table("documentos")
+            .select("*")
+            .eq("file_type", "pdf")
+            .eq("render_fingerprint", render_fingerprint)
+        )
+        if processo_id:
+            query = query.eq("processo_id", processo_id)
+        else:
+            query = query.is_("processo_id", "null")
+        result = query.order("created_at", desc=True).limit(1).execute()
+        return result.data[0] if result.data else None
+
     def update_documento(self, documento_id, data):
         return self._update("documentos", documento_id, data)
 
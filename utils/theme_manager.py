@@ -1,14 +1,34 @@
 import json
 import os
+import re
+import threading
+from collections import OrderedDict
+
+from jinja2 import Environment, FileSystemLoader
+
+# Mesmos critérios de PDFConverter._replace_css_variables()
+_ROOT_PATTERN = re.compile(r"[ \t]*:root\s*{([^}]+)}\n?", re.DOTALL)
+_VARIABLE_PATTERN = re.compile(r"--([a-zA-Z0-9_-]+)\s*:\s*([^;]+);")
+_VAR_USAGE_PATTERN = re.compile(r"var\((--[a-zA-Z0-9_-]+)\)")
+
+# Folha de estilo do relatório, renderizada com o tema por compile_css()
+REPORT_CSS_TEMPLATE = "report.css"
 
 
 class ThemeManager:
-    def __init__(self, templates_folder="templates", custom_themes_folder=None):
+    def __init__(
+        self, templates_folder="templates", custom_themes_folder=None, max_css=32
+    ):
         self.templates_folder = templates_folder
         self.themes_folder = os.path.join(templates_folder, "themes")  # Temas padrão
         self.custom_themes_folder = (
             custom_themes_folder  # Temas customizados (persistido)
         )
+        # Configuração do tema (JSON) -> CSS compilado
+        self.max_css = max_css
+        self._css = OrderedDict()
+        self._css_lock = threading.Lock()
+        self._css_env = Environment(loader=FileSystemLoader(templates_folder))
 
     def get_theme_config(self, theme_name="juridico"):
         # Normalize theme name to lowercase for case-insensitive matching
@@ -63,6 +83,40 @@ class ThemeManager:
             "logo": "https://matricula-simples-api-matricula-docs-084828563243.s3.sa-east-1.amazonaws.com/matriculas/axioma-intelligence/intelligence_branco.png",
         }
 
+    def compile_css(self, theme_config):
+        """
+        CSS do relatório (templates/report.css) para o tema, com os var(--x)
+        já trocados pelos valores do :root, que é removido. O HTML gerado não
+        depende de variáveis CSS e o PDF não precisa resolvê-las.
+        Em cache pela configuração do tema.
+        """
+        key = json.dumps(theme_config, sort_keys=True, default=str)
+        with self._css_lock:
+            css = self._css.get(key)
+            if css is not None:
+                self._css.move_to_end(key)
+                return css
+
+        css = self._css_env.get_template(REPORT_CSS_TEMPLATE).render(theme=theme_config)
+        root = _ROOT_PATTERN.search(css)
+        if root:
+            variables = {
+                f"--{match.group(1)}": match.group(2).strip()
+                for match in _VARIABLE_PATTERN.finditer(root.group(1))
+            }
+            css = css[: root.start()] + css[root.end() :]
+            css = _VAR_USAGE_PATTERN.sub(
+                lambda m: variables.get(m.group(1), m.group(0)), css
+            )
+        # Valores do tema não podem fechar o <style>
+        css = css.replace("</", "<\\/")
+
+        with self._css_lock:
+            self._css[key] = css
+            while len(self._css) > self.max_css:
+                self._css.popitem(last=False)
+        return css
+
     def list_themes(self):
         themes = set()
 